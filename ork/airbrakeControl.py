@@ -0,0 +1,351 @@
+# airbrakeControl.py
+
+import argparse
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from orlab import AbstractSimulationListener
+
+from airbrakeTable import brake_cd_area, deployment_for_apogee, load_apogee_table
+from jvmReductions import SWEEP_REDUCTIONS, reduce_flight_data
+from simulationListeners import stop_listeners
+from sweepSupervisor import SupervisedExecutor
+from sweepWorkers import start_worker
+
+# Layout of the state array handed to controllers at every control tick
+STATE_FIELDS = ("time", "altitude", "vertical_velocity", "speed", "deployment")
+TIME, ALTITUDE, VERTICAL_VELOCITY, SPEED, DEPLOYMENT = range(len(STATE_FIELDS))
+# Control log: the state seen by the controller, its command and the
+# deployment the actuator reached
+LOG_FIELDS = STATE_FIELDS + ("command", "new_deployment")
+
+DEFAULT_CONTROL_RATE_HZ = 20.0
+# Lead screw actuation: full travel in about half a second
+MAX_DEPLOYMENT_RATE = 2.0  # Deployment fraction per second
+TUNING_REDUCTIONS = [
+    r for r in SWEEP_REDUCTIONS if r.name in ("apogee", "time_to_apogee", "max_mach")
+]
+TUNING_COLUMNS = [
+    "target_apogee",
+    "gain",
+    "control_rate_hz",
+    "apogee",
+    "apogee_error",
+    "time_to_apogee",
+    "max_mach",
+    "max_deployment",
+    "control_ticks",
+    "run_seconds",
+    "error",
+]
+
+
+class TableController:
+    """
+    Deploys the airbrakes by the amount the apogee lookup table predicts will
+    put apogee on the target, times a gain. A gain above 1 brakes harder early
+    and relies on retracting later; below 1 it under-brakes and catches up.
+    Controllers are plain picklable callables so they can be sent to workers:
+    any callable taking the STATE_FIELDS array and returning a deployment
+    fraction works with AirbrakeListener.
+    """
+
+    def __init__(self, table, target_apogee_m, gain=1.0):
+        """
+        Args:
+            table (ApogeeTable): Apogee lookup table from airbrakeTable.
+            target_apogee_m (float): Target apogee above the launch site.
+            gain (float): Multiplier on the table's deployment.
+        """
+        self.table = table
+        self.target_apogee_m = target_apogee_m
+        self.gain = gain
+
+    def __call__(self, state):
+        return self.gain * deployment_for_apogee(
+            self.table,
+            state[ALTITUDE],
+            state[VERTICAL_VELOCITY],
+            self.target_apogee_m,
+        )
+
+
+class AirbrakeListener(AbstractSimulationListener):
+    """
+    Closed-loop airbrakes in an OpenRocket simulation. Between burnout and
+    apogee the controller is called at its own control rate, not at every
+    integrator step. At each control tick the rocket state is read into one
+    reused float array. The controller's command is then passed through the
+    actuator's rate limit and held until the next tick.
+
+    OpenRocket calls the aerodynamic hook at every integrator stage. That hook
+    only adds the cached drag coefficient of the current deployment, so the
+    Python work per stage stays a float check. Because the controller only
+    runs at postStep, it runs at most once per integrator step. Use a time
+    step no longer than the control period to get the full control rate.
+    """
+
+    def __init__(
+        self,
+        controller,
+        log,
+        control_rate_hz=DEFAULT_CONTROL_RATE_HZ,
+        max_deployment_rate=MAX_DEPLOYMENT_RATE,
+    ):
+        """
+        Args:
+            controller (callable): Maps the STATE_FIELDS array to a deployment
+                fraction (clipped to 0..1).
+            log (list): The control log of each run (np.array with LOG_FIELDS
+                columns) is appended here. OpenRocket runs a copy of the
+                listener, so results are shared through this list.
+            control_rate_hz (float): Controller update rate.
+            max_deployment_rate (float): Actuator speed in deployment fraction per second.
+        """
+        self.controller = controller
+        self.log = log
+        self.control_period = 1.0 / control_rate_hz
+        self.max_deployment_step = max_deployment_rate * self.control_period
+
+    def startSimulation(self, status):
+        self.reference_area = float(status.getConfiguration().getReferenceArea())
+        self.state = np.zeros(len(STATE_FIELDS))
+        self.rows = []
+        self.deployment = 0.0
+        self.delta_cd = 0.0
+        self.coasting = False
+        self.next_control_time = 0.0
+
+    def handleFlightEvent(self, status, flight_event):
+        event_name = str(flight_event.getType().name())
+        if event_name == "BURNOUT":
+            self.coasting = True
+        elif event_name == "APOGEE":
+            # Retract for the descent
+            self.coasting = False
+            self.deployment = 0.0
+            self.delta_cd = 0.0
+        return True
+
+    def postStep(self, status):
+        if not self.coasting:
+            return
+        t = float(status.getSimulationTime())
+        if t < self.next_control_time:
+            return
+        self.next_control_time = t + self.control_period
+
+        position = status.getRocketPosition()
+        velocity = status.getRocketVelocity()
+        state = self.state
+        state[TIME] = t
+        state[ALTITUDE] = float(position.z)
+        state[VERTICAL_VELOCITY] = float(velocity.z)
+        state[SPEED] = float(velocity.length())
+        state[DEPLOYMENT] = self.deployment
+
+        command = min(max(float(self.controller(state)), 0.0), 1.0)
+        self.deployment += min(
+            max(command - self.deployment, -self.max_deployment_step),
+            self.max_deployment_step,
+        )
+        self.delta_cd = float(brake_cd_area(self.deployment)) / self.reference_area
+        self.rows.append((*state, command, self.deployment))
+
+    def postAerodynamicCalculation(self, status, aerodynamic_forces):
+        if not self.delta_cd:
+            return None
+        aerodynamic_forces.setCDaxial(aerodynamic_forces.getCDaxial() + self.delta_cd)
+        aerodynamic_forces.setCD(aerodynamic_forces.getCD() + self.delta_cd)
+        return aerodynamic_forces
+
+    def endSimulation(self, status, simulation_exception):
+        self.log.append(np.array(self.rows, dtype=float).reshape(-1, len(LOG_FIELDS)))
+
+
+def run_airbrake_simulation(
+    helper,
+    sim,
+    controller,
+    control_rate_hz=DEFAULT_CONTROL_RATE_HZ,
+    max_deployment_rate=MAX_DEPLOYMENT_RATE,
+    stop_at_apogee=True,
+):
+    """
+    Run one simulation with the airbrakes in the loop. The seed is fixed, so
+    runs with different controllers see the same flight conditions.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation object.
+        controller (callable): See AirbrakeListener.
+        control_rate_hz (float): Controller update rate.
+        max_deployment_rate (float): Actuator speed in deployment fraction per second.
+        stop_at_apogee (bool): End the simulation at apogee.
+    Returns:
+        tuple: (TUNING_REDUCTIONS metrics dict, control log np.array with LOG_FIELDS columns).
+    """
+    log = []
+    listeners = [
+        AirbrakeListener(controller, log, control_rate_hz, max_deployment_rate)
+    ]
+    if stop_at_apogee:
+        listeners += stop_listeners("apogee")
+    helper.run_simulation(sim, listeners, randomize_seed=False)
+    metrics = reduce_flight_data(helper, sim, TUNING_REDUCTIONS)
+    control_log = log[-1] if log else np.empty((0, len(LOG_FIELDS)))
+    return metrics, control_log
+
+
+# Per-process simulation state, set up once by init_airbrake_worker
+_worker = {}
+
+
+def init_airbrake_worker(ork_file, table_path, max_deployment_rate):
+    """
+    Pool initializer: start a JVM in this worker process, load the rocket and
+    the apogee table once.
+    Args:
+        ork_file (str): Path to the .ork file.
+        table_path (str): .npz apogee table written by airbrakeTable.
+        max_deployment_rate (float): Actuator speed in deployment fraction per second.
+    """
+    start_worker(_worker, ork_file)
+    _worker.update(
+        table=load_apogee_table(table_path),
+        max_deployment_rate=max_deployment_rate,
+    )
+
+
+def run_tuning_case(task):
+    """
+    Run one controller setting in the worker.
+    Args:
+        task (tuple): (target apogee, gain, control rate in Hz).
+    Returns:
+        dict: One TUNING_COLUMNS row, without the error.
+    """
+    target_apogee, gain, control_rate_hz = task
+    controller = TableController(_worker["table"], target_apogee, gain)
+    start = time.perf_counter()
+    metrics, control_log = run_airbrake_simulation(
+        _worker["helper"],
+        _worker["sim"],
+        controller,
+        control_rate_hz,
+        _worker["max_deployment_rate"],
+    )
+    return {
+        "target_apogee": target_apogee,
+        "gain": gain,
+        "control_rate_hz": control_rate_hz,
+        **metrics,
+        "apogee_error": metrics["apogee"] - target_apogee,
+        "max_deployment": (
+            float(control_log[:, LOG_FIELDS.index("new_deployment")].max())
+            if len(control_log)
+            else 0.0
+        ),
+        "control_ticks": len(control_log),
+        "run_seconds": time.perf_counter() - start,
+    }
+
+
+def airbrake_tuning_sweep(
+    version="3",
+    target_fractions=(0.85, 0.9, 0.95),
+    gains=(0.6, 0.8, 1.0, 1.2, 1.4),
+    control_rates_hz=(10.0, 20.0, 50.0),
+    workers=1,
+    sim_timeout=None,
+    max_retries=2,
+    max_deployment_rate=MAX_DEPLOYMENT_RATE,
+):
+    """
+    Run the table controller in the loop for every combination of target
+    apogee, gain and control rate, in supervised worker processes.
+    Args:
+        version (str): Rocket version number.
+        target_fractions (tuple): Target apogees as fractions of the
+            uncontrolled OpenRocket apogee.
+        gains (tuple): Controller gains.
+        control_rates_hz (tuple): Controller update rates.
+        workers (int): Number of worker processes (one JVM each).
+        sim_timeout (float, optional): Seconds one simulation may run.
+        max_retries (int): Extra attempts for a case that fails.
+        max_deployment_rate (float): Actuator speed in deployment fraction per second.
+    Returns:
+        pd.DataFrame: One TUNING_COLUMNS row per case, or None if the inputs
+            are unavailable.
+    """
+    from airbrakeTable import airbrake_table_analysis
+    from ascentSurrogate import cached_ascent_model
+
+    ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return None
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    table_path = os.path.join(output_dir, "airbrake_apogee_table.npz")
+    if not os.path.exists(table_path) and airbrake_table_analysis(version) is None:
+        return None
+    model = cached_ascent_model(version)
+    if model is None:
+        return None
+
+    uncontrolled = model.reference["apogee"]
+    tasks = list(
+        itertools.product(
+            [round(f * uncontrolled, 1) for f in target_fractions],
+            gains,
+            control_rates_hz,
+        )
+    )
+    print(f"[INFO] Running {len(tasks)} airbrake cases on {workers} worker(s)")
+
+    start = time.perf_counter()
+    executor = SupervisedExecutor(
+        run_tuning_case,
+        workers,
+        initializer=init_airbrake_worker,
+        initargs=(ork_file, table_path, max_deployment_rate),
+        timeout=sim_timeout,
+        max_retries=max_retries,
+    )
+    rows = []
+    for (target_apogee, gain, control_rate_hz), result, error in executor.map(tasks):
+        if result is None:
+            result = {
+                "target_apogee": target_apogee,
+                "gain": gain,
+                "control_rate_hz": control_rate_hz,
+            }
+            print(f"[ERROR] Case {target_apogee}, {gain}, {control_rate_hz}: {error}")
+        rows.append({**result, "error": error})
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] {len(tasks)} simulations in {elapsed:.1f} s "
+        f"({len(tasks) / elapsed * 60:.0f} per minute)"
+    )
+
+    results = pd.DataFrame(rows, columns=TUNING_COLUMNS).sort_values(
+        ["target_apogee", "gain", "control_rate_hz"]
+    )
+    results_path = os.path.join(output_dir, "airbrake_tuning.csv")
+    results.to_csv(results_path, index=False)
+    print(f"[INFO] Tuning results saved to: {results_path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Airbrake controller tuning sweep.")
+    parser.add_argument("--version", default="3", help="Rocket version number")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sim-timeout", type=float, default=None)
+    args = parser.parse_args()
+    airbrake_tuning_sweep(
+        args.version, workers=args.workers, sim_timeout=args.sim_timeout
+    )
@@ -0,0 +1,522 @@
+# airbrakeTable.py
+
+import argparse
+import os
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from ascentSurrogate import DEFAULT_TIME_STEP, atmosphere, cached_ascent_model
+
+# The .ork files have no airbrake component and the DSS gives no flap
+# dimensions, so the flaps are described here. Replace these with the CAD values.
+FLAP_COUNT = 3
+FLAP_WIDTH_M = 0.04  # Across the flow (arc of body tube)
+FLAP_LENGTH_M = 0.08  # Hinge to aft edge
+MAX_FLAP_ANGLE_DEG = 45.0  # At deployment fraction 1
+FLAP_CD = 1.17  # Flat plate normal to the flow, on its projected area
+
+VALUE_DTYPES = {"float32": "float", "uint16": "uint16_t", "uint8": "uint8_t"}
+COAST_MAX_TIME_S = 120.0
+
+
+def brake_cd_area(deployment):
+    """
+    Drag area the flaps add at a deployment fraction (0 retracted, 1 fully out).
+    Args:
+        deployment (np.array): Deployment fraction of the flap travel.
+    Returns:
+        np.array: Cd * A added to the rocket's, in m^2.
+    """
+    projected = (
+        FLAP_COUNT
+        * FLAP_WIDTH_M
+        * FLAP_LENGTH_M
+        * np.sin(np.radians(np.clip(deployment, 0.0, 1.0) * MAX_FLAP_ANGLE_DEG))
+    )
+    return FLAP_CD * projected
+
+
+def coast_mass(model):
+    """Burnout mass of the rocket, used for the whole coast."""
+    return float(np.interp(model.burnout_time_s, model.time_s, model.mass_kg))
+
+
+def coast_apogee(
+    model,
+    altitude_m,
+    vertical_velocity,
+    deployment=0.0,
+    dt=DEFAULT_TIME_STEP,
+    max_time_s=COAST_MAX_TIME_S,
+):
+    """
+    Integrate the coast to apogee for many states at once. The coast is taken as
+    vertical (the flight computer only knows altitude and vertical velocity),
+    with the coast Cd-vs-Mach table of the model plus the airbrake drag area.
+    Arguments are broadcast to one value per state.
+    Args:
+        model (AscentModel): Calibrated rocket model.
+        altitude_m (float or np.array): Altitude above the launch site.
+        vertical_velocity (float or np.array): Vertical velocity in m/s.
+        deployment (float or np.array): Airbrake deployment fraction, held fixed.
+        dt (float): Integration time step in seconds.
+        max_time_s (float): Give up on states still climbing after this long.
+    Returns:
+        np.array: Apogee above the launch site, in the broadcast shape.
+    """
+    altitude, velocity, deployment = np.broadcast_arrays(
+        *(
+            np.asarray(v, dtype=float)
+            for v in (altitude_m, vertical_velocity, deployment)
+        )
+    )
+    shape = altitude.shape
+    apogee = np.where(velocity.ravel() <= 0, altitude.ravel(), np.nan)
+    idx = np.flatnonzero(velocity.ravel() > 0)
+    z, vz = altitude.ravel()[idx], velocity.ravel()[idx]
+    extra_area = brake_cd_area(deployment.ravel()[idx])
+    body_area = model.reference_area_m2 * model.drag_scale
+    mass = coast_mass(model)
+
+    def acceleration(z, vz, extra_area):
+        density, speed_of_sound = atmosphere(model, z)
+        cd = np.interp(np.abs(vz) / speed_of_sound, model.mach_grid, model.cd_coast)
+        drag = 0.5 * density * vz * np.abs(vz) * (cd * body_area + extra_area)
+        return -model.gravity - drag / mass
+
+    h = dt / 2
+    t = 0.0
+    while len(idx) and t < max_time_s:
+        a1 = acceleration(z, vz, extra_area)
+        a2 = acceleration(z + h * vz, vz + h * a1, extra_area)
+        a3 = acceleration(z + h * (vz + h * a1), vz + h * a2, extra_area)
+        a4 = acceleration(z + dt * (vz + h * a2), vz + dt * a3, extra_area)
+        new_z = z + dt * (vz + dt / 6 * (a1 + a2 + a3))
+        new_vz = vz + dt / 6 * (a1 + 2 * a2 + 2 * a3 + a4)
+        t += dt
+
+        # Same apogee placement as simulate_ascent: vz linear over the step
+        peaked = new_vz <= 0
+        if np.any(peaked):
+            fraction = vz[peaked] / (vz[peaked] - new_vz[peaked])
+            apogee[idx[peaked]] = z[peaked] + 0.5 * vz[peaked] * fraction * dt
+            keep = ~peaked
+            idx, new_z, new_vz, extra_area = (
+                idx[keep],
+                new_z[keep],
+                new_vz[keep],
+                extra_area[keep],
+            )
+        z, vz = new_z, new_vz
+
+    return apogee.reshape(shape)
+
+
+@dataclass
+class ApogeeTable:
+    """
+    Apogee on a uniform (altitude, vertical velocity, deployment) grid, laid out
+    so it can be copied to a flight computer as is: each axis is just a start,
+    a step and a count, and values are stored as value_dtype and decoded as
+    value_offset + value_scale * value. Deployment is the innermost axis, so
+    the candidate deployments for one state are contiguous.
+    """
+
+    altitude_start_m: float
+    altitude_step_m: float
+    velocity_start_ms: float
+    velocity_step_ms: float
+    deployment_step: float
+    values: np.ndarray
+    value_offset: float = 0.0
+    value_scale: float = 1.0
+
+
+def build_apogee_table(
+    model,
+    altitude_range_m,
+    velocity_range_ms,
+    n_altitude=16,
+    n_velocity=32,
+    n_deployment=17,
+    value_dtype="uint16",
+    dt=DEFAULT_TIME_STEP,
+):
+    """
+    Integrate the coast from every grid point in one batch and store the apogees.
+    Args:
+        model (AscentModel): Calibrated rocket model.
+        altitude_range_m (tuple): (lowest, highest) altitude above the site.
+        velocity_range_ms (tuple): (lowest, highest) vertical velocity.
+        n_altitude (int): Altitude grid points (at least 2).
+        n_velocity (int): Vertical velocity grid points (at least 2).
+        n_deployment (int): Deployment grid points from 0 to 1 (at least 2).
+        value_dtype (str): One of VALUE_DTYPES; the integer types quantize the
+            apogee linearly between the table's lowest and highest value.
+        dt (float): Integration time step in seconds.
+    Returns:
+        ApogeeTable: The table.
+    """
+    if value_dtype not in VALUE_DTYPES:
+        raise ValueError(f"Unknown value dtype: {value_dtype}")
+    if min(n_altitude, n_velocity, n_deployment) < 2:
+        raise ValueError("Every table axis needs at least 2 points")
+
+    altitudes = np.linspace(*altitude_range_m, n_altitude)
+    velocities = np.linspace(*velocity_range_ms, n_velocity)
+    deployments = np.linspace(0.0, 1.0, n_deployment)
+    apogee = coast_apogee(
+        model,
+        altitudes[:, None, None],
+        velocities[None, :, None],
+        deployments[None, None, :],
+        dt=dt,
+    )
+
+    offset, scale = 0.0, 1.0
+    if value_dtype == "float32":
+        values = apogee.astype(np.float32)
+    else:
+        levels = np.iinfo(value_dtype).max
+        offset = float(np.nanmin(apogee))
+        scale = max(float(np.nanmax(apogee)) - offset, 1e-9) / levels
+        values = np.round((apogee - offset) / scale).astype(value_dtype)
+
+    return ApogeeTable(
+        altitude_start_m=float(altitudes[0]),
+        altitude_step_m=float(altitudes[1] - altitudes[0]),
+        velocity_start_ms=float(velocities[0]),
+        velocity_step_ms=float(velocities[1] - velocities[0]),
+        deployment_step=float(deployments[1]),
+        values=values,
+        value_offset=offset,
+        value_scale=scale,
+    )
+
+
+def _axis_position(value, start, step, count):
+    """Lower grid index and fractional position along one uniform axis, clamped."""
+    position = np.clip((value - start) / step, 0.0, count - 1)
+    lower = np.minimum(position.astype(int), count - 2)
+    return lower, position - lower
+
+
+def predict_apogee(table, altitude_m, vertical_velocity, deployment):
+    """
+    Trilinear lookup of the table for many states at once. States outside the
+    grid are clamped to its edges.
+    Args:
+        table (ApogeeTable): Table to query.
+        altitude_m (float or np.array): Altitude above the launch site.
+        vertical_velocity (float or np.array): Vertical velocity in m/s.
+        deployment (float or np.array): Airbrake deployment fraction.
+    Returns:
+        np.array: Predicted apogee, in the broadcast shape.
+    """
+    n_altitude, n_velocity, n_deployment = table.values.shape
+    ia, fa = _axis_position(
+        np.asarray(altitude_m, dtype=float),
+        table.altitude_start_m,
+        table.altitude_step_m,
+        n_altitude,
+    )
+    iv, fv = _axis_position(
+        np.asarray(vertical_velocity, dtype=float),
+        table.velocity_start_ms,
+        table.velocity_step_ms,
+        n_velocity,
+    )
+    id_, fd = _axis_position(
+        np.asarray(deployment, dtype=float), 0.0, table.deployment_step, n_deployment
+    )
+    values = table.values.astype(float)
+    result = 0.0
+    for da, wa in ((0, 1 - fa), (1, fa)):
+        for dv, wv in ((0, 1 - fv), (1, fv)):
+            for dd, wd in ((0, 1 - fd), (1, fd)):
+                result = result + wa * wv * wd * values[ia + da, iv + dv, id_ + dd]
+    return table.value_offset + table.value_scale * result
+
+
+def lookup_apogee(table, altitude_m, vertical_velocity, deployment):
+    """
+    Single-state lookup in plain scalar arithmetic, the same steps a flight
+    computer would run: three index computations and eight table reads.
+    Args:
+        table (ApogeeTable): Table to query.
+        altitude_m (float): Altitude above the launch site.
+        vertical_velocity (float): Vertical velocity in m/s.
+        deployment (float): Airbrake deployment fraction.
+    Returns:
+        float: Predicted apogee.
+    """
+    counts = table.values.shape
+    lower = []
+    fractions = []
+    for value, start, step, count in zip(
+        (altitude_m, vertical_velocity, deployment),
+        (table.altitude_start_m, table.velocity_start_ms, 0.0),
+        (table.altitude_step_m, table.velocity_step_ms, table.deployment_step),
+        counts,
+    ):
+        position = min(max((value - start) / step, 0.0), count - 1.0)
+        index = min(int(position), count - 2)
+        lower.append(index)
+        fractions.append(position - index)
+
+    ia, iv, id_ = lower
+    fa, fv, fd = fractions
+    item = table.values.item
+    result = 0.0
+    for da, wa in ((0, 1 - fa), (1, fa)):
+        for dv, wv in ((0, 1 - fv), (1, fv)):
+            result += (
+                wa
+                * wv
+                * (
+                    (1 - fd) * item(ia + da, iv + dv, id_)
+                    + fd * item(ia + da, iv + dv, id_ + 1)
+                )
+            )
+    return table.value_offset + table.value_scale * result
+
+
+def deployment_for_apogee(table, altitude_m, vertical_velocity, target_apogee_m):
+    """
+    Deployment fraction the table predicts will put apogee on a target.
+    Args:
+        table (ApogeeTable): Table to query.
+        altitude_m (float): Altitude above the launch site.
+        vertical_velocity (float): Vertical velocity in m/s.
+        target_apogee_m (float): Desired apogee above the launch site.
+    Returns:
+        float: Deployment fraction, 0 if the target is out of reach even
+            retracted and 1 if it is overshot even fully deployed.
+    """
+    fractions = np.arange(table.values.shape[2]) * table.deployment_step
+    apogees = predict_apogee(table, altitude_m, vertical_velocity, fractions)
+    # Apogee falls as deployment rises, so reverse for np.interp
+    return float(np.interp(target_apogee_m, apogees[::-1], fractions[::-1]))
+
+
+def save_apogee_table(table, path):
+    """
+    Args:
+        table (ApogeeTable): Table to save.
+        path (str): Output .npz path.
+    """
+    np.savez(path, **asdict(table))
+
+
+def load_apogee_table(path):
+    """
+    Args:
+        path (str): .npz file written by save_apogee_table.
+    Returns:
+        ApogeeTable: The saved table.
+    """
+    with np.load(path) as saved:
+        return ApogeeTable(
+            **{
+                name: (saved[name] if name == "values" else float(saved[name]))
+                for name in saved.files
+            }
+        )
+
+
+def _c_float(value):
+    """A float as a C float literal."""
+    text = f"{value:.7g}"
+    if "." not in text and "e" not in text and "n" not in text:
+        text += ".0"
+    return f"{text}f"
+
+
+def write_c_header(table, path, name="APOGEE_TABLE", source=""):
+    """
+    Write the table as a C header for the flight controller firmware.
+    Args:
+        table (ApogeeTable): Table to write.
+        path (str): Output .h path.
+        name (str): Prefix of the generated identifiers.
+        source (str): Where the table came from, for the header comment.
+    """
+    c_type = VALUE_DTYPES[str(table.values.dtype)]
+    n_altitude, n_velocity, n_deployment = table.values.shape
+    lines = [
+        f"// Apogee lookup table generated by airbrakeTable.py{f' from {source}' if source else ''}",
+        f"// apogee_m = {name}_OFFSET + {name}_SCALE * {name}[altitude][velocity][deployment]",
+        f"#ifndef {name}_H",
+        f"#define {name}_H",
+        "",
+        "#include <stdint.h>",
+        "",
+        f"#define {name}_ALTITUDE_COUNT {n_altitude}",
+        f"#define {name}_VELOCITY_COUNT {n_velocity}",
+        f"#define {name}_DEPLOYMENT_COUNT {n_deployment}",
+        f"static const float {name}_ALTITUDE_START = {_c_float(table.altitude_start_m)};",
+        f"static const float {name}_ALTITUDE_STEP = {_c_float(table.altitude_step_m)};",
+        f"static const float {name}_VELOCITY_START = {_c_float(table.velocity_start_ms)};",
+        f"static const float {name}_VELOCITY_STEP = {_c_float(table.velocity_step_ms)};",
+        f"static const float {name}_DEPLOYMENT_STEP = {_c_float(table.deployment_step)};",
+        f"static const float {name}_OFFSET = {_c_float(table.value_offset)};",
+        f"static const float {name}_SCALE = {_c_float(table.value_scale)};",
+        "",
+        f"static const {c_type} {name}[{n_altitude}][{n_velocity}][{n_deployment}] = {{",
+    ]
+    for plane in table.values:
+        lines.append("    {")
+        for row in plane:
+            cells = ", ".join(
+                _c_float(value) if c_type == "float" else str(value) for value in row
+            )
+            lines.append(f"        {{{cells}}},")
+        lines.append("    },")
+    lines += ["};", "", f"#endif // {name}_H", ""]
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def benchmark_queries(table, model, n_queries=2000, n_direct=20, dt=DEFAULT_TIME_STEP):
+    """
+    Check the table against direct integration at random off-grid states and
+    time both.
+    Args:
+        table (ApogeeTable): Table to check.
+        model (AscentModel): Model the table was built from.
+        n_queries (int): Random states for the accuracy check and table timings.
+        n_direct (int): States integrated one at a time for the direct timing.
+        dt (float): Integration time step in seconds.
+    Returns:
+        dict: Errors in m and per-query times in microseconds.
+    """
+    n_altitude, n_velocity, _ = table.values.shape
+    rng = np.random.default_rng(0)
+    altitude = table.altitude_start_m + rng.random(
+        n_queries
+    ) * table.altitude_step_m * (n_altitude - 1)
+    velocity = table.velocity_start_ms + rng.random(
+        n_queries
+    ) * table.velocity_step_ms * (n_velocity - 1)
+    deployment = rng.random(n_queries)
+
+    start = time.perf_counter()
+    direct = coast_apogee(model, altitude, velocity, deployment, dt=dt)
+    direct_batch_us = (time.perf_counter() - start) / n_queries * 1e6
+
+    start = time.perf_counter()
+    for i in range(n_direct):
+        coast_apogee(model, altitude[i], velocity[i], deployment[i], dt=dt)
+    direct_single_us = (time.perf_counter() - start) / n_direct * 1e6
+
+    start = time.perf_counter()
+    predicted = predict_apogee(table, altitude, velocity, deployment)
+    table_batch_us = (time.perf_counter() - start) / n_queries * 1e6
+
+    start = time.perf_counter()
+    for a, v, d in zip(altitude.tolist(), velocity.tolist(), deployment.tolist()):
+        lookup_apogee(table, a, v, d)
+    table_single_us = (time.perf_counter() - start) / n_queries * 1e6
+
+    error = predicted - direct
+    return {
+        "max_error_m": float(np.nanmax(np.abs(error))),
+        "rms_error_m": float(np.sqrt(np.nanmean(error**2))),
+        "table_batch_us": table_batch_us,
+        "table_single_us": table_single_us,
+        "direct_batch_us": direct_batch_us,
+        "direct_single_us": direct_single_us,
+    }
+
+
+def airbrake_table_analysis(
+    version="3",
+    refresh=False,
+    n_altitude=16,
+    n_velocity=32,
+    n_deployment=17,
+    value_dtype="uint16",
+    dt=DEFAULT_TIME_STEP,
+):
+    """
+    Build the airbrake apogee lookup table for a rocket version, covering the
+    coast from burnout, check it against direct integration and write it out
+    as .npz and as a C header.
+    Args:
+        version (str): Rocket version number.
+        refresh (bool): Re-extract the rocket model from OpenRocket.
+        n_altitude (int): Altitude grid points.
+        n_velocity (int): Vertical velocity grid points.
+        n_deployment (int): Deployment grid points.
+        value_dtype (str): Storage type of the apogees, one of VALUE_DTYPES.
+        dt (float): Integration time step in seconds.
+    Returns:
+        tuple: (ApogeeTable, benchmark dict), or None if the model is unavailable.
+    """
+    model = cached_ascent_model(version, refresh, dt)
+    if model is None:
+        return None
+
+    # Every state of the coast: up to past apogee, and from rest to a margin
+    # above the burnout speed
+    reference = model.reference
+    altitude_range = (0.0, 1.05 * reference["apogee"])
+    velocity_range = (0.0, 1.1 * reference["burnout_velocity"])
+    start = time.perf_counter()
+    table = build_apogee_table(
+        model,
+        altitude_range,
+        velocity_range,
+        n_altitude,
+        n_velocity,
+        n_deployment,
+        value_dtype,
+        dt,
+    )
+    print(
+        f"[INFO] Built {n_altitude}x{n_velocity}x{n_deployment} {value_dtype} table "
+        f"({table.values.nbytes} bytes) in {time.perf_counter() - start:.2f} s"
+    )
+
+    benchmark = benchmark_queries(table, model, dt=dt)
+    print(
+        f"[INFO] Table error vs direct integration: max {benchmark['max_error_m']:.2f} m, "
+        f"RMS {benchmark['rms_error_m']:.2f} m"
+    )
+    print(
+        f"[INFO] Per query: table {benchmark['table_single_us']:.1f} us "
+        f"({benchmark['table_batch_us']:.3f} us batched), direct integration "
+        f"{benchmark['direct_single_us']:.0f} us "
+        f"({benchmark['direct_batch_us']:.1f} us batched)"
+    )
+
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    table_path = os.path.join(output_dir, "airbrake_apogee_table.npz")
+    header_path = os.path.join(output_dir, "airbrake_apogee_table.h")
+    save_apogee_table(table, table_path)
+    write_c_header(table, header_path, source=f"hyperion_II_v{version}.ork")
+    print(f"[INFO] Table saved to: {table_path} and {header_path}")
+    return table, benchmark
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Airbrake apogee lookup table.")
+    parser.add_argument("--version", default="3", help="Rocket version number")
+    parser.add_argument(
+        "--refresh", action="store_true", help="Re-extract the model from OpenRocket"
+    )
+    parser.add_argument("--altitude-bins", type=int, default=16)
+    parser.add_argument("--velocity-bins", type=int, default=32)
+    parser.add_argument("--deployment-bins", type=int, default=17)
+    parser.add_argument("--dtype", choices=list(VALUE_DTYPES), default="uint16")
+    args = parser.parse_args()
+    airbrake_table_analysis(
+        args.version,
+        args.refresh,
+        args.altitude_bins,
+        args.velocity_bins,
+        args.deployment_bins,
+        args.dtype,
+    )
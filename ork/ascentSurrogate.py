@@ -0,0 +1,553 @@
+# ascentSurrogate.py
+
+import argparse
+import os
+import time
+from dataclasses import asdict, dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from orlab import FlightDataType
+
+from batchMetrics import AIR_HEAT_CAPACITY_RATIO
+
+# Series read once from an OpenRocket run to build the surrogate
+SURROGATE_DATA_TYPES = [
+    FlightDataType.TYPE_TIME,
+    FlightDataType.TYPE_ALTITUDE,
+    FlightDataType.TYPE_ALTITUDE_ABOVE_SEA,
+    FlightDataType.TYPE_VELOCITY_TOTAL,
+    FlightDataType.TYPE_VELOCITY_Z,
+    FlightDataType.TYPE_ACCELERATION_TOTAL,
+    FlightDataType.TYPE_MACH_NUMBER,
+    FlightDataType.TYPE_THRUST_FORCE,
+    FlightDataType.TYPE_MASS,
+    FlightDataType.TYPE_DRAG_FORCE,
+    FlightDataType.TYPE_AIR_DENSITY,
+    FlightDataType.TYPE_AIR_TEMPERATURE,
+    FlightDataType.TYPE_AIR_PRESSURE,
+    FlightDataType.TYPE_REFERENCE_AREA,
+    FlightDataType.TYPE_GRAVITY,
+]
+
+GAS_CONSTANT_AIR = 287.053  # J/(kg K)
+LAPSE_RATE = 0.0065  # K/m, ISA troposphere
+MACH_BINS = 40
+# Cd samples below this speed are dominated by noise (q -> 0)
+MIN_CD_SPEED = 15.0
+DEFAULT_TIME_STEP = 0.02
+# Times calibrate widens its drag scale range (halving the low end, doubling
+# the high end) when the OpenRocket apogee lies outside the surrogate's
+CALIBRATION_WIDENINGS = 4
+# Running maxima tracked for every variant during the ascent
+PEAK_METRICS = ("max_velocity", "max_acceleration", "max_mach")
+
+
+@dataclass
+class AscentModel:
+    """
+    Point-mass description of one rocket, extracted from an OpenRocket run:
+    thrust and mass against time, Cd against Mach (separately for the powered
+    and coast phases, since base drag drops while the motor burns), the launch
+    site atmosphere and the launch rail. drag_scale is the calibration factor
+    fitted so the surrogate apogee matches OpenRocket.
+    """
+
+    time_s: np.ndarray
+    thrust_n: np.ndarray
+    mass_kg: np.ndarray
+    mach_grid: np.ndarray
+    cd_powered: np.ndarray
+    cd_coast: np.ndarray
+    reference_area_m2: float
+    site_altitude_m: float
+    site_temperature_k: float
+    site_pressure_pa: float
+    gravity: float
+    rail_length_m: float
+    launch_angle_deg: float
+    burnout_time_s: float
+    drag_scale: float = 1.0
+    reference: dict = field(default_factory=dict)  # OpenRocket metrics
+
+
+def cd_table(mach, cd, mach_grid):
+    """
+    Average Cd samples into Mach bins, filling empty bins by interpolation.
+    Args:
+        mach (np.array): Mach number of each sample.
+        cd (np.array): Drag coefficient of each sample.
+        mach_grid (np.array): Bin centres.
+    Returns:
+        np.array: Cd at each grid Mach number (NaN if there are no samples).
+    """
+    table = np.full(len(mach_grid), np.nan)
+    if len(mach) == 0:
+        return table
+    edges = np.concatenate(([-np.inf], (mach_grid[1:] + mach_grid[:-1]) / 2, [np.inf]))
+    bins = np.digitize(mach, edges) - 1
+    sums = np.bincount(bins, weights=cd, minlength=len(mach_grid))
+    counts = np.bincount(bins, minlength=len(mach_grid))
+    filled = counts > 0
+    table[filled] = sums[filled] / counts[filled]
+    return np.interp(mach_grid, mach_grid[filled], table[filled])
+
+
+def model_from_timeseries(data, rail_length_m, launch_angle_deg):
+    """
+    Build an AscentModel from one run's timeseries.
+    Args:
+        data (dict): SURROGATE_DATA_TYPES -> np.array, as returned by get_timeseries.
+        rail_length_m (float): Launch rail length.
+        launch_angle_deg (float): Rail angle from vertical.
+    Returns:
+        AscentModel: The uncalibrated model, with the run's metrics as reference.
+    """
+    t = data[FlightDataType.TYPE_TIME]
+    altitude = data[FlightDataType.TYPE_ALTITUDE]
+    velocity = data[FlightDataType.TYPE_VELOCITY_TOTAL]
+    thrust = np.nan_to_num(data[FlightDataType.TYPE_THRUST_FORCE])
+    mass = data[FlightDataType.TYPE_MASS]
+    mach = data[FlightDataType.TYPE_MACH_NUMBER]
+    density = data[FlightDataType.TYPE_AIR_DENSITY]
+    area = float(np.nanmedian(data[FlightDataType.TYPE_REFERENCE_AREA]))
+
+    apogee_index = int(np.nanargmax(altitude))
+    burning = np.flatnonzero(thrust > 0)
+    burnout_time = float(t[burning[-1]]) if len(burning) else 0.0
+
+    # Cd = D / (q A) over the ascent
+    ascent = np.arange(len(t)) <= apogee_index
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cd = data[FlightDataType.TYPE_DRAG_FORCE] / (0.5 * density * velocity**2 * area)
+    valid = ascent & (velocity > MIN_CD_SPEED) & np.isfinite(cd) & np.isfinite(mach)
+    mach_grid = np.linspace(0.0, 1.1 * float(np.nanmax(mach[valid])), MACH_BINS)
+    powered = valid & (thrust > 0)
+    coast = valid & (thrust <= 0)
+    cd_powered = cd_table(mach[powered], cd[powered], mach_grid)
+    cd_coast = cd_table(mach[coast], cd[coast], mach_grid)
+    if np.all(np.isnan(cd_powered)):
+        cd_powered = cd_coast
+    if np.all(np.isnan(cd_coast)):
+        cd_coast = cd_powered
+
+    above_sea = data[FlightDataType.TYPE_ALTITUDE_ABOVE_SEA]
+    time_to_apogee = float(t[apogee_index])
+    reference = {
+        "apogee": float(altitude[apogee_index]),
+        "time_to_apogee": time_to_apogee,
+        "max_velocity": float(np.nanmax(velocity[ascent])),
+        "max_mach": float(np.nanmax(mach[ascent])),
+        "burnout_velocity": float(np.interp(burnout_time, t, velocity)),
+    }
+    return AscentModel(
+        time_s=np.asarray(t, dtype=float),
+        thrust_n=thrust,
+        mass_kg=np.asarray(mass, dtype=float),
+        mach_grid=mach_grid,
+        cd_powered=cd_powered,
+        cd_coast=cd_coast,
+        reference_area_m2=area,
+        site_altitude_m=float(above_sea[0] - altitude[0]),
+        site_temperature_k=float(data[FlightDataType.TYPE_AIR_TEMPERATURE][0]),
+        site_pressure_pa=float(data[FlightDataType.TYPE_AIR_PRESSURE][0]),
+        gravity=float(np.nanmedian(data[FlightDataType.TYPE_GRAVITY])),
+        rail_length_m=float(rail_length_m),
+        launch_angle_deg=float(launch_angle_deg),
+        burnout_time_s=burnout_time,
+        reference=reference,
+    )
+
+
+def extract_ascent_model(helper, sim):
+    """
+    Build an AscentModel from a simulation that has been run.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation object.
+    Returns:
+        AscentModel: The uncalibrated model.
+    """
+    from fastTimeseries import get_timeseries_fast
+
+    data = get_timeseries_fast(helper, sim, SURROGATE_DATA_TYPES)
+    options = sim.getOptions()
+    return model_from_timeseries(
+        data,
+        float(options.getLaunchRodLength()),
+        np.degrees(float(options.getLaunchRodAngle())),
+    )
+
+
+def save_ascent_model(model, path):
+    """
+    Args:
+        model (AscentModel): Model to save.
+        path (str): Output .npz path.
+    """
+    fields = asdict(model)
+    reference = fields.pop("reference")
+    np.savez(
+        path,
+        **fields,
+        **{f"openrocket_{name}": value for name, value in reference.items()},
+    )
+
+
+def load_ascent_model(path):
+    """
+    Args:
+        path (str): .npz file written by save_ascent_model.
+    Returns:
+        AscentModel: The saved model.
+    """
+    with np.load(path) as saved:
+        values = {name: saved[name] for name in saved.files}
+    reference = {
+        name[len("openrocket_") :]: float(values.pop(name))
+        for name in list(values)
+        if name.startswith("openrocket_")
+    }
+    arrays = {"time_s", "thrust_n", "mass_kg", "mach_grid", "cd_powered", "cd_coast"}
+    return AscentModel(
+        **{
+            name: (value if name in arrays else float(value))
+            for name, value in values.items()
+        },
+        reference=reference,
+    )
+
+
+def atmosphere(model, altitude_m):
+    """
+    ISA troposphere anchored to the launch site conditions of the OpenRocket run.
+    Args:
+        model (AscentModel): Model with the site conditions.
+        altitude_m (np.array): Altitude above the launch site.
+    Returns:
+        tuple: (density in kg/m^3, speed of sound in m/s) arrays.
+    """
+    temperature = model.site_temperature_k - LAPSE_RATE * altitude_m
+    pressure = model.site_pressure_pa * (temperature / model.site_temperature_k) ** (
+        model.gravity / (LAPSE_RATE * GAS_CONSTANT_AIR)
+    )
+    density = pressure / (GAS_CONSTANT_AIR * temperature)
+    speed_of_sound = np.sqrt(AIR_HEAT_CAPACITY_RATIO * GAS_CONSTANT_AIR * temperature)
+    return density, speed_of_sound
+
+
+def simulate_ascent(
+    model,
+    mass_offset_kg=0.0,
+    drag_scale=1.0,
+    thrust_scale=1.0,
+    launch_angle_deg=None,
+    dt=DEFAULT_TIME_STEP,
+    max_time_s=None,
+):
+    """
+    Integrate many variants of the rocket to apogee at once. Each argument may
+    be a scalar or an array; they are broadcast to one value per variant. The
+    state of all variants is advanced together with fixed-step RK4, and
+    variants are dropped from the batch as they reach apogee.
+    Args:
+        model (AscentModel): Rocket model (its drag_scale is applied as well).
+        mass_offset_kg (float or np.array): Mass added to the whole flight.
+        drag_scale (float or np.array): Multiplier on Cd.
+        thrust_scale (float or np.array): Multiplier on thrust.
+        launch_angle_deg (float or np.array, optional): Rail angle from vertical
+            (the model's angle if None).
+        dt (float): Integration time step in seconds.
+        max_time_s (float, optional): Stop variants that have not reached apogee
+            by this time (default: three times the reference time to apogee).
+    Returns:
+        dict: Metric name -> np.array with one value per variant: apogee,
+            time_to_apogee, max_velocity, max_acceleration, max_mach,
+            rail_exit_velocity, burnout_velocity and burnout_altitude.
+    """
+    if launch_angle_deg is None:
+        launch_angle_deg = model.launch_angle_deg
+    mass_offset, drag, thrust_factor, angle = np.broadcast_arrays(
+        *(
+            np.atleast_1d(np.asarray(v, dtype=float))
+            for v in (mass_offset_kg, drag_scale, thrust_scale, launch_angle_deg)
+        )
+    )
+    n = mass_offset.size
+    drag = drag.ravel() * model.drag_scale
+    mass_offset = mass_offset.ravel()
+    thrust_factor = thrust_factor.ravel()
+    if max_time_s is None:
+        max_time_s = 3 * model.reference.get("time_to_apogee", 60.0)
+    half_area = 0.5 * model.reference_area_m2
+
+    metrics = {
+        name: np.full(n, np.nan)
+        for name in (
+            "apogee",
+            "time_to_apogee",
+            "max_velocity",
+            "max_acceleration",
+            "max_mach",
+            "rail_exit_velocity",
+            "burnout_velocity",
+            "burnout_altitude",
+        )
+    }
+    # State and parameters of the variants still climbing, compacted as they
+    # reach apogee; idx maps them back to the output arrays
+    idx = np.arange(n)
+    x, z, vx, vz = np.zeros((4, n))
+    on_rail = np.ones(n, dtype=bool)
+    peaks = np.zeros((len(PEAK_METRICS), n))
+    rx = np.sin(np.radians(angle.ravel()))
+    rz = np.cos(np.radians(angle.ravel()))
+
+    # Thrust and mass depend only on time, so tabulate them once on the
+    # half-step grid RK4 samples instead of interpolating at every evaluation
+    half_steps = np.arange(int(np.ceil(max_time_s / dt)) * 2 + 3) * (dt / 2)
+    thrust_at = np.interp(half_steps, model.time_s, model.thrust_n, right=0.0)
+    mass_at = np.interp(half_steps, model.time_s, model.mass_kg)
+
+    def derivatives(k, t, z, vx, vz):
+        speed = np.hypot(vx, vz)
+        density, speed_of_sound = atmosphere(model, z)
+        mach = speed / speed_of_sound
+        table = model.cd_powered if t < model.burnout_time_s else model.cd_coast
+        cd = np.interp(mach, model.mach_grid, table) * drag
+        force = thrust_factor * thrust_at[k] - half_area * density * speed**2 * cd
+        mass = mass_at[k] + mass_offset
+        # Thrust and drag act along the velocity (a gravity turn) once the
+        # rail is cleared
+        moving = speed > 1e-9
+        ux = np.where(moving, vx / np.where(moving, speed, 1.0), rx)
+        uz = np.where(moving, vz / np.where(moving, speed, 1.0), rz)
+        if railed:
+            # On the rail the force acts along it, gravity only through its
+            # along-rail component, and the rocket cannot slide back off the pad
+            ux = np.where(on_rail, rx, ux)
+            uz = np.where(on_rail, rz, uz)
+        ax = force * ux / mass
+        az = force * uz / mass - model.gravity
+        if railed:
+            along = np.maximum(ax * ux + az * uz, 0.0)
+            ax = np.where(on_rail, along * ux, ax)
+            az = np.where(on_rail, along * uz, az)
+        return ax, az, speed, mach
+
+    step = 0
+    t = 0.0
+    burnout_recorded = False
+    while len(idx) and t < max_time_s:
+        k = 2 * step
+        railed = bool(on_rail.any())
+        # Classic RK4 on (x, z, vx, vz); position derivatives are the velocities
+        a1x, a1z, speed, mach = derivatives(k, t, z, vx, vz)
+        h = dt / 2
+        a2x, a2z, _, _ = derivatives(
+            k + 1, t + h, z + h * vz, vx + h * a1x, vz + h * a1z
+        )
+        a3x, a3z, _, _ = derivatives(
+            k + 1, t + h, z + h * (vz + h * a1z), vx + h * a2x, vz + h * a2z
+        )
+        a4x, a4z, _, _ = derivatives(
+            k + 2, t + dt, z + dt * (vz + h * a2z), vx + dt * a3x, vz + dt * a3z
+        )
+        new_x = x + dt * (vx + dt / 6 * (a1x + a2x + a3x))
+        new_z = z + dt * (vz + dt / 6 * (a1z + a2z + a3z))
+        new_vx = vx + dt / 6 * (a1x + 2 * a2x + 2 * a3x + a4x)
+        new_vz = vz + dt / 6 * (a1z + 2 * a2z + 2 * a3z + a4z)
+        step += 1
+        t = step * dt
+
+        np.maximum(peaks[0], speed, out=peaks[0])
+        np.maximum(peaks[1], np.hypot(a1x, a1z + model.gravity), out=peaks[1])
+        np.maximum(peaks[2], mach, out=peaks[2])
+        if not burnout_recorded and t >= model.burnout_time_s:
+            burnout_recorded = True
+            metrics["burnout_velocity"][idx] = np.hypot(new_vx, new_vz)
+            metrics["burnout_altitude"][idx] = new_z
+
+        if railed:
+            leaving = on_rail & (new_x * rx + new_z * rz >= model.rail_length_m)
+            metrics["rail_exit_velocity"][idx[leaving]] = np.hypot(
+                new_vx[leaving], new_vz[leaving]
+            )
+            on_rail &= ~leaving
+
+        # Apogee: vertical velocity changes sign after lift-off. The peak is
+        # placed where vz, taken as linear over the step, crosses zero.
+        peaked = (new_vz <= 0) & (vz > 0)
+        if np.any(peaked):
+            fraction = vz[peaked] / (vz[peaked] - new_vz[peaked])
+            done = idx[peaked]
+            metrics["apogee"][done] = z[peaked] + 0.5 * vz[peaked] * fraction * dt
+            metrics["time_to_apogee"][done] = t - dt + fraction * dt
+            for name, row in zip(PEAK_METRICS, peaks):
+                metrics[name][done] = row[peaked]
+
+            keep = ~peaked
+            idx, on_rail, peaks = idx[keep], on_rail[keep], peaks[:, keep]
+            new_x, new_z, new_vx, new_vz = (
+                new_x[keep],
+                new_z[keep],
+                new_vx[keep],
+                new_vz[keep],
+            )
+            drag, thrust_factor, mass_offset = (
+                drag[keep],
+                thrust_factor[keep],
+                mass_offset[keep],
+            )
+            rx, rz = rx[keep], rz[keep]
+        x, z, vx, vz = new_x, new_z, new_vx, new_vz
+
+    # Variants still climbing at max_time_s keep NaN apogee but report maxima
+    for name, row in zip(PEAK_METRICS, peaks):
+        metrics[name][idx] = row
+    return metrics
+
+
+def calibrate(model, dt=DEFAULT_TIME_STEP, scales=np.linspace(0.5, 1.5, 101)):
+    """
+    Fit the model's drag scale so its apogee matches the OpenRocket apogee. All
+    candidate scales are integrated in one batch and the match is interpolated.
+    If the OpenRocket apogee is outside the apogees of the candidates, the
+    range is widened up to CALIBRATION_WIDENINGS times.
+    Args:
+        model (AscentModel): Model with reference metrics from OpenRocket.
+        dt (float): Integration time step in seconds.
+        scales (np.array): Candidate drag scales, increasing.
+    Returns:
+        tuple: (calibrated AscentModel, dict metric -> (surrogate, OpenRocket)).
+    Raises:
+        ValueError: If no drag scale in the widened range matches the apogee.
+    """
+    trial = replace(model, drag_scale=1.0)
+    target = model.reference["apogee"]
+    for widening in range(CALIBRATION_WIDENINGS + 1):
+        if widening:
+            scales = np.linspace(scales[0] / 2, scales[-1] * 2, len(scales))
+        apogees = simulate_ascent(trial, drag_scale=scales, dt=dt)["apogee"]
+        valid = np.isfinite(apogees)
+        # np.interp would clamp to the ends of the range without a word
+        if np.any(valid) and apogees[valid].min() <= target <= apogees[valid].max():
+            break
+    else:
+        raise ValueError(
+            f"Cannot calibrate the ascent model: OpenRocket apogee {target:.1f} m "
+            f"is outside the surrogate's apogees for drag scales "
+            f"{scales[0]:.3g}-{scales[-1]:.3g}."
+        )
+    # Apogee falls as drag rises, so reverse for np.interp
+    drag_scale = float(np.interp(target, apogees[valid][::-1], scales[valid][::-1]))
+    calibrated = replace(model, drag_scale=drag_scale)
+    result = simulate_ascent(calibrated, dt=dt)
+    comparison = {
+        name: (float(result[name][0]), value)
+        for name, value in model.reference.items()
+        if name in result
+    }
+    return calibrated, comparison
+
+
+def cached_ascent_model(version="2", refresh=False, dt=DEFAULT_TIME_STEP):
+    """
+    Load the calibrated AscentModel of a rocket version, extracting it from one
+    OpenRocket run and caching it in the version's outputs folder the first time.
+    Args:
+        version (str): Rocket version number.
+        refresh (bool): Re-extract the model from OpenRocket even if it is cached.
+        dt (float): Integration time step used for the calibration.
+    Returns:
+        AscentModel: The calibrated model, or None if the .ork file is missing.
+    """
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, "ascent_model.npz")
+
+    if not refresh and os.path.exists(model_path):
+        model = load_ascent_model(model_path)
+        print(f"[INFO] Loaded ascent model from: {model_path}")
+        return model
+
+    import orlab
+
+    ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return None
+    with orlab.OpenRocketInstance() as instance:
+        helper = orlab.Helper(instance)
+        sim = helper.load_doc(ork_file).getSimulation(0)
+        helper.run_simulation(sim)
+        model = extract_ascent_model(helper, sim)
+    model, comparison = calibrate(model, dt=dt)
+    save_ascent_model(model, model_path)
+    print(f"[INFO] Ascent model saved to: {model_path}")
+    print(f"[INFO] Calibrated drag scale: {model.drag_scale:.4f}")
+    for name, (surrogate, reference) in comparison.items():
+        print(f"[INFO]   {name}: surrogate {surrogate:.2f}, OpenRocket {reference:.2f}")
+    return model
+
+
+def ascent_surrogate_analysis(version="2", refresh=False, dt=DEFAULT_TIME_STEP):
+    """
+    Extract (once) and calibrate the surrogate for a rocket version, then screen
+    a grid of mass offsets, drag scales and launch angles.
+    Args:
+        version (str): Rocket version number.
+        refresh (bool): Re-extract the model from OpenRocket even if it is cached.
+        dt (float): Integration time step in seconds.
+    Returns:
+        pd.DataFrame: One row per screened variant.
+    """
+    model = cached_ascent_model(version, refresh, dt)
+    if model is None:
+        return None
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+
+    # Screen: mass offset x drag scale x launch angle
+    mass_offsets, drag_scales, angles = np.meshgrid(
+        np.linspace(-2.0, 2.0, 41),
+        np.linspace(0.8, 1.2, 11),
+        np.arange(0.0, 12.5, 2.5),
+        indexing="ij",
+    )
+    start = time.perf_counter()
+    result = simulate_ascent(
+        model,
+        mass_offset_kg=mass_offsets.ravel(),
+        drag_scale=drag_scales.ravel(),
+        launch_angle_deg=angles.ravel(),
+        dt=dt,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] Screened {mass_offsets.size} variants in {elapsed * 1000:.0f} ms "
+        f"({elapsed / mass_offsets.size * 1e6:.0f} us per variant)"
+    )
+
+    screen = pd.DataFrame(
+        {
+            "mass_offset_kg": mass_offsets.ravel(),
+            "drag_scale": drag_scales.ravel(),
+            "launch_angle_deg": angles.ravel(),
+            **result,
+        }
+    )
+    screen_path = os.path.join(output_dir, "ascent_surrogate_screen.csv")
+    screen.to_csv(screen_path, index=False)
+    print(f"[INFO] Screen results saved to: {screen_path}")
+    return screen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched ascent surrogate screen.")
+    parser.add_argument("--version", default="2", help="Rocket version number")
+    parser.add_argument(
+        "--refresh", action="store_true", help="Re-extract the model from OpenRocket"
+    )
+    args = parser.parse_args()
+    ascent_surrogate_analysis(args.version, args.refresh)
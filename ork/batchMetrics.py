@@ -0,0 +1,193 @@
+# batchMetrics.py
+
+import numpy as np
+
+from orlab import FlightDataType, FlightEvent
+
+# Ratio of specific heats for air, used to get dynamic pressure from Mach and static pressure
+AIR_HEAT_CAPACITY_RATIO = 1.4
+
+
+def stack_series(runs, flight_data_type):
+    """
+    Pad one flight data type from many runs into a single 2D masked array.
+    Args:
+        runs (list): Per-run dictionaries of flight data arrays (as returned by
+            get_timeseries). A None entry (failed run) or a missing series
+            becomes an empty row.
+        flight_data_type (FlightDataType): The series to stack.
+    Returns:
+        np.ma.MaskedArray: Array of shape (n_runs, longest_run). Padding and
+            non-finite samples are masked.
+    """
+    series = []
+    for run in runs:
+        values = run.get(flight_data_type) if run is not None else None
+        series.append(np.asarray(values if values is not None else (), dtype=float))
+    lengths = np.array([len(s) for s in series], dtype=int)
+    width = int(lengths.max()) if len(lengths) else 0
+
+    # Fill every row in one vectorized assignment instead of a per-run copy loop
+    padding = np.arange(width)[np.newaxis, :] >= lengths[:, np.newaxis]
+    stacked = np.full((len(series), width), np.nan)
+    if width:
+        stacked[~padding] = np.concatenate(series)
+
+    return np.ma.MaskedArray(stacked, mask=padding | ~np.isfinite(stacked))
+
+
+def stack_runs(runs, flight_data_types):
+    """
+    Stack several flight data types from many runs.
+    Args:
+        runs (list): Per-run dictionaries of flight data arrays (or None for failed runs).
+        flight_data_types (list): FlightDataType members to stack.
+    Returns:
+        dict: FlightDataType -> 2D masked array (see stack_series).
+    """
+    return {ftype: stack_series(runs, ftype) for ftype in flight_data_types}
+
+
+def stack_event_times(events_list, flight_event, first=True):
+    """
+    Collect the time of one flight event for every run.
+    Args:
+        events_list (list): Per-run event dictionaries (as returned by get_events), or None.
+        flight_event (FlightEvent): The event to look up.
+        first (bool): Take the earliest occurrence if True, else the latest.
+    Returns:
+        np.array: Event time per run in seconds, NaN where the event did not occur.
+    """
+    pick = min if first else max
+    times = np.full(len(events_list), np.nan)
+    for i, events in enumerate(events_list):
+        occurrences = events.get(flight_event, []) if events else []
+        if occurrences:
+            times[i] = pick(occurrences)
+    return times
+
+
+def value_at_times(time, values, event_times):
+    """
+    Sample each run's series at the data point closest to a per-run time.
+    Args:
+        time (np.ma.MaskedArray): Stacked TYPE_TIME array, shape (n_runs, n).
+        values (np.ma.MaskedArray): Stacked series to sample, same shape as time.
+        event_times (np.array): Time to sample for each run (NaN to skip a run).
+    Returns:
+        np.array: Sampled value per run, NaN where the time or the sample is missing.
+    """
+    n_runs = time.shape[0]
+    result = np.full(n_runs, np.nan)
+    if time.size == 0:
+        return result
+
+    # Time is sorted within each run, so the closest sample is one of the two
+    # neighbours of the insertion point. Counting samples before the event keeps
+    # the temporary to a boolean array rather than a float distance matrix.
+    filled = time.filled(np.inf)
+    rows = np.arange(n_runs)
+    after = np.sum(filled < event_times[:, np.newaxis], axis=1)
+    upper = np.minimum(after, filled.shape[1] - 1)
+    lower = np.maximum(after - 1, 0)
+    take_upper = np.abs(filled[rows, upper] - event_times) < np.abs(
+        event_times - filled[rows, lower]
+    )
+    idx = np.where(take_upper, upper, lower)
+
+    sampled = values[rows, idx]
+    valid = np.isfinite(event_times) & ~np.ma.getmaskarray(sampled)
+    valid &= ~np.ma.getmaskarray(time)[rows, idx]
+    result[valid] = np.ma.getdata(sampled)[valid]
+    return result
+
+
+def value_at_row_max(stacked, values):
+    """
+    Sample a second series at the point where each run's stacked series peaks.
+    Args:
+        stacked (np.ma.MaskedArray): Series whose per-row maximum locates the sample.
+        values (np.ma.MaskedArray): Series to sample, same shape as stacked.
+    Returns:
+        np.array: Sampled value per run, NaN for runs with no valid data.
+    """
+    result = np.full(stacked.shape[0], np.nan)
+    if stacked.size == 0:
+        return result
+    idx = np.argmax(stacked.filled(-np.inf), axis=1)
+    rows = np.arange(stacked.shape[0])
+    valid = ~np.ma.getmaskarray(stacked).all(axis=1)
+    valid &= ~np.ma.getmaskarray(values)[rows, idx]
+    result[valid] = np.ma.getdata(values)[rows, idx][valid]
+    return result
+
+
+def _row_max(stacked):
+    """Max of each row of a masked array, NaN for rows with no valid data."""
+    if stacked.size == 0:
+        return np.full(stacked.shape[0], np.nan)
+    return np.ma.max(stacked, axis=1).filled(np.nan)
+
+
+def _row_min(stacked):
+    """Min of each row of a masked array, NaN for rows with no valid data."""
+    if stacked.size == 0:
+        return np.full(stacked.shape[0], np.nan)
+    return np.ma.min(stacked, axis=1).filled(np.nan)
+
+
+def batch_flight_metrics(stacked, events_list=None):
+    """
+    Compute scalar flight metrics for every stacked run in single NumPy reductions.
+    Only metrics whose input series (and events) are available are returned.
+    Args:
+        stacked (dict): FlightDataType -> 2D masked array, as returned by stack_runs.
+        events_list (list, optional): Per-run event dictionaries, needed for the
+            event-relative metrics (burnout, rail exit and ground hit velocity).
+    Returns:
+        dict: Metric name -> np.array with one value per run (NaN where unavailable).
+    """
+    metrics = {}
+    time = stacked.get(FlightDataType.TYPE_TIME)
+    altitude = stacked.get(FlightDataType.TYPE_ALTITUDE)
+    velocity = stacked.get(FlightDataType.TYPE_VELOCITY_TOTAL)
+    acceleration = stacked.get(FlightDataType.TYPE_ACCELERATION_TOTAL)
+    mach = stacked.get(FlightDataType.TYPE_MACH_NUMBER)
+    pressure = stacked.get(FlightDataType.TYPE_AIR_PRESSURE)
+    stability = stacked.get(FlightDataType.TYPE_STABILITY)
+
+    if altitude is not None:
+        metrics["apogee"] = _row_max(altitude)
+        if time is not None:
+            metrics["time_to_apogee"] = value_at_row_max(altitude, time)
+    if velocity is not None:
+        metrics["max_velocity"] = _row_max(velocity)
+    if acceleration is not None:
+        metrics["max_acceleration"] = _row_max(acceleration)
+    if mach is not None:
+        metrics["max_mach"] = _row_max(mach)
+        if pressure is not None:
+            # q = 1/2 * rho * v^2 = 1/2 * gamma * p * M^2
+            dynamic_pressure = 0.5 * AIR_HEAT_CAPACITY_RATIO * pressure * mach**2
+            metrics["max_q"] = _row_max(dynamic_pressure)
+    if stability is not None:
+        metrics["min_stability"] = _row_min(stability)
+
+    if events_list is not None and time is not None and velocity is not None:
+        burnout_times = stack_event_times(events_list, FlightEvent.BURNOUT)
+        rail_exit_times = stack_event_times(events_list, FlightEvent.LAUNCHROD)
+        ground_hit_times = stack_event_times(events_list, FlightEvent.GROUND_HIT)
+        metrics["burnout_time"] = burnout_times
+        metrics["burnout_velocity"] = value_at_times(time, velocity, burnout_times)
+        metrics["rail_exit_velocity"] = value_at_times(
+            time, velocity, rail_exit_times
+        )
+        metrics["ground_hit_velocity"] = value_at_times(
+            time, velocity, ground_hit_times
+        )
+        if altitude is not None:
+            metrics["burnout_altitude"] = value_at_times(
+                time, altitude, burnout_times
+            )
+
+    return metrics
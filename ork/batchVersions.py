@@ -0,0 +1,266 @@
+# batchVersions.py
+
+import argparse
+import contextlib
+import csv
+import glob
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import time
+import traceback
+
+from hyperion import ANALYSES, load_analysis, ork_path
+
+VERSION_PATTERN = re.compile(r"hyperion_II_v(\d+)\.ork$")
+SUMMARY_PATH = os.path.join("ork", "outputs", "version_summary.csv")
+
+# Versioned analyses that run unattended and return None when they fail
+BATCH_ANALYSES = [
+    "lc-prog-update",
+    "multi-plot",
+    "ascent-surrogate",
+    "airbrake-table",
+    "airbrake-tuning",
+    "descent-drift",
+    "global-sensitivity",
+]
+
+# Metrics from lcProgUpdate1's summary shown in the cross-version table
+SUMMARY_METRICS = [
+    "apogee",
+    "time_to_apogee",
+    "max_velocity",
+    "max_acceleration",
+    "max_mach",
+    "rail_exit_velocity",
+    "burnout_velocity",
+    "burnout_altitude",
+]
+
+
+def discover_versions():
+    """
+    Returns:
+        list: Version numbers of every ork/hyperion_II_v{N}.ork file, in numeric order.
+    """
+    versions = []
+    for path in glob.glob(os.path.join("ork", "hyperion_II_v*.ork")):
+        match = VERSION_PATTERN.search(os.path.basename(path))
+        if match:
+            versions.append(match.group(1))
+    return sorted(versions, key=int)
+
+
+def parse_version(value):
+    """
+    Args:
+        value (str): A version number ("3", "v3") or an .ork path (hyperion_II_v3.ork).
+    Returns:
+        str: The version number.
+    """
+    match = VERSION_PATTERN.search(os.path.basename(value))
+    if match:
+        return match.group(1)
+    version = value.lower().lstrip("v")
+    if not version.isdigit():
+        raise argparse.ArgumentTypeError(f"Not a version or .ork file: {value}")
+    return version
+
+
+def run_job(job):
+    """
+    Run one analysis for one version. Executed in its own worker process, since
+    a process can host only one JVM, with output captured to a log file in the
+    version's output directory.
+    Args:
+        job (tuple): (version, analysis command).
+    Returns:
+        dict: version, analysis, status ("ok" or "failed"), seconds, log path,
+            the analysis' return value and the error if it failed. A None
+            return counts as a failure: the analyses report errors by
+            printing them and returning early.
+    """
+    version, command = job
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    os.makedirs(output_dir, exist_ok=True)
+    log_path = os.path.join(output_dir, f"batch_{command}.log")
+
+    start = time.perf_counter()
+    result = {"version": version, "analysis": command, "log": log_path}
+    with open(log_path, "w") as log, contextlib.redirect_stdout(
+        log
+    ), contextlib.redirect_stderr(log):
+        try:
+            analysis = load_analysis(command)
+            result["value"] = analysis(version=version)
+            if result["value"] is None:
+                result["status"] = "failed"
+                result["error"] = "Analysis did not complete (see log)"
+            else:
+                result["status"] = "ok"
+        except Exception as e:
+            traceback.print_exc()
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _init_worker():
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _job_process(job, results):
+    """Process target: run one job and send its result back to the driver."""
+    _init_worker()
+    results.put(run_job(job))
+
+
+def run_batch(versions, analyses, workers=2):
+    """
+    Run every requested analysis for every version, up to `workers` at a time.
+    Args:
+        versions (list): Version numbers.
+        analyses (list): Analysis commands (keys of hyperion.ANALYSES).
+        workers (int): Maximum number of concurrent worker processes (JVMs).
+    Returns:
+        results (list): run_job results in completion order.
+    """
+    pending = [(version, command) for version in versions for command in analyses]
+    pending.reverse()  # Popped from the end, in order
+    results = []
+    # Fresh process per job: JPype cannot start a second JVM in a process.
+    # Not a Pool: its workers are daemonic and cannot start the worker
+    # processes of the sweep analyses.
+    context = multiprocessing.get_context("spawn")
+    finished = context.Queue()
+    running = {}  # job -> (process, start time)
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.pop()
+            process = context.Process(target=_job_process, args=(job, finished))
+            process.start()
+            running[job] = (process, time.perf_counter())
+        try:
+            result = finished.get(timeout=1.0)
+        except queue.Empty:
+            # A process that died without a result (e.g. a JVM crash)
+            for job, (process, start) in list(running.items()):
+                if process.exitcode not in (None, 0):
+                    version, command = job
+                    result = {
+                        "version": version,
+                        "analysis": command,
+                        "log": os.path.join(
+                            "ork", f"outputs-v{version}", f"batch_{command}.log"
+                        ),
+                        "status": "failed",
+                        "error": f"Process exited with code {process.exitcode}",
+                        "seconds": time.perf_counter() - start,
+                    }
+                    break
+            else:
+                continue
+        process, _ = running.pop((result["version"], result["analysis"]))
+        process.join()
+
+        status = result["status"].upper()
+        print(
+            f"[INFO] v{result['version']} {result['analysis']}: {status} "
+            f"in {result['seconds']:.1f} s (log: {result['log']})"
+        )
+        if result["status"] != "ok":
+            print(f"[ERROR]   {result['error']}")
+        results.append(result)
+    return results
+
+
+def write_summary(results, versions, summary_path=SUMMARY_PATH):
+    """
+    Write one row per version with the status of each analysis and the key
+    flight metrics from lcProgUpdate1, and print it as a table.
+    Args:
+        results (list): run_job results.
+        versions (list): Version numbers, in row order.
+        summary_path (str): Output .csv path.
+    Returns:
+        rows (list): The summary rows.
+    """
+    analyses = sorted({r["analysis"] for r in results}, key=list(ANALYSES).index)
+    rows = []
+    for version in versions:
+        row = {"version": f"v{version}"}
+        for result in results:
+            if result["version"] != version:
+                continue
+            row[f"{result['analysis']}_status"] = result["status"]
+            if result["analysis"] == "lc-prog-update" and result.get("value"):
+                for metric in SUMMARY_METRICS:
+                    row[metric] = result["value"].get(metric, "")
+        rows.append(row)
+
+    fieldnames = ["version"] + [f"{a}_status" for a in analyses]
+    if "lc-prog-update" in analyses:
+        fieldnames += SUMMARY_METRICS
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    widths = [max(len(name), 10) for name in fieldnames]
+    print("  ".join(name.rjust(w) for name, w in zip(fieldnames, widths)))
+    for row in rows:
+        cells = []
+        for name, w in zip(fieldnames, widths):
+            value = row.get(name, "")
+            cells.append(
+                f"{value:{w}.2f}" if isinstance(value, float) else str(value).rjust(w)
+            )
+        print("  ".join(cells))
+    print(f"[INFO] Version summary saved to: {summary_path}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run analyses for several rocket versions without prompts (from the repository root)."
+    )
+    parser.add_argument(
+        "versions",
+        nargs="*",
+        type=parse_version,
+        help="Versions or .ork files, e.g. 2 3 or ork/hyperion_II_v3.ork (default: all)",
+    )
+    parser.add_argument(
+        "--analyses",
+        nargs="+",
+        choices=BATCH_ANALYSES,
+        default=["lc-prog-update", "multi-plot"],
+        help="Analyses to run for each version",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Concurrent analyses (one JVM each)"
+    )
+    parser.add_argument("--summary", default=SUMMARY_PATH, help="Summary .csv path")
+    args = parser.parse_args()
+
+    versions = args.versions or discover_versions()
+    missing = [v for v in versions if not os.path.exists(ork_path(v))]
+    for version in missing:
+        print(f"[ERROR] The .ork file was not found at path: {ork_path(version)}")
+    versions = [v for v in versions if v not in missing]
+    if not versions:
+        return 1
+
+    results = run_batch(versions, args.analyses, args.workers)
+    write_summary(results, versions, args.summary)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
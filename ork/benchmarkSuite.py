@@ -0,0 +1,456 @@
+# benchmarkSuite.py
+
+import argparse
+import contextlib
+import csv
+import datetime
+import importlib.util
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")  # Benchmarks never open windows
+
+from orlab import FlightDataType, FlightEvent
+
+from batchMetrics import batch_flight_metrics, stack_runs
+from fastTimeseries import get_timeseries_fast
+from lcProgUpdate1 import compute_and_write_key_info, generate_plots
+
+HISTORY_PATH = os.path.join("ork", "outputs", "benchmark_history.csv")
+HISTORY_COLUMNS = ["timestamp", "commit", "benchmark", "best_s", "median_s", "repeats"]
+
+# A benchmark regresses when its median is this much slower than the median of
+# its recent history
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+HISTORY_WINDOW = 5
+
+ORK_FILES = {
+    "v2": os.path.join("ork", "hyperion_II_v2.ork"),
+    "v3": os.path.join("ork", "hyperion_II_v3.ork"),
+}
+FLIGHT_LOGS = [
+    os.path.join("flight-data", "2025-08-21_primary_blueraven_lr.csv"),
+    os.path.join("flight-data", "2025-08-21_redundant_telemega.csv"),
+]
+COMPRESSION_TEST_DIR = os.path.join("testing", "2024-11-24_compression_al_couplers")
+
+# The series pulled by lcProgUpdate1
+LC_PROG_UPDATE_TYPES = [
+    FlightDataType.TYPE_TIME,
+    FlightDataType.TYPE_ALTITUDE,
+    FlightDataType.TYPE_VELOCITY_TOTAL,
+    FlightDataType.TYPE_ACCELERATION_TOTAL,
+    FlightDataType.TYPE_THRUST_FORCE,
+    FlightDataType.TYPE_DRAG_FORCE,
+    FlightDataType.TYPE_MASS,
+    FlightDataType.TYPE_MACH_NUMBER,
+    FlightDataType.TYPE_AOA,
+    FlightDataType.TYPE_CG_LOCATION,
+    FlightDataType.TYPE_CP_LOCATION,
+]
+
+
+def time_call(func, repeat):
+    """
+    Time repeated calls of a function.
+    Args:
+        func (callable): Function to call with no arguments.
+        repeat (int): Number of timed calls.
+    Returns:
+        list: Wall time of each call in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name, timings):
+    """Reduce a list of timings to a benchmark result row."""
+    return {
+        "benchmark": name,
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "repeats": len(timings),
+    }
+
+
+def run_benchmark(results, name, func, repeat):
+    """
+    Time a benchmark and append its result row; a failing benchmark is reported
+    and skipped so the rest of the suite still runs.
+    Args:
+        results (list): Result rows to append to.
+        name (str): Benchmark name.
+        func (callable): Function to call with no arguments.
+        repeat (int): Number of timed calls.
+    """
+    try:
+        results.append(summarize(name, time_call(func, repeat)))
+    except Exception as e:
+        print(f"[ERROR] Benchmark {name} failed: {e}")
+
+
+def synthetic_flight(n_points=5000):
+    """
+    Build a smooth flight profile with the series and events lcProgUpdate1 expects,
+    so metric and plotting benchmarks run without OpenRocket.
+    Args:
+        n_points (int): Number of samples.
+    Returns:
+        data (dict): FlightDataType -> np.array.
+        events (dict): FlightEvent -> list of times.
+    """
+    time_s = np.linspace(0.0, 120.0, n_points)
+    burnout, apogee, main = 3.5, 25.0, 90.0
+    thrust = np.where(time_s < burnout, 2500.0, 0.0)
+    velocity = np.where(
+        time_s < apogee,
+        300.0 * np.sin(np.pi * np.clip(time_s, 0, apogee) / (2 * apogee)) ** 0.3,
+        np.where(time_s < main, 30.0, 6.0),
+    )
+    altitude = 3000.0 * np.sin(np.pi * np.clip(time_s, 0, 2 * apogee) / (2 * apogee))
+    altitude = np.where(time_s < apogee, altitude, 3000.0 - 30.0 * (time_s - apogee))
+    altitude = np.clip(altitude, 0.0, None)
+    data = {
+        FlightDataType.TYPE_TIME: time_s,
+        FlightDataType.TYPE_ALTITUDE: altitude,
+        FlightDataType.TYPE_VELOCITY_TOTAL: velocity,
+        FlightDataType.TYPE_ACCELERATION_TOTAL: np.gradient(velocity, time_s),
+        FlightDataType.TYPE_THRUST_FORCE: thrust,
+        FlightDataType.TYPE_DRAG_FORCE: 0.002 * velocity**2,
+        FlightDataType.TYPE_MASS: np.where(time_s < burnout, 25.0 - time_s, 21.5),
+        FlightDataType.TYPE_MACH_NUMBER: velocity / 340.0,
+        FlightDataType.TYPE_AOA: np.zeros_like(time_s),
+        FlightDataType.TYPE_CG_LOCATION: np.full_like(time_s, 1.8),
+        FlightDataType.TYPE_CP_LOCATION: np.full_like(time_s, 2.2),
+        FlightDataType.TYPE_STABILITY: np.full_like(time_s, 2.5),
+    }
+    events = {
+        FlightEvent.LAUNCH: [0.0],
+        FlightEvent.IGNITION: [0.0],
+        FlightEvent.LIFTOFF: [0.1],
+        FlightEvent.LAUNCHROD: [0.4],
+        FlightEvent.BURNOUT: [burnout],
+        FlightEvent.APOGEE: [apogee],
+        FlightEvent.RECOVERY_DEVICE_DEPLOYMENT: [apogee, main],
+        FlightEvent.GROUND_HIT: [115.0],
+        FlightEvent.SIMULATION_END: [115.0],
+    }
+    return data, events
+
+
+def load_compression_parser():
+    """Import parse_test_file from the compression test script (its folder is not a package)."""
+    script = os.path.join(COMPRESSION_TEST_DIR, "visualizeCompressionAlCouplers.py")
+    spec = importlib.util.spec_from_file_location("visualizeCompressionAlCouplers", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.parse_test_file
+
+
+def read_flight_log(path):
+    """Parse a flight computer CSV export into a DataFrame."""
+    return pd.read_csv(path, skipinitialspace=True, low_memory=False)
+
+
+def python_benchmarks(repeat):
+    """
+    Benchmarks that need only Python packages; these always run.
+    Args:
+        repeat (int): Timed calls per benchmark.
+    Returns:
+        list: Result rows.
+    """
+    results = []
+    data, events = synthetic_flight()
+
+    run_benchmark(
+        results,
+        "metrics_key_info",
+        lambda: compute_and_write_key_info(data, events, io.StringIO()),
+        repeat,
+    )
+
+    sweep_runs = [data] * 1000
+    sweep_types = [
+        FlightDataType.TYPE_TIME,
+        FlightDataType.TYPE_ALTITUDE,
+        FlightDataType.TYPE_VELOCITY_TOTAL,
+        FlightDataType.TYPE_ACCELERATION_TOTAL,
+        FlightDataType.TYPE_MACH_NUMBER,
+        FlightDataType.TYPE_STABILITY,
+    ]
+    run_benchmark(
+        results,
+        "metrics_batch_1000_runs",
+        lambda: batch_flight_metrics(
+            stack_runs(sweep_runs, sweep_types), [events] * len(sweep_runs)
+        ),
+        repeat,
+    )
+
+    with tempfile.TemporaryDirectory() as plots_dir:
+
+        def plot_all():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_plots(
+                    data[FlightDataType.TYPE_TIME],
+                    data[FlightDataType.TYPE_ALTITUDE],
+                    data[FlightDataType.TYPE_VELOCITY_TOTAL],
+                    data[FlightDataType.TYPE_THRUST_FORCE],
+                    events,
+                    io.StringIO(),
+                    plots_dir,
+                )
+
+        run_benchmark(results, "plots_lcProgUpdate1", plot_all, repeat)
+
+    for path in FLIGHT_LOGS:
+        if os.path.exists(path):
+            name = "parse_flight_log_" + os.path.splitext(os.path.basename(path))[0]
+            run_benchmark(results, name, lambda: read_flight_log(path), repeat)
+
+    parse_test_file = load_compression_parser()
+    for file_name in ["NOV2224_first.txt", "NOV2224_second.txt"]:
+        path = os.path.join(COMPRESSION_TEST_DIR, file_name)
+
+        def parse_quietly():
+            with contextlib.redirect_stdout(io.StringIO()):
+                parse_test_file(path)
+
+        name = "parse_compression_" + os.path.splitext(file_name)[0]
+        run_benchmark(results, name, parse_quietly, repeat)
+
+    return results
+
+
+def java_available():
+    """True if a Java runtime can be found for OpenRocket."""
+    return shutil.which("java") is not None or bool(os.environ.get("JAVA_HOME"))
+
+
+def simulation_benchmarks(repeat):
+    """
+    Benchmarks that start OpenRocket; skipped when Java is not installed.
+    JPype can only start the JVM once per process, so JVM startup is timed once.
+    Args:
+        repeat (int): Timed calls per benchmark.
+    Returns:
+        list: Result rows.
+    """
+    import orlab
+
+    results = []
+    start = time.perf_counter()
+    with orlab.OpenRocketInstance() as instance:
+        results.append(summarize("jvm_startup", [time.perf_counter() - start]))
+        helper = orlab.Helper(instance)
+
+        docs = {}
+        for version, ork_file in ORK_FILES.items():
+            if not os.path.exists(ork_file):
+                print(f"[WARNING] Skipping load benchmark, file not found: {ork_file}")
+                continue
+            run_benchmark(
+                results, f"load_doc_{version}", lambda: helper.load_doc(ork_file), repeat
+            )
+            try:
+                docs[version] = helper.load_doc(ork_file)
+            except Exception as e:
+                print(f"[ERROR] Failed to load {ork_file}: {e}")
+
+        if not docs:
+            return results
+        version, doc = sorted(docs.items())[-1]
+        sim = doc.getSimulation(0)
+        run_benchmark(
+            results,
+            f"run_simulation_{version}",
+            lambda: helper.run_simulation(sim),
+            repeat,
+        )
+        run_benchmark(
+            results,
+            f"get_timeseries_11_types_{version}",
+            lambda: helper.get_timeseries(sim, LC_PROG_UPDATE_TYPES),
+            repeat,
+        )
+        run_benchmark(
+            results,
+            f"get_timeseries_fast_11_types_{version}",
+            lambda: get_timeseries_fast(helper, sim, LC_PROG_UPDATE_TYPES),
+            repeat,
+        )
+    return results
+
+
+def current_commit():
+    """Short hash of the checked out commit, or an empty string outside git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_history(history_path):
+    """
+    Returns:
+        dict: Benchmark name -> list of past median timings, oldest first.
+    """
+    history = {}
+    if not os.path.exists(history_path):
+        return history
+    with open(history_path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                history.setdefault(row["benchmark"], []).append(float(row["median_s"]))
+            except (KeyError, ValueError):
+                continue
+    return history
+
+
+def check_regressions(results, history, threshold):
+    """
+    Compare each result against the median of its recent history.
+    Args:
+        results (list): Result rows from this session.
+        history (dict): Output of load_history (before this session is recorded).
+        threshold (float): Allowed slowdown ratio.
+    Returns:
+        list: (benchmark, current median, baseline median) for every regression.
+    """
+    regressions = []
+    for result in results:
+        past = history.get(result["benchmark"], [])[-HISTORY_WINDOW:]
+        if not past:
+            continue
+        baseline = statistics.median(past)
+        result["baseline_s"] = baseline
+        if baseline > 0 and result["median_s"] > threshold * baseline:
+            regressions.append((result["benchmark"], result["median_s"], baseline))
+    return regressions
+
+
+def record_history(results, history_path):
+    """Append this session's results to the history file."""
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    is_new = not os.path.exists(history_path)
+    timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+    commit = current_commit()
+    with open(history_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=HISTORY_COLUMNS, extrasaction="ignore")
+        if is_new:
+            writer.writeheader()
+        for result in results:
+            writer.writerow({"timestamp": timestamp, "commit": commit, **result})
+
+
+def run_benchmarks(
+    repeat=5,
+    skip_simulation=False,
+    history_path=HISTORY_PATH,
+    threshold=DEFAULT_REGRESSION_THRESHOLD,
+    record=True,
+):
+    """
+    Run the benchmark suite, compare against history and record the results.
+    Args:
+        repeat (int): Timed calls per benchmark.
+        skip_simulation (bool): Skip the OpenRocket benchmarks even if Java is present.
+        history_path (str): CSV file holding past results.
+        threshold (float): Slowdown ratio that counts as a regression.
+        record (bool): Append this session to the history file.
+    Returns:
+        list: (benchmark, current median, baseline median) for every regression.
+    """
+    results = python_benchmarks(repeat)
+    if skip_simulation:
+        print("[INFO] Simulation benchmarks skipped on request.")
+    elif not java_available():
+        print("[INFO] Java not found, simulation benchmarks skipped.")
+    else:
+        # Keep the Python results if OpenRocket fails to start or load the rocket
+        try:
+            results += simulation_benchmarks(repeat)
+        except Exception as e:
+            print(f"[ERROR] Simulation benchmarks failed: {type(e).__name__}: {e}")
+
+    regressions = check_regressions(results, load_history(history_path), threshold)
+
+    print(f"{'Benchmark':<50} {'Best (s)':>10} {'Median (s)':>11} {'Baseline (s)':>13}")
+    for result in results:
+        baseline = result.get("baseline_s")
+        baseline_text = f"{baseline:13.4f}" if baseline is not None else f"{'-':>13}"
+        print(
+            f"{result['benchmark']:<50} {result['best_s']:10.4f} {result['median_s']:11.4f} {baseline_text}"
+        )
+
+    for name, current, baseline in regressions:
+        print(
+            f"[WARNING] Regression in {name}: {current:.4f} s vs baseline {baseline:.4f} s "
+            f"({current / baseline:.2f}x, threshold {threshold:.2f}x)"
+        )
+
+    if record:
+        record_history(results, history_path)
+        print(f"[INFO] Results appended to: {history_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the simulation and analysis hot paths. Run from the repository root."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per benchmark.")
+    parser.add_argument(
+        "--skip-simulation",
+        action="store_true",
+        help="Skip the OpenRocket benchmarks even if Java is installed.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Slowdown ratio against recent history that counts as a regression.",
+    )
+    parser.add_argument("--history", default=HISTORY_PATH, help="History CSV file.")
+    parser.add_argument(
+        "--no-record", action="store_true", help="Do not append results to the history."
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 if any benchmark regressed.",
+    )
+    args = parser.parse_args()
+
+    regressions = run_benchmarks(
+        repeat=args.repeat,
+        skip_simulation=args.skip_simulation,
+        history_path=args.history,
+        threshold=args.threshold,
+        record=not args.no_record,
+    )
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,595 @@
+# descentDrift.py
+
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.patches import Ellipse
+
+from orlab import FlightDataType, FlightEvent
+
+from ascentSurrogate import atmosphere
+from windProfiles import load_wind_table, wind_at
+
+# Series read once from a full OpenRocket flight to build the descent model
+DESCENT_DATA_TYPES = [
+    FlightDataType.TYPE_TIME,
+    FlightDataType.TYPE_ALTITUDE,
+    FlightDataType.TYPE_VELOCITY_Z,
+    FlightDataType.TYPE_POSITION_X,
+    FlightDataType.TYPE_POSITION_Y,
+    FlightDataType.TYPE_AIR_DENSITY,
+    FlightDataType.TYPE_AIR_TEMPERATURE,
+    FlightDataType.TYPE_AIR_PRESSURE,
+    FlightDataType.TYPE_GRAVITY,
+    FlightDataType.TYPE_WIND_VELOCITY,
+    FlightDataType.TYPE_WIND_DIRECTION,
+]
+
+# Skip the opening shock and inflation when measuring descent rates
+SETTLE_TIME_S = 2.0
+# Altitude resolution of the drift quadrature
+QUADRATURE_STEP_M = 1.0
+# Time constants (descent rate / g) integrated after apogee and main deployment
+TRANSIENT_TAUS = 12
+ELLIPSE_PROBABILITIES = (0.5, 0.9, 0.99)
+OPENROCKET_WIND_LEVELS = 200
+
+
+@dataclass
+class DescentModel:
+    """
+    Recovery descent of one rocket, extracted from a full OpenRocket flight:
+    the apogee state, the drogue and main descent rates and the main deployment
+    altitude. Descent rates are stored as v * sqrt(rho), which stays constant
+    at terminal velocity as the air thickens, so the rate at any altitude is
+    that coefficient / sqrt(rho). Positions are east (x) and north (y) of the
+    launch site.
+    """
+
+    apogee_time_s: float
+    apogee_altitude_m: float
+    apogee_x_m: float
+    apogee_y_m: float
+    apogee_vx: float
+    apogee_vy: float
+    drogue_rate_coefficient: float
+    main_rate_coefficient: float
+    main_altitude_m: float
+    site_temperature_k: float
+    site_pressure_pa: float
+    gravity: float
+    reference: dict = field(default_factory=dict)  # OpenRocket descent results
+
+
+def _rate_coefficient(t, vz, density, start, end):
+    """Median v * sqrt(rho) between two times, after the deployment transient."""
+    window = (t >= start + SETTLE_TIME_S) & (t <= end) & (vz < 0)
+    if not np.any(window):
+        window = (t >= start) & (t <= end) & (vz < 0)
+    return float(np.median(-vz[window] * np.sqrt(density[window])))
+
+
+def descent_model_from_timeseries(data, events):
+    """
+    Build a DescentModel from one full flight. The first recovery device
+    deployment is taken as the drogue and the last as the main, as in
+    lcProgUpdate1.
+    Args:
+        data (dict): DESCENT_DATA_TYPES -> np.array, as returned by get_timeseries.
+        events (dict): FlightEvent -> list of times, as returned by get_events.
+    Returns:
+        DescentModel: The model, with the OpenRocket descent as reference.
+    """
+    t = data[FlightDataType.TYPE_TIME]
+    altitude = data[FlightDataType.TYPE_ALTITUDE]
+    vz = data[FlightDataType.TYPE_VELOCITY_Z]
+    x = data[FlightDataType.TYPE_POSITION_X]
+    y = data[FlightDataType.TYPE_POSITION_Y]
+    density = data[FlightDataType.TYPE_AIR_DENSITY]
+
+    apogee_times = events.get(FlightEvent.APOGEE, [])
+    apogee_time = (
+        min(apogee_times) if apogee_times else float(t[np.nanargmax(altitude)])
+    )
+    ground_hits = events.get(FlightEvent.GROUND_HIT, [])
+    ground_time = min(ground_hits) if ground_hits else float(t[-1])
+    deployments = sorted(events.get(FlightEvent.RECOVERY_DEVICE_DEPLOYMENT, []))
+    drogue_time = deployments[0] if deployments else apogee_time
+    main_time = deployments[-1] if len(deployments) > 1 else None
+
+    drogue_end = main_time if main_time is not None else ground_time
+    drogue = _rate_coefficient(t, vz, density, drogue_time, drogue_end)
+    if main_time is None:
+        main, main_altitude = drogue, 0.0
+    else:
+        main = _rate_coefficient(t, vz, density, main_time, ground_time)
+        main_altitude = float(np.interp(main_time, t, altitude))
+
+    apogee_index = int(np.argmin(np.abs(t - apogee_time)))
+    at = lambda series, time_s: float(np.interp(time_s, t, series))
+    return DescentModel(
+        apogee_time_s=float(apogee_time),
+        apogee_altitude_m=at(altitude, apogee_time),
+        apogee_x_m=at(x, apogee_time),
+        apogee_y_m=at(y, apogee_time),
+        apogee_vx=float(np.gradient(x, t)[apogee_index]),
+        apogee_vy=float(np.gradient(y, t)[apogee_index]),
+        drogue_rate_coefficient=drogue,
+        main_rate_coefficient=main,
+        main_altitude_m=main_altitude,
+        site_temperature_k=float(data[FlightDataType.TYPE_AIR_TEMPERATURE][0]),
+        site_pressure_pa=float(data[FlightDataType.TYPE_AIR_PRESSURE][0]),
+        gravity=float(np.nanmedian(data[FlightDataType.TYPE_GRAVITY])),
+        reference={
+            "descent_time_s": float(ground_time - apogee_time),
+            "landing_x_m": at(x, ground_time),
+            "landing_y_m": at(y, ground_time),
+        },
+    )
+
+
+def openrocket_wind_profile(data, model):
+    """
+    The wind OpenRocket applied during the descent, as a profile by altitude.
+    OpenRocket records the speed and the direction the wind blows from; the
+    profile holds the flow components (towards east and north).
+    Args:
+        data (dict): DESCENT_DATA_TYPES -> np.array of the same flight.
+        model (DescentModel): Model extracted from that flight.
+    Returns:
+        tuple: (altitudes, east, north) arrays on OPENROCKET_WIND_LEVELS
+            evenly spaced levels.
+    """
+    t = data[FlightDataType.TYPE_TIME]
+    descent = t >= model.apogee_time_s
+    altitude = data[FlightDataType.TYPE_ALTITUDE][descent]
+    speed = data[FlightDataType.TYPE_WIND_VELOCITY][descent]
+    direction = data[FlightDataType.TYPE_WIND_DIRECTION][descent]
+    order = np.argsort(altitude)
+    levels = np.linspace(0.0, float(altitude.max()), OPENROCKET_WIND_LEVELS)
+    return (
+        levels,
+        np.interp(levels, altitude[order], -speed[order] * np.sin(direction[order])),
+        np.interp(levels, altitude[order], -speed[order] * np.cos(direction[order])),
+    )
+
+
+def descent_rate(model, altitude_m):
+    """
+    Args:
+        model (DescentModel): Descent model.
+        altitude_m (np.array): Altitude above the launch site.
+    Returns:
+        np.array: Descent speed (positive) under the drogue or main at each altitude.
+    """
+    density, _ = atmosphere(model, altitude_m)
+    coefficient = np.where(
+        altitude_m > model.main_altitude_m,
+        model.drogue_rate_coefficient,
+        model.main_rate_coefficient,
+    )
+    return coefficient / np.sqrt(density)
+
+
+def _level_weights(points, levels, values):
+    """
+    Spread values at points onto profile levels so that weights @ profile equals
+    sum(values * np.interp(points, levels, profile)) for any profile.
+    """
+    position = np.interp(points, levels, np.arange(len(levels)))
+    lower = np.minimum(position.astype(int), len(levels) - 2)
+    fraction = position - lower
+    return np.bincount(
+        lower, weights=values * (1 - fraction), minlength=len(levels)
+    ) + np.bincount(lower + 1, weights=values * fraction, minlength=len(levels))
+
+
+def _transient_lag(rate, gravity, velocity, steps_per_tau=20):
+    """
+    Fall under quadratic drag, at constant density and relative to still air,
+    from an initial velocity until it has settled at the terminal descent rate.
+    Compared with a fall at the terminal rate from the start, returns how much
+    later the rocket reaches the same altitude and how far it moves sideways
+    through the air on the way. Batched over initial velocities.
+    Args:
+        rate (float): Terminal descent rate in m/s.
+        gravity (float): Gravitational acceleration.
+        velocity (np.array): Initial (horizontal x, horizontal y, vertical)
+            velocities relative to the air, shape (3, n).
+        steps_per_tau (int): RK4 steps per time constant rate / g.
+    Returns:
+        tuple: (time lag in s, sideways displacement (2, n) in m).
+    """
+    tau = rate / gravity
+    k = gravity / rate**2
+    dt = tau / steps_per_tau
+    gravity_vector = np.array([[0.0], [0.0], [gravity]])
+
+    def acceleration(v):
+        return -k * np.linalg.norm(v, axis=0) * v - gravity_vector
+
+    v = np.array(velocity, dtype=float)
+    position = np.zeros_like(v)
+    steps = TRANSIENT_TAUS * steps_per_tau
+    for _ in range(steps):
+        a1 = acceleration(v)
+        a2 = acceleration(v + dt / 2 * a1)
+        a3 = acceleration(v + dt / 2 * a2)
+        a4 = acceleration(v + dt * a3)
+        position += dt * (v + dt / 6 * (a1 + a2 + a3))
+        v += dt / 6 * (a1 + 2 * a2 + 2 * a3 + a4)
+    # Height above the terminal-rate path, expressed as time at that rate
+    lag = (position[2] + rate * steps * dt) / rate
+    return lag, position[:2]
+
+
+def drift_weights(model, altitudes_m):
+    """
+    Reduce the steady part of the descent to one weight per wind profile
+    level. At the terminal descent rate the vertical motion does not depend on
+    the wind, and the rocket drifts with it. The drift is then the integral of
+    wind(z) / descent_rate(z) dz from apogee to the ground. With linear
+    interpolation between levels that is wind_levels @ weights, so any number
+    of profiles on the same levels drift in one matrix product. Two smaller
+    terms are also linear in the wind and go into the same weights: the lag
+    of the rocket behind the wind through shear, and the extra time spent
+    while the main slows the rocket down.
+    Args:
+        model (DescentModel): Descent model.
+        altitudes_m (np.array): Increasing altitudes of the wind profile levels
+            (at least 2; the end values hold outside them).
+    Returns:
+        tuple: (weights in seconds per level, steady descent time in s).
+    """
+    altitudes_m = np.asarray(altitudes_m, dtype=float)
+    n_points = max(int(np.ceil(model.apogee_altitude_m / QUADRATURE_STEP_M)), 1) + 1
+    z = np.linspace(0.0, model.apogee_altitude_m, n_points)
+    # Trapezoid rule over altitude
+    quadrature = np.full(n_points, z[1] - z[0] if n_points > 1 else 0.0)
+    quadrature[[0, -1]] /= 2
+    time_at = quadrature / descent_rate(model, z)
+    weights = _level_weights(z, altitudes_m, time_at)
+    descent_time = float(time_at.sum())
+
+    # The rocket's horizontal velocity follows the wind with a lag of one time
+    # constant, so through wind shear it drifts -integral(tau dwind) less than
+    # the wind alone would carry it
+    tau = descent_rate(model, (z[1:] + z[:-1]) / 2) / model.gravity
+    shear = np.zeros(n_points)
+    shear[:-1] -= tau
+    shear[1:] += tau
+    weights += _level_weights(z, altitudes_m, shear)
+
+    if 0.0 < model.main_altitude_m < model.apogee_altitude_m:
+        main_z = np.array([model.main_altitude_m])
+        # The drogue rate just above the main altitude, slowing to the main rate
+        drogue_rate = model.drogue_rate_coefficient / np.sqrt(
+            atmosphere(model, main_z)[0]
+        )
+        main_rate = float(descent_rate(model, main_z)[0])
+        lag, _ = _transient_lag(
+            main_rate, model.gravity, np.array([[0.0], [0.0], -drogue_rate])
+        )
+        weights += _level_weights(main_z, altitudes_m, lag)
+        descent_time += float(lag[0])
+    return weights, descent_time
+
+
+def landing_points(model, altitudes_m, wind_east, wind_north):
+    """
+    Landing points for many wind profiles at once. On top of the steady drift
+    of drift_weights, the rocket leaves apogee with no vertical speed and its
+    own horizontal velocity. It takes a few time constants (descent rate / g)
+    to settle into the wind and the drogue rate. That start is integrated for
+    each profile from its velocity relative to the wind at apogee. It adds a
+    sideways displacement through the air, and extra time spent in the apogee
+    wind.
+    Args:
+        model (DescentModel): Descent model.
+        altitudes_m (np.array): Increasing altitudes of the profile levels.
+        wind_east (np.array): Wind flow towards east, (profiles, levels) in m/s.
+        wind_north (np.array): Wind flow towards north, (profiles, levels) in m/s.
+    Returns:
+        tuple: (x, y) landing positions east and north of the launch site, and
+            the descent time in s, one value per profile.
+    """
+    altitudes_m = np.asarray(altitudes_m, dtype=float)
+    wind_east = np.atleast_2d(wind_east)
+    wind_north = np.atleast_2d(wind_north)
+    weights, steady_time = drift_weights(model, altitudes_m)
+
+    apogee_z = np.array([model.apogee_altitude_m])
+    apogee_weights = _level_weights(apogee_z, altitudes_m, np.ones(1))
+    apogee_east = wind_east @ apogee_weights
+    apogee_north = wind_north @ apogee_weights
+    relative = np.stack(
+        [
+            model.apogee_vx - apogee_east,
+            model.apogee_vy - apogee_north,
+            np.zeros(len(apogee_east)),
+        ]
+    )
+    lag, sideways = _transient_lag(
+        float(descent_rate(model, apogee_z)[0]), model.gravity, relative
+    )
+
+    x = model.apogee_x_m + wind_east @ weights + apogee_east * lag + sideways[0]
+    y = model.apogee_y_m + wind_north @ weights + apogee_north * lag + sideways[1]
+    return x, y, steady_time + lag
+
+
+def random_wind_profiles(
+    n_profiles,
+    altitudes_m,
+    mean_speed_ms=5.0,
+    speed_sd_ms=2.0,
+    from_direction_deg=270.0,
+    direction_sd_deg=30.0,
+    veer_sd_deg_per_km=15.0,
+    shear_exponent=1 / 7,
+    gust_sd_ms=1.0,
+    seed=0,
+):
+    """
+    Random wind profiles: a power-law shear on a random surface speed, a random
+    mean direction that veers linearly with altitude, and independent gusts at
+    each level.
+    Args:
+        n_profiles (int): Number of profiles.
+        altitudes_m (np.array): Altitudes of the profile levels.
+        mean_speed_ms (float): Mean wind speed at 10 m.
+        speed_sd_ms (float): Spread of the speed at 10 m between profiles.
+        from_direction_deg (float): Mean direction the wind blows from (270 = west).
+        direction_sd_deg (float): Spread of the direction between profiles.
+        veer_sd_deg_per_km (float): Spread of the direction change with altitude.
+        shear_exponent (float): Power-law exponent of speed against altitude.
+        gust_sd_ms (float): Gust spread of each component at each level.
+        seed (int): Random seed.
+    Returns:
+        tuple: (east, north) wind flow components, (profiles, levels) in m/s.
+    """
+    rng = np.random.default_rng(seed)
+    altitudes_m = np.asarray(altitudes_m, dtype=float)
+    surface = np.maximum(rng.normal(mean_speed_ms, speed_sd_ms, n_profiles), 0.0)
+    speed = surface[:, None] * (np.maximum(altitudes_m, 10.0) / 10.0) ** shear_exponent
+    direction = np.radians(
+        rng.normal(from_direction_deg, direction_sd_deg, n_profiles)[:, None]
+        + rng.normal(0.0, veer_sd_deg_per_km, n_profiles)[:, None]
+        * altitudes_m
+        / 1000.0
+    )
+    shape = (n_profiles, len(altitudes_m))
+    east = -speed * np.sin(direction) + rng.normal(0.0, gust_sd_ms, shape)
+    north = -speed * np.cos(direction) + rng.normal(0.0, gust_sd_ms, shape)
+    return east, north
+
+
+def confidence_ellipse(x, y, probability):
+    """
+    Ellipse containing a given fraction of a bivariate normal fit to the points.
+    Args:
+        x (np.array): East positions.
+        y (np.array): North positions.
+        probability (float): Fraction of landings inside, e.g. 0.9.
+    Returns:
+        dict: centre, semi-axes in m and the bearing of the major axis in
+            degrees clockwise from north.
+    """
+    covariance = np.cov(x, y)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    scale = np.sqrt(-2.0 * np.log(1.0 - probability))
+    major = eigenvectors[:, 1]
+    return {
+        "probability": probability,
+        "center_x_m": float(np.mean(x)),
+        "center_y_m": float(np.mean(y)),
+        "semi_major_m": float(scale * np.sqrt(max(eigenvalues[1], 0.0))),
+        "semi_minor_m": float(scale * np.sqrt(max(eigenvalues[0], 0.0))),
+        "bearing_deg": float(np.degrees(np.arctan2(major[0], major[1])) % 180.0),
+    }
+
+
+def save_descent_model(model, path):
+    """
+    Args:
+        model (DescentModel): Model to save.
+        path (str): Output .json path.
+    """
+    with open(path, "w") as f:
+        json.dump(asdict(model), f, indent=2)
+
+
+def load_descent_model(path):
+    """
+    Args:
+        path (str): .json file written by save_descent_model.
+    Returns:
+        DescentModel: The saved model.
+    """
+    with open(path) as f:
+        return DescentModel(**json.load(f))
+
+
+def cached_descent_model(version="2", refresh=False):
+    """
+    Load the DescentModel of a rocket version, extracting it from one full
+    OpenRocket flight and caching it the first time. The OpenRocket wind during
+    the descent is cached alongside to check the model against.
+    Args:
+        version (str): Rocket version number.
+        refresh (bool): Re-extract the model from OpenRocket even if it is cached.
+    Returns:
+        tuple: (DescentModel, OpenRocket wind profile (altitudes, east, north)),
+            or None if the .ork file is missing.
+    """
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, "descent_model.json")
+    wind_path = os.path.join(output_dir, "descent_wind.npz")
+
+    if not refresh and os.path.exists(model_path) and os.path.exists(wind_path):
+        print(f"[INFO] Loaded descent model from: {model_path}")
+        with np.load(wind_path) as wind:
+            profile = (wind["altitudes"], wind["east"], wind["north"])
+        return load_descent_model(model_path), profile
+
+    import orlab
+
+    from fastTimeseries import get_timeseries_fast
+
+    ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return None
+    with orlab.OpenRocketInstance() as instance:
+        helper = orlab.Helper(instance)
+        sim = helper.load_doc(ork_file).getSimulation(0)
+        helper.run_simulation(sim)
+        data = get_timeseries_fast(helper, sim, DESCENT_DATA_TYPES)
+        events = helper.get_events(sim)
+    model = descent_model_from_timeseries(data, events)
+    profile = openrocket_wind_profile(data, model)
+    save_descent_model(model, model_path)
+    np.savez(wind_path, altitudes=profile[0], east=profile[1], north=profile[2])
+    print(f"[INFO] Descent model saved to: {model_path}")
+    return model, profile
+
+
+def plot_landing_scatter(x, y, ellipses, reference, plot_path):
+    """
+    Args:
+        x (np.array): East landing positions.
+        y (np.array): North landing positions.
+        ellipses (list): confidence_ellipse dictionaries.
+        reference (tuple): OpenRocket landing point (x, y).
+        plot_path (str): Output image path.
+    """
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.scatter(x, y, s=2, alpha=0.3, label="Landing points")
+    for ellipse in ellipses:
+        ax.add_patch(
+            Ellipse(
+                (ellipse["center_x_m"], ellipse["center_y_m"]),
+                2 * ellipse["semi_major_m"],
+                2 * ellipse["semi_minor_m"],
+                angle=90.0 - ellipse["bearing_deg"],
+                fill=False,
+                label=f"{ellipse['probability']:.0%} ellipse",
+            )
+        )
+    ax.plot(0, 0, "k^", label="Launch site")
+    ax.plot(*reference, "r*", markersize=12, label="OpenRocket landing")
+    ax.set_xlabel("East of launch (m)")
+    ax.set_ylabel("North of launch (m)")
+    ax.set_title("Landing dispersion")
+    ax.set_aspect("equal", adjustable="datalim")
+    ax.grid(True)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(plot_path)
+    plt.close(fig)
+
+
+def descent_drift_analysis(
+    version="2", n_profiles=5000, refresh=False, wind_files=None, **wind
+):
+    """
+    Landing dispersion under many random wind profiles, from one OpenRocket flight.
+    Args:
+        version (str): Rocket version number.
+        n_profiles (int): Number of random wind profiles.
+        refresh (bool): Re-extract the descent model from OpenRocket.
+        wind_files (list, optional): Measured wind profile files (see
+            windProfiles.read_wind_file) to land under instead of random
+            profiles; ellipses need at least three.
+        **wind: Keyword arguments for random_wind_profiles.
+    Returns:
+        pd.DataFrame: One landing point per profile, or None if the model is
+            unavailable.
+    """
+    cached = cached_descent_model(version, refresh)
+    if cached is None:
+        return None
+    model, openrocket_wind = cached
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+
+    # Check the model against OpenRocket's own descent and wind
+    x_or, y_or, descent_time = landing_points(model, *openrocket_wind)
+    reference = model.reference
+    print(
+        f"[INFO] Descent time: model {descent_time[0]:.1f} s, "
+        f"OpenRocket {reference['descent_time_s']:.1f} s"
+    )
+    print(
+        f"[INFO] Landing under the OpenRocket wind: model ({x_or[0]:.0f}, "
+        f"{y_or[0]:.0f}) m, OpenRocket ({reference['landing_x_m']:.0f}, "
+        f"{reference['landing_y_m']:.0f}) m"
+    )
+
+    altitudes = np.linspace(0.0, model.apogee_altitude_m, 100)
+    start = time.perf_counter()
+    if wind_files:
+        tables = [load_wind_table(path) for path in wind_files]
+        east, north = map(np.array, zip(*(wind_at(t, altitudes) for t in tables)))
+        labels = [os.path.basename(path) for path in wind_files]
+        n_profiles = len(tables)
+    else:
+        east, north = random_wind_profiles(n_profiles, altitudes, **wind)
+        labels = np.arange(n_profiles)
+    x, y, descent_times = landing_points(model, altitudes, east, north)
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] {n_profiles} wind profiles in {elapsed * 1000:.0f} ms "
+        f"(descent time {descent_times.min():.1f} to {descent_times.max():.1f} s)"
+    )
+
+    landings = pd.DataFrame(
+        {
+            "profile": labels,
+            "x_m": x,
+            "y_m": y,
+            "drift_m": np.hypot(x, y),
+        }
+    )
+    ellipses = (
+        [confidence_ellipse(x, y, p) for p in ELLIPSE_PROBABILITIES]
+        if n_profiles >= 3
+        else []
+    )
+    for ellipse in ellipses:
+        print(
+            f"[INFO] {ellipse['probability']:.0%} ellipse: "
+            f"{ellipse['semi_major_m']:.0f} x {ellipse['semi_minor_m']:.0f} m, "
+            f"bearing {ellipse['bearing_deg']:.0f} deg"
+        )
+
+    landings_path = os.path.join(output_dir, "landing_scatter.csv")
+    ellipses_path = os.path.join(output_dir, "landing_ellipses.csv")
+    plot_path = os.path.join(output_dir, "landing_scatter.png")
+    landings.to_csv(landings_path, index=False)
+    pd.DataFrame(ellipses).to_csv(ellipses_path, index=False)
+    plot_landing_scatter(
+        x, y, ellipses, (reference["landing_x_m"], reference["landing_y_m"]), plot_path
+    )
+    print(f"[INFO] Landing dispersion saved to: {landings_path}, {ellipses_path}")
+    return landings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recovery drift and landing scatter.")
+    parser.add_argument("--version", default="2", help="Rocket version number")
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument(
+        "--refresh", action="store_true", help="Re-extract the model from OpenRocket"
+    )
+    parser.add_argument(
+        "--wind-files", nargs="+", help="Measured wind profiles to land under"
+    )
+    args = parser.parse_args()
+    descent_drift_analysis(args.version, args.profiles, args.refresh, args.wind_files)
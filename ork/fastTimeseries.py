@@ -0,0 +1,72 @@
+# fastTimeseries.py
+
+import jpype
+import numpy as np
+
+# Guava ships inside the OpenRocket jar; Doubles.toArray unboxes a whole
+# java.util.Collection<Double> into a primitive double[] inside the JVM.
+GUAVA_DOUBLES_CLASS = "com.google.common.primitives.Doubles"
+
+_doubles_class = None
+
+
+def _guava_doubles():
+    """Return Guava's Doubles class, or None if the running JVM does not have it."""
+    global _doubles_class
+    if _doubles_class is None:
+        try:
+            _doubles_class = jpype.JClass(GUAVA_DOUBLES_CLASS)
+        except Exception:
+            _doubles_class = False
+    return _doubles_class or None
+
+
+def get_timeseries_fast(helper, sim, flight_data_types, branch_number=0):
+    """
+    Drop-in replacement for Helper.get_timeseries that moves the data across the
+    bridge in bulk. The requested series are concatenated inside the JVM,
+    unboxed into one primitive double[] and copied into a single 2D NumPy
+    buffer, instead of converting every Java Double to a Python float.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation object that has been run.
+        flight_data_types (list): FlightDataType members to retrieve.
+        branch_number (int): Simulation branch (stage) to read.
+    Returns:
+        dict: FlightDataType -> np.array (None for types the simulation did not record).
+    """
+    doubles = _guava_doubles()
+    if doubles is None:
+        return helper.get_timeseries(
+            sim, flight_data_types, branch_number=branch_number
+        )
+
+    branch = sim.getSimulatedData().getBranch(branch_number)
+    java_lists = [
+        branch.get(helper.translate_flight_data_type(ftype))
+        for ftype in flight_data_types
+    ]
+    present = [i for i, values in enumerate(java_lists) if values is not None]
+    lengths = {int(java_lists[i].size()) for i in present}
+
+    output = {ftype: None for ftype in flight_data_types}
+    if not present:
+        return output
+    if len(lengths) != 1:
+        # Series of different lengths cannot share a rectangular buffer
+        for i in present:
+            output[flight_data_types[i]] = np.array(
+                doubles.toArray(java_lists[i]), dtype=float
+            )
+        return output
+
+    n_points = lengths.pop()
+    combined = jpype.JClass("java.util.ArrayList")(len(present) * n_points)
+    for i in present:
+        combined.addAll(java_lists[i])
+    flat = np.asarray(doubles.toArray(combined), dtype=float)
+
+    buffer = flat.reshape(len(present), n_points)
+    for row, i in enumerate(present):
+        output[flight_data_types[i]] = buffer[row]
+    return output
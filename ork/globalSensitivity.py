@@ -0,0 +1,528 @@
+# globalSensitivity.py
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from orlab import FlightDataType
+
+from jvmReductions import Reduction, reduce_flight_data
+from sweepStore import SweepResultsStore
+from sweepSupervisor import SupervisedExecutor
+from sweepWorkers import start_worker
+
+# Outputs whose variance is decomposed
+SOBOL_REDUCTIONS = [
+    Reduction("apogee", FlightDataType.TYPE_ALTITUDE, "max"),
+    Reduction("min_stability", FlightDataType.TYPE_STABILITY, "min"),
+]
+SOBOL_OUTPUTS = [reduction.name for reduction in SOBOL_REDUCTIONS]
+
+# Trapezoidal fin set properties (DSS.md fin geometry) -> OpenRocket accessor
+# suffix; span is the fin height in OpenRocket
+FIN_ATTRIBUTES = {
+    "root_chord": "RootChord",
+    "tip_chord": "TipChord",
+    "span": "Height",
+}
+
+# Fin set angles -> (accessor suffix, low, high) offset from the .ork value in
+# radians. Added rather than scaled, so an unswept fin set still varies
+FIN_ANGLE_RANGES = {
+    "sweep_angle": ("SweepAngle", -math.radians(5.0), math.radians(5.0)),
+}
+
+# Launch conditions -> (SimulationOptions accessor suffix, low, high) in SI units
+LAUNCH_RANGES = {
+    "wind_speed_average": ("WindSpeedAverage", 0.0, 8.0),
+    "launch_rod_angle": ("LaunchRodAngle", 0.0, math.radians(5.0)),
+}
+
+MASS_VARIATION = 0.05  # Mass factors span 1 -/+ this, like massBudgetSensitivity
+FIN_VARIATION = 0.10  # Fin length factors span 1 -/+ this
+N_BOOTSTRAP = 200
+
+# Per-process simulation state, set up once by init_sobol_worker
+_worker = {}
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """
+    One input of the sensitivity analysis, sampled uniformly in [low, high].
+    kind is "mass" (factor on a component's mass), "fin" (factor on a fin set
+    length), "fin_angle" (offset added to a fin set angle) or "launch" (a
+    simulation option value). target is the component ID for mass and fin
+    parameters, attribute the FIN_ATTRIBUTES, FIN_ANGLE_RANGES or
+    LAUNCH_RANGES key for the others.
+    """
+
+    name: str
+    kind: str
+    target: str
+    attribute: str
+    low: float
+    high: float
+
+
+def _primes(count):
+    """The first count prime numbers."""
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def scrambled_halton(n, dimensions, seed=0):
+    """
+    Quasi-random points in the unit cube: the Halton sequence with every
+    digit of every dimension passed through its own random permutation, which
+    removes the correlation between the higher dimensions of the plain
+    sequence. The first n points of a longer run are the same points, so
+    growing n extends a design.
+    Args:
+        n (int): Number of points.
+        dimensions (int): Number of dimensions.
+        seed (int): Seed of the digit permutations.
+    Returns:
+        np.array: (n, dimensions) points in [0, 1).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.empty((n, dimensions))
+    for dimension, base in enumerate(_primes(dimensions)):
+        # Enough digits to reach double precision
+        digits = int(np.ceil(53 * np.log(2) / np.log(base)))
+        index = np.arange(n)
+        value = np.zeros(n)
+        scale = 1.0 / base
+        for _ in range(digits):
+            value += rng.permutation(base)[index % base] * scale
+            index //= base
+            scale /= base
+        points[:, dimension] = value
+    return points
+
+
+def saltelli_design(parameters, n_base, seed=0):
+    """
+    Saltelli's sample: two independent matrices A and B, and for each
+    parameter i the matrix AB_i, which is A with column i taken from B.
+    Args:
+        parameters (list): Parameter specs.
+        n_base (int): Rows of each matrix.
+        seed (int): Seed of the quasi-random sequence.
+    Returns:
+        tuple: (A, B, AB) parameter values, AB of shape (d, n_base, d).
+    """
+    d = len(parameters)
+    low = np.array([p.low for p in parameters])
+    high = np.array([p.high for p in parameters])
+    unit = scrambled_halton(n_base, 2 * d, seed)
+    a = low + unit[:, :d] * (high - low)
+    b = low + unit[:, d:] * (high - low)
+    ab = np.repeat(a[np.newaxis], d, axis=0)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    return a, b, ab
+
+
+def sobol_indices(y_a, y_b, y_ab, n_bootstrap=N_BOOTSTRAP, seed=0):
+    """
+    First-order (Saltelli 2010) and total-order (Jansen) Sobol indices, with
+    95% bootstrap intervals over the base rows. Rows with a failed run are
+    left out of the parameter they affect.
+    Args:
+        y_a (np.array): Output at the rows of A.
+        y_b (np.array): Output at the rows of B.
+        y_ab (np.array): (d, n_base) output at the rows of each AB_i.
+        n_bootstrap (int): Bootstrap resamples.
+        seed (int): Seed of the resampling.
+    Returns:
+        dict: S1, S1_conf, ST and ST_conf arrays with one value per parameter.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(y_a)
+    resamples = np.vstack([np.arange(n), rng.integers(0, n, (n_bootstrap, n))])
+    first = np.full((len(y_ab), len(resamples)), np.nan)
+    total = np.full_like(first, np.nan)
+    for i, y_abi in enumerate(y_ab):
+        valid = np.isfinite(y_a) & np.isfinite(y_b) & np.isfinite(y_abi)
+        for r, rows in enumerate(resamples):
+            rows = rows[valid[rows]]
+            if len(rows) < 2:
+                continue
+            variance = np.var(np.concatenate([y_a[rows], y_b[rows]]))
+            if variance == 0:
+                continue
+            first[i, r] = np.mean(y_b[rows] * (y_abi[rows] - y_a[rows])) / variance
+            total[i, r] = 0.5 * np.mean((y_a[rows] - y_abi[rows]) ** 2) / variance
+    # Column 0 is the full sample, the rest are the bootstrap resamples
+    return {
+        "S1": first[:, 0],
+        "S1_conf": 1.96 * np.nanstd(first[:, 1:], axis=1),
+        "ST": total[:, 0],
+        "ST_conf": 1.96 * np.nanstd(total[:, 1:], axis=1),
+    }
+
+
+def sample_key(parameters, values):
+    """
+    Cache key of one run: a hash of the parameter names and values, so the
+    same point is never simulated twice for the same parameter set.
+    """
+    text = json.dumps(
+        [[p.name, round(float(v), 12)] for p, v in zip(parameters, values)]
+    )
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _fin_sets(helper, rocket):
+    """Trapezoidal fin sets of a rocket."""
+    return [
+        c
+        for c in helper.get_all_components(rocket)
+        if c.getClass().getSimpleName() == "TrapezoidFinSet"
+    ]
+
+
+def build_parameters(
+    helper,
+    sim,
+    component_names=None,
+    mass_variation=MASS_VARIATION,
+    fin_variation=FIN_VARIATION,
+    fin_angle_ranges=FIN_ANGLE_RANGES,
+    launch_ranges=LAUNCH_RANGES,
+):
+    """
+    Inputs of the analysis for a loaded simulation: a mass factor for every
+    component with mass, the geometry of every trapezoidal fin set and the
+    launch conditions.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation.
+        component_names (list, optional): Components whose mass is varied
+            (all with mass if None).
+        mass_variation (float): Mass factors span 1 -/+ this.
+        fin_variation (float): Fin length factors span 1 -/+ this.
+        fin_angle_ranges (dict): See FIN_ANGLE_RANGES.
+        launch_ranges (dict): See LAUNCH_RANGES.
+    Returns:
+        list: Parameter specs.
+    """
+    rocket = sim.getRocket()
+    parameters = []
+    seen = {}
+    for component in helper.get_all_components(rocket):
+        name = str(component.getName())
+        if component_names is not None and name not in component_names:
+            continue
+        try:
+            if component.getMass() <= 0:
+                continue
+        except AttributeError:
+            continue
+        # Component names need not be unique; columns must be
+        seen[name] = seen.get(name, 0) + 1
+        label = name if seen[name] == 1 else f"{name} #{seen[name]}"
+        parameters.append(
+            Parameter(
+                f"mass:{label}",
+                "mass",
+                str(component.getID()),
+                "",
+                1 - mass_variation,
+                1 + mass_variation,
+            )
+        )
+    for fins in _fin_sets(helper, rocket):
+        for attribute in FIN_ATTRIBUTES:
+            parameters.append(
+                Parameter(
+                    f"fin:{fins.getName()}:{attribute}",
+                    "fin",
+                    str(fins.getID()),
+                    attribute,
+                    1 - fin_variation,
+                    1 + fin_variation,
+                )
+            )
+        for attribute, (_, low, high) in fin_angle_ranges.items():
+            parameters.append(
+                Parameter(
+                    f"fin:{fins.getName()}:{attribute}",
+                    "fin_angle",
+                    str(fins.getID()),
+                    attribute,
+                    low,
+                    high,
+                )
+            )
+    for attribute, (_, low, high) in launch_ranges.items():
+        parameters.append(
+            Parameter(f"launch:{attribute}", "launch", "", attribute, low, high)
+        )
+    return parameters
+
+
+def init_sobol_worker(ork_file, parameters):
+    """
+    Pool initializer: start a JVM in this worker process, load the rocket and
+    record the base value of everything the parameters change.
+    Args:
+        ork_file (str): Path to the .ork file.
+        parameters (list): Parameter specs.
+    """
+    from simulationListeners import stop_listeners
+
+    start_worker(_worker, ork_file)
+    helper, sim = _worker["helper"], _worker["sim"]
+    components = {str(c.getID()): c for c in helper.get_all_components(sim.getRocket())}
+    options = sim.getOptions()
+
+    # (object, accessor suffix, base value) each parameter scales, offsets or sets
+    targets = []
+    for parameter in parameters:
+        if parameter.kind == "mass":
+            component = components[parameter.target]
+            targets.append((component, "OverrideMass", component.getMass()))
+        elif parameter.kind in ("fin", "fin_angle"):
+            fins = components[parameter.target]
+            if parameter.kind == "fin":
+                suffix = FIN_ATTRIBUTES[parameter.attribute]
+            else:
+                suffix = FIN_ANGLE_RANGES[parameter.attribute][0]
+            targets.append((fins, suffix, float(getattr(fins, f"get{suffix}")())))
+        else:
+            suffix = LAUNCH_RANGES[parameter.attribute][0]
+            targets.append((options, suffix, float(getattr(options, f"get{suffix}")())))
+
+    _worker.update(
+        parameters=parameters,
+        targets=targets,
+        # Ascent only: apogee and the ascent stability margin are all we need
+        listeners=stop_listeners("apogee"),
+    )
+
+
+def run_sobol_sample(task):
+    """
+    Run one sample point in the worker. The random seed of the .ork is kept,
+    so turbulence does not add noise between points.
+    Args:
+        task (tuple): (cache key, parameter values).
+    Returns:
+        dict: Output name -> value (NaN where unavailable).
+    """
+    _, values = task
+    mass_components = []
+    try:
+        for parameter, (target, suffix, base), value in zip(
+            _worker["parameters"], _worker["targets"], values
+        ):
+            if parameter.kind == "mass":
+                target.setMassOverridden(True)
+                target.setOverrideMass(base * value)
+                mass_components.append(target)
+            elif parameter.kind == "fin":
+                getattr(target, f"set{suffix}")(base * value)
+            elif parameter.kind == "fin_angle":
+                getattr(target, f"set{suffix}")(base + value)
+            else:
+                getattr(target, f"set{suffix}")(value)
+        _worker["helper"].run_simulation(
+            _worker["sim"], _worker["listeners"], randomize_seed=False
+        )
+        return reduce_flight_data(_worker["helper"], _worker["sim"], SOBOL_REDUCTIONS)
+    finally:
+        for component in mass_components:
+            component.setMassOverridden(False)
+        for parameter, (target, suffix, base) in zip(
+            _worker["parameters"], _worker["targets"]
+        ):
+            if parameter.kind != "mass":
+                getattr(target, f"set{suffix}")(base)
+
+
+def plot_sobol_indices(indices, plot_path, top=15):
+    """
+    Bar chart of first- and total-order indices for each output.
+    Args:
+        indices (pd.DataFrame): One row per (output, parameter), as written by
+            global_sensitivity_analysis.
+        plot_path (str): Output image path.
+        top (int): Parameters shown per output, by total-order index.
+    """
+    outputs = list(indices["output"].unique())
+    fig, axes = plt.subplots(1, len(outputs), figsize=(7 * len(outputs), 8))
+    for ax, output in zip(np.atleast_1d(axes), outputs):
+        rows = indices[indices["output"] == output].nlargest(top, "ST")[::-1]
+        y = np.arange(len(rows))
+        ax.barh(y + 0.2, rows["ST"], 0.4, xerr=rows["ST_conf"], label="Total order")
+        ax.barh(y - 0.2, rows["S1"], 0.4, xerr=rows["S1_conf"], label="First order")
+        ax.set_yticks(y)
+        ax.set_yticklabels(rows["parameter"])
+        ax.set_xlabel("Sobol index")
+        ax.set_title(output)
+        ax.grid(True, axis="x")
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(plot_path)
+    plt.close(fig)
+
+
+def global_sensitivity_analysis(
+    version="2",
+    n_base=64,
+    component_names=None,
+    workers=1,
+    sim_timeout=None,
+    max_retries=2,
+    resume=True,
+    seed=0,
+):
+    """
+    Variance-based (Sobol) sensitivity of apogee and stability margin to all
+    masses, the fin geometry and the launch conditions at once, so
+    interactions between them count. The Saltelli sample of n_base * (d + 2)
+    points runs in supervised worker processes; every finished point is
+    cached in a results file keyed by its parameter values, so a rerun, or a
+    larger n_base (the quasi-random rows are extended, not redrawn), only
+    simulates the new points.
+    Args:
+        version (str): Rocket version number.
+        n_base (int): Base sample rows; a power of two is customary.
+        component_names (list, optional): Components whose mass is varied
+            (all with mass if None).
+        workers (int): Number of worker processes (one JVM each).
+        sim_timeout (float, optional): Seconds one simulation may run.
+        max_retries (int): Extra attempts for a point that fails.
+        resume (bool): Reuse the cached runs of the same parameter set.
+        seed (int): Seed of the quasi-random sequence.
+    Returns:
+        pd.DataFrame: One row per (output, parameter) with S1, S1_conf, ST and
+            ST_conf, or None if the .ork file is missing.
+    """
+    import orlab
+
+    ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return None
+    output_dir = os.path.join("ork", f"outputs-v{version}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    with orlab.OpenRocketInstance() as instance:
+        helper = orlab.Helper(instance)
+        sim = helper.load_doc(ork_file).getSimulation(0)
+        parameters = build_parameters(helper, sim, component_names)
+    d = len(parameters)
+    names = [p.name for p in parameters]
+
+    a, b, ab = saltelli_design(parameters, n_base, seed)
+    points = np.vstack([a, b, ab.reshape(-1, d)])
+    keys = [sample_key(parameters, values) for values in points]
+
+    # Cached runs live in a file per parameter set
+    design_hash = hashlib.sha1(
+        json.dumps([asdict(p) for p in parameters]).encode()
+    ).hexdigest()[:8]
+    runs_path = os.path.join(output_dir, f"sobol_runs-{design_hash}.csv")
+    store = SweepResultsStore(
+        runs_path, ["key", *names, *SOBOL_OUTPUTS, "error"], resume=resume
+    )
+    cached = pd.read_csv(runs_path)
+    cached = cached[cached["error"].isna()].drop_duplicates("key")
+    outputs = {
+        row["key"]: {name: row[name] for name in SOBOL_OUTPUTS}
+        for _, row in cached.iterrows()
+    }
+
+    tasks = list(
+        {key: (key, tuple(values)) for key, values in zip(keys, points)}.values()
+    )
+    tasks = [task for task in tasks if task[0] not in outputs]
+    print(
+        f"[INFO] {d} parameters, {len(points)} sample points: "
+        f"{len(points) - len(tasks)} cached, {len(tasks)} to simulate on "
+        f"{workers} worker(s)"
+    )
+
+    start = time.perf_counter()
+    executor = SupervisedExecutor(
+        run_sobol_sample,
+        workers,
+        initializer=init_sobol_worker,
+        initargs=(ork_file, parameters),
+        timeout=sim_timeout,
+        max_retries=max_retries,
+    )
+    with store:
+        for (key, values), result, error in executor.map(tasks):
+            if result is None:
+                print(f"[ERROR] Sample {key}: {error}")
+                result = {name: np.nan for name in SOBOL_OUTPUTS}
+            else:
+                outputs[key] = result
+            store.append_rows(
+                [{"key": key, **dict(zip(names, values)), **result, "error": error}]
+            )
+    if tasks:
+        elapsed = time.perf_counter() - start
+        print(
+            f"[INFO] {len(tasks)} simulations in {elapsed:.1f} s "
+            f"({len(tasks) / elapsed * 60:.0f} per minute)"
+        )
+
+    rows = []
+    for output in SOBOL_OUTPUTS:
+        y = np.array([outputs.get(key, {}).get(output, np.nan) for key in keys])
+        y_a, y_b, y_ab = y[:n_base], y[n_base : 2 * n_base], y[2 * n_base :]
+        indices = sobol_indices(y_a, y_b, y_ab.reshape(d, n_base), seed=seed)
+        for i, name in enumerate(names):
+            rows.append(
+                {
+                    "output": output,
+                    "parameter": name,
+                    **{column: values[i] for column, values in indices.items()},
+                }
+            )
+        ranked = sorted(zip(indices["ST"], names), reverse=True)[:3]
+        print(
+            f"[INFO] {output}: largest total-order indices "
+            + ", ".join(f"{name} {st:.2f}" for st, name in ranked)
+        )
+
+    indices = pd.DataFrame(rows)
+    indices_path = os.path.join(output_dir, "sobol_indices.csv")
+    plot_path = os.path.join(output_dir, "sobol_indices.png")
+    indices.to_csv(indices_path, index=False)
+    plot_sobol_indices(indices, plot_path)
+    print(f"[INFO] Sobol indices saved to: {indices_path}, {plot_path}")
+    return indices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sobol global sensitivity analysis.")
+    parser.add_argument("--version", default="2", help="Rocket version number")
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sim-timeout", type=float, default=None)
+    args = parser.parse_args()
+    global_sensitivity_analysis(
+        args.version,
+        args.samples,
+        workers=args.workers,
+        sim_timeout=args.sim_timeout,
+    )
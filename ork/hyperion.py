@@ -0,0 +1,347 @@
+# hyperion.py
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Scripts are run unattended from here, so never open plot windows. Set before
+# anything imports matplotlib; an explicit MPLBACKEND still wins.
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+# Command -> (module, function, description). Modules are only imported when
+# their command runs, so --help and early failures do not load numpy,
+# matplotlib, pandas or the orlab/JPype stack.
+ANALYSES = {
+    "lc-prog-update": (
+        "lcProgUpdate1",
+        "lcProgUpdate1",
+        "Key flight info and thrust/velocity/altitude/descent plots",
+    ),
+    "multi-plot": (
+        "multiPlot",
+        "multi_plot_analysis",
+        "Plots of every main flight quantity with extrema",
+    ),
+    "stability": (
+        "stabilityAnalysis",
+        "stability_analysis",
+        "Stability margin and Mach number plots",
+    ),
+    "mass-override": (
+        "massOverride",
+        "mass_override_analysis",
+        "Apogee and max velocity against payload mass",
+    ),
+    "mass-budget": (
+        "massBudgetSensitivity",
+        "mass_budget_sensitivity_analysis",
+        "Apogee sensitivity to each component's mass",
+    ),
+    "multi-fidelity": (
+        "multiFidelitySweep",
+        "multi_fidelity_mass_sweep",
+        "Mass sweep screened at a coarse time step, refined where it matters",
+    ),
+    "ascent-surrogate": (
+        "ascentSurrogate",
+        "ascent_surrogate_analysis",
+        "Calibrated NumPy ascent model screening thousands of variants",
+    ),
+    "airbrake-table": (
+        "airbrakeTable",
+        "airbrake_table_analysis",
+        "Coast apogee lookup table for the airbrake flight controller",
+    ),
+    "airbrake-tuning": (
+        "airbrakeControl",
+        "airbrake_tuning_sweep",
+        "Airbrake controller in the loop over gains and control rates",
+    ),
+    "descent-drift": (
+        "descentDrift",
+        "descent_drift_analysis",
+        "Landing scatter and ellipses under thousands of wind profiles",
+    ),
+    "global-sensitivity": (
+        "globalSensitivity",
+        "global_sensitivity_analysis",
+        "Sobol indices of apogee and stability over masses, fins and launch",
+    ),
+    "list-parts": (
+        "listParts",
+        "list_component_attributes",
+        "Write every component and its attributes to a text file",
+    ),
+}
+
+# Analyses that take the rocket version instead of using v2
+VERSIONED_ANALYSES = {
+    "lc-prog-update",
+    "multi-plot",
+    "ascent-surrogate",
+    "airbrake-table",
+    "airbrake-tuning",
+    "descent-drift",
+    "global-sensitivity",
+}
+
+
+def ork_path(version):
+    """
+    Args:
+        version (str): Rocket version number (e.g. "2" for v2).
+    Returns:
+        str: Path of the version's .ork file, relative to the repository root.
+    """
+    return os.path.join("ork", f"hyperion_II_v{version}.ork")
+
+
+def load_analysis(command):
+    """
+    Import the module of an analysis on demand.
+    Args:
+        command (str): Key of ANALYSES.
+    Returns:
+        function: The analysis entry point.
+    """
+    module_name, function_name, _ = ANALYSES[command]
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the Hyperion II OpenRocket analyses (from the repository root)."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, (_, _, description) in ANALYSES.items():
+        subparser = subparsers.add_parser(command, help=description)
+        if command in VERSIONED_ANALYSES:
+            subparser.add_argument(
+                "--version",
+                required=True,
+                help="Rocket version number, e.g. 2 for hyperion_II_v2.ork",
+            )
+        if command == "mass-budget":
+            subparser.add_argument(
+                "--no-resume",
+                action="store_true",
+                help="Start the sweep over instead of resuming the results file",
+            )
+            subparser.add_argument(
+                "--save-timeseries",
+                action="store_true",
+                help="Also save each run's timeseries as .npz",
+            )
+            subparser.add_argument(
+                "--reduce-in-jvm",
+                action="store_true",
+                help="Compute the metrics inside the JVM; no timeseries are copied",
+            )
+        if command in ("mass-budget", "airbrake-tuning", "global-sensitivity"):
+            subparser.add_argument(
+                "--workers",
+                type=int,
+                default=1,
+                help="OpenRocket worker processes for the sweep cells",
+            )
+            subparser.add_argument(
+                "--sim-timeout",
+                type=float,
+                help="Seconds one simulation may run before its worker is restarted",
+            )
+            subparser.add_argument(
+                "--max-retries",
+                type=int,
+                default=2,
+                help="Extra attempts for a sweep cell that crashes, hangs or fails",
+            )
+        if command == "airbrake-tuning":
+            subparser.add_argument(
+                "--gains",
+                nargs="+",
+                type=float,
+                default=[0.6, 0.8, 1.0, 1.2, 1.4],
+                help="Controller gains to try",
+            )
+            subparser.add_argument(
+                "--control-rates",
+                nargs="+",
+                type=float,
+                default=[10.0, 20.0, 50.0],
+                help="Controller update rates to try, in Hz",
+            )
+        if command == "descent-drift":
+            subparser.add_argument(
+                "--profiles",
+                type=int,
+                default=5000,
+                help="Number of random wind profiles",
+            )
+            subparser.add_argument(
+                "--wind-files",
+                nargs="+",
+                metavar="FILE",
+                help="Measured wind profiles to use instead of random ones",
+            )
+        if command == "global-sensitivity":
+            subparser.add_argument(
+                "--samples",
+                type=int,
+                default=64,
+                help="Base sample size N; runs N * (parameters + 2) simulations",
+            )
+            subparser.add_argument(
+                "--components",
+                nargs="+",
+                help="Names of the components whose mass is varied (default: all)",
+            )
+            subparser.add_argument(
+                "--no-resume",
+                action="store_true",
+                help="Re-simulate every sample point instead of using cached runs",
+            )
+        if command == "multi-fidelity":
+            subparser.add_argument(
+                "--components",
+                nargs="+",
+                help="Names of the components to vary (default: all with mass)",
+            )
+            subparser.add_argument(
+                "--coarse-factor",
+                type=float,
+                default=4.0,
+                help="Coarse time step as a multiple of the .ork time step",
+            )
+            subparser.add_argument(
+                "--references",
+                type=int,
+                default=5,
+                help="Fine-step reference runs used to estimate the coarse error",
+            )
+            subparser.add_argument(
+                "--top-fraction",
+                type=float,
+                default=0.2,
+                help="Fraction of components, by sensitivity, re-run at the fine step",
+            )
+            subparser.add_argument(
+                "--apogee-target",
+                type=float,
+                help="Apogee constraint in m; cells near it are re-run at the fine step",
+            )
+        if command in ("ascent-surrogate", "airbrake-table", "descent-drift"):
+            subparser.add_argument(
+                "--refresh",
+                action="store_true",
+                help="Re-extract the model from OpenRocket even if it is cached",
+            )
+        if command == "airbrake-table":
+            subparser.add_argument(
+                "--altitude-bins",
+                type=int,
+                default=16,
+                help="Altitude grid points of the table",
+            )
+            subparser.add_argument(
+                "--velocity-bins",
+                type=int,
+                default=32,
+                help="Vertical velocity grid points of the table",
+            )
+            subparser.add_argument(
+                "--deployment-bins",
+                type=int,
+                default=17,
+                help="Airbrake deployment grid points of the table",
+            )
+            subparser.add_argument(
+                "--dtype",
+                choices=["float32", "uint16", "uint8"],
+                default="uint16",
+                help="Storage type of the table values",
+            )
+        if command in ("mass-override", "mass-budget", "multi-fidelity"):
+            subparser.add_argument(
+                "--stop-at",
+                metavar="EVENT",
+                help="End each simulation at this flight event, e.g. apogee",
+            )
+            subparser.add_argument(
+                "--wind-profile",
+                metavar="FILE",
+                help="Fly every simulation in this wind profile (sounding text or CSV)",
+            )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    kwargs = {}
+    ork_file = ork_path(args.version if args.command in VERSIONED_ANALYSES else "2")
+    if args.command in VERSIONED_ANALYSES:
+        kwargs["version"] = args.version
+    if args.command == "mass-budget":
+        kwargs["resume"] = not args.no_resume
+        kwargs["save_timeseries"] = args.save_timeseries
+        kwargs["workers"] = args.workers
+        kwargs["sim_timeout"] = args.sim_timeout
+        kwargs["reduce_in_jvm"] = args.reduce_in_jvm
+        kwargs["max_retries"] = args.max_retries
+    if args.command == "airbrake-tuning":
+        kwargs["gains"] = args.gains
+        kwargs["control_rates_hz"] = args.control_rates
+        kwargs["workers"] = args.workers
+        kwargs["sim_timeout"] = args.sim_timeout
+        kwargs["max_retries"] = args.max_retries
+    if args.command == "global-sensitivity":
+        kwargs["n_base"] = args.samples
+        kwargs["component_names"] = args.components
+        kwargs["resume"] = not args.no_resume
+        kwargs["workers"] = args.workers
+        kwargs["sim_timeout"] = args.sim_timeout
+        kwargs["max_retries"] = args.max_retries
+    if args.command == "descent-drift":
+        kwargs["n_profiles"] = args.profiles
+        kwargs["wind_files"] = args.wind_files
+    if args.command == "multi-fidelity":
+        kwargs["component_names"] = args.components
+        kwargs["coarse_factor"] = args.coarse_factor
+        kwargs["n_reference"] = args.references
+        kwargs["top_fraction"] = args.top_fraction
+        kwargs["apogee_target"] = args.apogee_target
+    if args.command in ("ascent-surrogate", "airbrake-table", "descent-drift"):
+        kwargs["refresh"] = args.refresh
+    if args.command == "airbrake-table":
+        kwargs["n_altitude"] = args.altitude_bins
+        kwargs["n_velocity"] = args.velocity_bins
+        kwargs["n_deployment"] = args.deployment_bins
+        kwargs["value_dtype"] = args.dtype
+    if args.command in ("mass-override", "mass-budget", "multi-fidelity"):
+        kwargs["stop_event"] = args.stop_at
+        kwargs["wind_profile"] = args.wind_profile
+
+    # Checked here so a typo fails before any heavy import or JVM startup
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return 1
+    wind_files = kwargs.get("wind_files") or [kwargs.get("wind_profile")]
+    for wind_file in wind_files:
+        if wind_file is not None and not os.path.exists(wind_file):
+            print(f"[ERROR] The wind profile was not found at path: {wind_file}")
+            return 1
+
+    # The analysis modules import their siblings directly
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    analysis = load_analysis(args.command)
+    print(f"[INFO] Loaded {args.command} in {time.perf_counter() - start:.2f} s")
+    analysis(**kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# jvmReductions.py
+
+from dataclasses import dataclass
+
+import jpype
+import numpy as np
+
+from orlab import FlightDataType, FlightEvent
+
+REDUCTION_KINDS = ("max", "min", "last", "time_of_max", "time_of_min", "at_event")
+
+
+@dataclass(frozen=True)
+class Reduction:
+    """
+    One scalar summary of a flight data series, computed inside the JVM.
+    kind is one of REDUCTION_KINDS; at_event samples the series at the data
+    point closest to the first occurrence of event.
+    """
+
+    name: str
+    flight_data_type: FlightDataType
+    kind: str
+    event: FlightEvent = None
+
+    def __post_init__(self):
+        if self.kind not in REDUCTION_KINDS:
+            raise ValueError(f"Unknown reduction kind: {self.kind}")
+        if (self.kind == "at_event") != (self.event is not None):
+            raise ValueError("An event is needed for, and only for, at_event")
+
+
+# Scalars the sweeps need, named like the batch_flight_metrics results
+SWEEP_REDUCTIONS = [
+    Reduction("apogee", FlightDataType.TYPE_ALTITUDE, "max"),
+    Reduction("time_to_apogee", FlightDataType.TYPE_ALTITUDE, "time_of_max"),
+    Reduction("max_velocity", FlightDataType.TYPE_VELOCITY_TOTAL, "max"),
+    Reduction("max_acceleration", FlightDataType.TYPE_ACCELERATION_TOTAL, "max"),
+    Reduction("max_mach", FlightDataType.TYPE_MACH_NUMBER, "max"),
+    Reduction("min_stability", FlightDataType.TYPE_STABILITY, "min"),
+    Reduction(
+        "burnout_velocity",
+        FlightDataType.TYPE_VELOCITY_TOTAL,
+        "at_event",
+        FlightEvent.BURNOUT,
+    ),
+    Reduction(
+        "rail_exit_velocity",
+        FlightDataType.TYPE_VELOCITY_TOTAL,
+        "at_event",
+        FlightEvent.LAUNCHROD,
+    ),
+    Reduction(
+        "ground_hit_velocity",
+        FlightDataType.TYPE_VELOCITY_TOTAL,
+        "at_event",
+        FlightEvent.GROUND_HIT,
+    ),
+]
+
+
+def _first_event_time(branch, event_name):
+    """Time of the first occurrence of an event in a branch, or None."""
+    times = [
+        float(event.getTime())
+        for event in branch.getEvents()
+        if str(event.getType().name()) == event_name
+    ]
+    return min(times) if times else None
+
+
+def _closest_index(time_series, t):
+    """Index of the sample closest to time t, found with a binary search in the JVM."""
+    collections = jpype.JClass("java.util.Collections")
+    double = jpype.JClass("java.lang.Double")
+    position = int(collections.binarySearch(time_series, double.valueOf(t)))
+    if position >= 0:
+        return position
+    after = -position - 1
+    size = int(time_series.size())
+    if after == 0:
+        return 0
+    if after >= size:
+        return size - 1
+    before_t = float(time_series.get(after - 1))
+    after_t = float(time_series.get(after))
+    return after if after_t - t < t - before_t else after - 1
+
+
+def reduce_flight_data(helper, sim, reductions, branch_number=0):
+    """
+    Compute scalar summaries of a finished simulation without copying its
+    series out of the JVM. Extrema and last values come from the values the
+    FlightDataBranch tracks while recording; extremum times and event samples
+    are looked up by index. Only the resulting numbers cross the bridge, a few
+    calls per reduction instead of whole arrays.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation object that has been run.
+        reductions (list): Reduction specs.
+        branch_number (int): Simulation branch (stage) to read.
+    Returns:
+        dict: Reduction name -> float (NaN where the series or event is missing).
+    """
+    branch = sim.getSimulatedData().getBranch(branch_number)
+    java_time = helper.translate_flight_data_type(FlightDataType.TYPE_TIME)
+    double = jpype.JClass("java.lang.Double")
+    event_times = {}
+    results = {}
+
+    for reduction in reductions:
+        java_type = helper.translate_flight_data_type(reduction.flight_data_type)
+        series = branch.get(java_type)
+        if series is None or series.isEmpty():
+            results[reduction.name] = np.nan
+            continue
+
+        if reduction.kind in ("max", "time_of_max"):
+            value = float(branch.getMaximum(java_type))
+        elif reduction.kind in ("min", "time_of_min"):
+            value = float(branch.getMinimum(java_type))
+        elif reduction.kind == "last":
+            value = float(branch.getLast(java_type))
+        else:
+            event_name = reduction.event.name
+            if event_name not in event_times:
+                event_times[event_name] = _first_event_time(branch, event_name)
+            t = event_times[event_name]
+            value = (
+                np.nan
+                if t is None
+                else float(series.get(_closest_index(branch.get(java_time), t)))
+            )
+
+        if reduction.kind.startswith("time_of_") and np.isfinite(value):
+            index = int(series.indexOf(double.valueOf(value)))
+            value = float(branch.get(java_time).get(index)) if index >= 0 else np.nan
+        results[reduction.name] = value
+
+    return results
+
+
+def stack_reductions(results, reductions):
+    """
+    Combine the per-run results of reduce_flight_data into per-metric arrays.
+    Args:
+        results (list): reduce_flight_data dictionaries, or None for failed runs.
+        reductions (list): Reduction specs that produced them.
+    Returns:
+        dict: Reduction name -> np.array with one value per run (NaN for failed runs).
+    """
+    return {
+        reduction.name: np.array(
+            [
+                result[reduction.name] if result is not None else np.nan
+                for result in results
+            ],
+            dtype=float,
+        )
+        for reduction in reductions
+    }
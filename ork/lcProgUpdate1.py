@@ -7,10 +7,18 @@ import matplotlib.pyplot as plt
 import orlab
 from orlab import FlightDataType, FlightEvent
 
+from batchMetrics import batch_flight_metrics, stack_runs
+from fastTimeseries import get_timeseries_fast
+from pipelineTiming import PipelineTimer, timed, timed_enter
+from plotDownsampling import axes_pixel_width, downsample_indices, plot_downsampled
 
-def setup_directories():
+
+def setup_directories(version=None):
     """
     Create and return the directories for storing plots and text outputs.
+    Args:
+        version (str, optional): Rocket version number (e.g. "2" for v2).
+            Prompted for if not given.
     Returns:
         plots_dir (str): Path to main output directory.
         key_info_file_path (str): Path to the .txt file for key info.
@@ -18,7 +26,8 @@ def setup_directories():
     """
 
     # 0. Set the path to the .ork file
-    version = input("Enter the version number (e.g., 2 for v2): ")
+    if version is None:
+        version = input("Enter the version number (e.g., 2 for v2): ")
     ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
     print(f".ork file path set to: {ork_file}")
 
@@ -36,12 +45,13 @@ def setup_directories():
     return ork_file, plots_dir, key_info_file_path, individual_plots_dir
 
 
-def load_and_run_simulation(helper, ork_file):
+def load_and_run_simulation(helper, ork_file, timer=None):
     """
     Load the .ork file, retrieve the first simulation, run it, and return the simulation object.
     Args:
         helper (Helper): orlab.Helper instance.
         ork_file (str): Path to the .ork file.
+        timer (PipelineTimer, optional): Records the load and run stage timings.
     Returns:
         sim (Simulation or None): OpenRocket simulation object if successful, else None.
     """
@@ -51,8 +61,9 @@ def load_and_run_simulation(helper, ork_file):
 
     print(f"[INFO] Found .ork file at path: {ork_file}")
     try:
-        doc = helper.load_doc(ork_file)
-        sim = doc.getSimulation(0)
+        with timed(timer, "load_doc"):
+            doc = helper.load_doc(ork_file)
+            sim = doc.getSimulation(0)
         print(f"[INFO] Loaded rocket model from '{ork_file}'.\n")
     except Exception as e:
         print(f"[ERROR] Failed to load the .ork file: {e}")
@@ -60,7 +71,8 @@ def load_and_run_simulation(helper, ork_file):
 
     # Run the simulation
     try:
-        helper.run_simulation(sim)
+        with timed(timer, "run_simulation"):
+            helper.run_simulation(sim)
         print("[INFO] Simulation run successful.\n")
     except Exception as e:
         print(f"[ERROR] Simulation failed: {e}")
@@ -69,34 +81,37 @@ def load_and_run_simulation(helper, ork_file):
     return sim
 
 
-def retrieve_data_and_events(helper, sim):
+def retrieve_data_and_events(helper, sim, timer=None):
     """
     Retrieve timeseries data and flight events from the simulation.
     Args:
         helper (Helper): orlab.Helper instance.
         sim (Simulation): OpenRocket simulation object.
+        timer (PipelineTimer, optional): Records the data marshalling stage timings.
     Returns:
         data (dict): Dictionary of flight data arrays.
         events (dict): Dictionary of flight events to times.
     """
     # Retrieve multiple flight data types
     try:
-        data = helper.get_timeseries(
-            sim,
-            [
-                FlightDataType.TYPE_TIME,
-                FlightDataType.TYPE_ALTITUDE,
-                FlightDataType.TYPE_VELOCITY_TOTAL,
-                FlightDataType.TYPE_ACCELERATION_TOTAL,
-                FlightDataType.TYPE_THRUST_FORCE,
-                FlightDataType.TYPE_DRAG_FORCE,
-                FlightDataType.TYPE_MASS,
-                FlightDataType.TYPE_MACH_NUMBER,
-                FlightDataType.TYPE_AOA,  # Angle of Attack
-                FlightDataType.TYPE_CG_LOCATION,
-                FlightDataType.TYPE_CP_LOCATION,
-            ],
-        )
+        with timed(timer, "get_timeseries"):
+            data = get_timeseries_fast(
+                helper,
+                sim,
+                [
+                    FlightDataType.TYPE_TIME,
+                    FlightDataType.TYPE_ALTITUDE,
+                    FlightDataType.TYPE_VELOCITY_TOTAL,
+                    FlightDataType.TYPE_ACCELERATION_TOTAL,
+                    FlightDataType.TYPE_THRUST_FORCE,
+                    FlightDataType.TYPE_DRAG_FORCE,
+                    FlightDataType.TYPE_MASS,
+                    FlightDataType.TYPE_MACH_NUMBER,
+                    FlightDataType.TYPE_AOA,  # Angle of Attack
+                    FlightDataType.TYPE_CG_LOCATION,
+                    FlightDataType.TYPE_CP_LOCATION,
+                ],
+            )
         print("[INFO] Flight data retrieved successfully.\n")
     except Exception as e:
         print(f"[ERROR] Failed to retrieve flight data: {e}")
@@ -104,7 +119,8 @@ def retrieve_data_and_events(helper, sim):
 
     # Retrieve flight events
     try:
-        events = helper.get_events(sim)
+        with timed(timer, "get_events"):
+            events = helper.get_events(sim)
         print("[INFO] Flight events retrieved successfully.\n")
         if events:
             print("[DEBUG] All Flight Events:")
@@ -323,6 +339,19 @@ def compute_and_write_key_info(data, events, file_handle):
         file_handle.write("   - GROUND_HIT event not found in simulation.\n\n")
 
 
+def summarize_flight(data, events):
+    """
+    Reduce one simulation to the scalar metrics used to compare rocket versions.
+    Args:
+        data (dict): Dictionary of flight data arrays.
+        events (dict): Dictionary of flight events.
+    Returns:
+        summary (dict): Metric name -> value (see batchMetrics.batch_flight_metrics).
+    """
+    metrics = batch_flight_metrics(stack_runs([data], list(data.keys())), [events])
+    return {name: float(values[0]) for name, values in metrics.items()}
+
+
 def plot_flight_events(ax, events, event_labels, event_colors, time):
     """
     Plot flight events as vertical lines with labels on the given axis.
@@ -439,16 +468,19 @@ def generate_plots(
     # 1. Thrust vs Time with on-rail phase
     try:
         plt.figure(figsize=(12, 6))
-        plt.plot(time, thrust_force_lbf, "b-", label="Thrust Force (lbf)")
+        # Thin the trace once so the line and the on-rail fill use the same samples
+        idx = downsample_indices(time, thrust_force_lbf, axes_pixel_width(plt.gca()))
+        plot_time, plot_thrust = time[idx], thrust_force_lbf[idx]
+        plt.plot(plot_time, plot_thrust, "b-", label="Thrust Force (lbf)")
 
         liftoff_times = events.get(FlightEvent.LIFTOFF, [])
         if liftoff_times:
             liftoff_time = min(liftoff_times)
             plt.axvline(x=liftoff_time, color="g", linestyle="--", label="Liftoff")
-            mask = time <= liftoff_time
+            mask = plot_time <= liftoff_time
             plt.fill_between(
-                time,
-                thrust_force_lbf,
+                plot_time,
+                plot_thrust,
                 where=mask,
                 color="orange",
                 alpha=0.3,
@@ -478,7 +510,9 @@ def generate_plots(
     # 2. Velocity vs Time with all flight events labeled
     try:
         plt.figure(figsize=(12, 6))
-        plt.plot(time, velocity_ft_s, "r-", label="Velocity (ft/s)")
+        plot_downsampled(
+            plt.gca(), time, velocity_ft_s, "r-", label="Velocity (ft/s)"
+        )
 
         plt.xlabel("Time (s)")
         plt.ylabel("Velocity (ft/s)")
@@ -503,7 +537,7 @@ def generate_plots(
     # 3. Altitude vs Time with all flight events labeled
     try:
         plt.figure(figsize=(12, 6))
-        plt.plot(time, altitude, "g-", label="Altitude (m)")
+        plot_downsampled(plt.gca(), time, altitude, "g-", label="Altitude (m)")
 
         plt.xlabel("Time (s)")
         plt.ylabel("Altitude (m)")
@@ -558,7 +592,8 @@ def generate_plots(
             descent_velocity_ft_s = descent_velocity_data * 3.28084
 
             plt.figure(figsize=(12, 6))
-            plt.plot(
+            plot_downsampled(
+                plt.gca(),
                 descent_time,
                 descent_velocity_ft_s,
                 "c-",
@@ -606,25 +641,42 @@ def generate_plots(
         file_handle.write(f"Error during descent velocity plot: {e}\n\n")
 
 
-def lcProgUpdate1():
+def lcProgUpdate1(version=None):
     """
     Main function to run the entire logic of building directories, loading & simulating the rocket,
     retrieving data and events, computing key info, and generating plots.
+    Args:
+        version (str, optional): Rocket version number (e.g. "2" for v2).
+            Prompted for if not given.
+    Returns:
+        summary (dict or None): Key flight metrics (see summarize_flight), or
+            None if the run did not complete.
     """
     # Set up directories
-    ork_file, plots_dir, key_info_file_path, individual_plots_dir = setup_directories()
-
-    # Create an OpenRocket instance
-    with orlab.OpenRocketInstance() as instance:
+    ork_file, plots_dir, key_info_file_path, individual_plots_dir = setup_directories(
+        version
+    )
+    # Fail before paying for JVM startup
+    if not os.path.exists(ork_file):
+        print(f"[ERROR] The .ork file was not found at path: {ork_file}")
+        return
+
+    # Create an OpenRocket instance, timing each stage of the pipeline
+    # (HYPERION_PROFILE=1 also dumps a cProfile)
+    timer = PipelineTimer("lcProgUpdate1")
+    with timer.session(
+        os.path.join(plots_dir, "lcProgUpdate1_timing.json"),
+        os.path.join(plots_dir, "lcProgUpdate1.prof"),
+    ), timed_enter(timer, "jvm_startup", orlab.OpenRocketInstance()) as instance:
         helper = orlab.Helper(instance)
 
         # Load and run the simulation
-        sim = load_and_run_simulation(helper, ork_file)
+        sim = load_and_run_simulation(helper, ork_file, timer)
         if sim is None:
             return  # Early exit if failed to load or run
 
         # Retrieve data and events
-        data, events = retrieve_data_and_events(helper, sim)
+        data, events = retrieve_data_and_events(helper, sim, timer)
         if data is None or events is None:
             return  # Early exit if data or events could not be retrieved
 
@@ -647,7 +699,9 @@ def lcProgUpdate1():
                 return  # Early exit if missing data
 
             # Compute and record key info
-            compute_and_write_key_info(data, events, f)
+            with timed(timer, "metrics"):
+                compute_and_write_key_info(data, events, f)
+                summary = summarize_flight(data, events)
 
             # Generate and save plots
             time = data[FlightDataType.TYPE_TIME]
@@ -655,16 +709,23 @@ def lcProgUpdate1():
             velocity_total = data[FlightDataType.TYPE_VELOCITY_TOTAL]
             thrust_force = data[FlightDataType.TYPE_THRUST_FORCE]
 
-            generate_plots(
-                time,
-                altitude,
-                velocity_total,
-                thrust_force,
-                events,
-                f,
-                individual_plots_dir,
-            )
+            with timed(timer, "plotting"):
+                generate_plots(
+                    time,
+                    altitude,
+                    velocity_total,
+                    thrust_force,
+                    events,
+                    f,
+                    individual_plots_dir,
+                )
+
+    return summary
 
 
 if __name__ == "__main__":
-    lcProgUpdate1()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate and plot one rocket version.")
+    parser.add_argument("--version", help="Rocket version number, e.g. 2 for v2")
+    lcProgUpdate1(parser.parse_args().version)
@@ -1,6 +1,7 @@
 # massBudgetSensitivity.py
 
 import os
+from collections import Counter, defaultdict
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -10,6 +11,59 @@ import logging
 import orlab
 from orlab import FlightDataType
 
+from batchMetrics import batch_flight_metrics, stack_runs
+from fastTimeseries import get_timeseries_fast
+from jvmReductions import SWEEP_REDUCTIONS, reduce_flight_data, stack_reductions
+from pipelineTiming import PipelineTimer, timed_enter
+from sharedTimeseries import open_timeseries
+from simulationListeners import parse_flight_event, simulation_listeners
+from streamingStats import StreamingSummary, load_summary, save_summary
+from sweepStore import SweepResultsStore, cell_key
+from sweepWorkers import run_mass_sweep_parallel
+from windProfiles import load_wind_table
+
+# Flight data needed for the sweep metrics
+METRIC_DATA_TYPES = [
+    FlightDataType.TYPE_TIME,
+    FlightDataType.TYPE_ALTITUDE,
+    FlightDataType.TYPE_VELOCITY_TOTAL,
+    FlightDataType.TYPE_ACCELERATION_TOTAL,
+    FlightDataType.TYPE_MACH_NUMBER,
+    FlightDataType.TYPE_STABILITY,
+]
+
+RESULT_COLUMNS = [
+    "Component ID",
+    "Component Name",
+    "Component Type",
+    "Mass Variation (%)",
+    "Apogee (m)",
+    "Max Velocity (m/s)",
+    "Max Acceleration (m/s^2)",
+    "Max Mach Number",
+    "Stability Margin (calibers)",
+]
+
+# Metrics whose distribution over all runs is summarized, with the bin width
+# of their histograms
+DISTRIBUTION_BIN_WIDTHS = {
+    "apogee": 1.0,
+    "max_velocity": 0.5,
+    "max_acceleration": 1.0,
+    "max_mach": 0.005,
+    "min_stability": 0.01,
+    "rail_exit_velocity": 0.1,
+    "ground_hit_velocity": 0.1,
+}
+
+# Cells the sweep gave up on (after all retries, for the parallel sweep)
+FAILURE_COLUMNS = [
+    "Component ID",
+    "Component Name",
+    "Mass Variation (%)",
+    "Error",
+]
+
 
 def setup_logging():
     """Configure logging for the script."""
@@ -26,9 +80,250 @@ def setup_logging():
     logging.getLogger("").addHandler(console)
 
 
-def mass_budget_sensitivity_analysis():
+def build_component_rows(
+    component_id,
+    component_name,
+    component_type,
+    variations,
+    runs,
+    timer,
+    reduced=False,
+    events=None,
+    summary=None,
+):
+    """
+    Reduce one component's runs to metrics and build its result rows.
+    Args:
+        component_id: Component ID (Java or Python string).
+        component_name (str): Component name.
+        component_type (str): Component class name.
+        variations (list): Mass variation in percent of each run.
+        runs (list): Timeseries dictionary of each run (None for failed runs).
+        timer (PipelineTimer): Records the metrics stage.
+        reduced (bool): runs hold reduce_flight_data scalars (SWEEP_REDUCTIONS)
+            instead of timeseries.
+        events (list, optional): Event dictionary of each run, for the
+            event-relative metrics of timeseries runs.
+        summary (StreamingSummary, optional): Distribution summary to add
+            this component's metrics to.
+    Returns:
+        component_rows (list): One RESULT_COLUMNS dictionary per run.
+    """
+    # Extract metrics for all of this component's runs at once
+    with timer.stage("metrics", component_name):
+        if reduced:
+            metrics = stack_reductions(runs, SWEEP_REDUCTIONS)
+        else:
+            metrics = batch_flight_metrics(stack_runs(runs, METRIC_DATA_TYPES), events)
+    if summary is not None:
+        summary.update(metrics)
+    component_rows = []
+    for i, mass_variation_percent in enumerate(variations):
+        apogee = metrics["apogee"][i]
+        max_velocity = metrics["max_velocity"][i]
+        max_acceleration = metrics["max_acceleration"][i]
+        max_mach = metrics["max_mach"][i]
+        min_stability = metrics["min_stability"][i]  # Assuming lower is better
+
+        if runs[i] is not None:
+            logging.info(
+                f"Metrics for '{component_name}' at {mass_variation_percent:+.0f}% mass variation: Apogee={apogee:.2f} m, Max Velocity={max_velocity:.2f} m/s, Max Acceleration={max_acceleration:.2f} m/s², Max Mach={max_mach:.2f}, Stability Margin={min_stability:.2f} calibers."
+            )
+
+        component_rows.append(
+            {
+                "Component ID": str(component_id),
+                "Component Name": component_name,
+                "Component Type": component_type,
+                "Mass Variation (%)": mass_variation_percent,
+                "Apogee (m)": apogee,
+                "Max Velocity (m/s)": max_velocity,
+                "Max Acceleration (m/s^2)": max_acceleration,
+                "Max Mach Number": max_mach,
+                "Stability Margin (calibers)": min_stability,
+            }
+        )
+    return component_rows
+
+
+def run_sweep_parallel(
+    ork_file,
+    all_components,
+    original_masses,
+    mass_multipliers,
+    completed,
+    store,
+    failures,
+    workers,
+    timer,
+    sim_timeout=None,
+    max_retries=2,
+    stop_event=None,
+    reduce_in_jvm=False,
+    wind_profile=None,
+    summary=None,
+    summary_path=None,
+):
+    """
+    Run the sweep cells in supervised OpenRocket worker processes. Each run's
+    timeseries comes back through shared memory and is read in place (or only
+    its scalar metrics come back, with reduce_in_jvm); a component's rows are
+    written as soon as all of its cells are in. Cells that
+    still fail after their retries (JVM crash, hang or simulation error) are
+    written to the failures file instead of the results, so resuming the sweep
+    runs them again.
+    Args:
+        ork_file (str): Path to the .ork file.
+        all_components (list): Components of the rocket.
+        original_masses (dict): Component ID -> mass, for components with mass.
+        mass_multipliers (np.array): Mass multipliers to apply.
+        completed (set): Cell keys already in the results file.
+        store (SweepResultsStore): Results store to append to.
+        failures (SweepResultsStore): Store for cells that failed every attempt.
+        workers (int): Number of worker processes (one JVM each).
+        timer (PipelineTimer): Records the collection and metrics stages.
+        sim_timeout (float, optional): Seconds one simulation may run before
+            its worker is restarted.
+        max_retries (int): Extra attempts for a failed cell.
+        stop_event (FlightEvent, optional): Event to end each simulation at.
+        reduce_in_jvm (bool): Reduce each run to SWEEP_REDUCTIONS in the worker's JVM.
+        wind_profile (str, optional): Wind profile file to fly every cell in.
+        summary (StreamingSummary, optional): Distribution summary to add the
+            metrics to, saved to summary_path with each component's rows.
+        summary_path (str, optional): Where to save the summary.
+    """
+    components = {
+        str(c.getID()): (str(c.getName()), c.getClass().getSimpleName())
+        for c in all_components
+        if c.getID() in original_masses
+    }
+    tasks = [
+        (component_id, float(multiplier))
+        for component_id in components
+        for multiplier in mass_multipliers
+        if cell_key(component_id, (multiplier - 1) * 100) not in completed
+    ]
+    remaining = Counter(component_id for component_id, _ in tasks)
+    collected = defaultdict(list)
+
+    results = run_mass_sweep_parallel(
+        ork_file,
+        tasks,
+        METRIC_DATA_TYPES,
+        workers,
+        timeout=sim_timeout,
+        max_retries=max_retries,
+        stop_event=stop_event.name if stop_event is not None else None,
+        reductions=SWEEP_REDUCTIONS if reduce_in_jvm else None,
+        wind_profile=wind_profile,
+    )
+    for result in tqdm(results, total=len(tasks), desc="Simulating Cells"):
+        component_id, multiplier = result["task"]
+        component_name, component_type = components[component_id]
+        mass_variation_percent = (multiplier - 1) * 100
+        run_label = f"{component_name} {mass_variation_percent:+.0f}%"
+        if result["error"] is not None:
+            logging.error(
+                f"Simulation failed for component '{component_name}' with mass variation {mass_variation_percent:+.0f}%: {result['error']}"
+            )
+            failures.append_rows(
+                [
+                    {
+                        "Component ID": component_id,
+                        "Component Name": component_name,
+                        "Mass Variation (%)": mass_variation_percent,
+                        "Error": result["error"],
+                    }
+                ]
+            )
+        elif reduce_in_jvm:
+            collected[component_id].append(
+                (mass_variation_percent, result["metrics"], None)
+            )
+        else:
+            with timer.stage("collect_shared_timeseries", run_label):
+                view = open_timeseries(result["handle"])
+                store.save_timeseries(
+                    f"{component_id}_{mass_variation_percent:+.0f}pct", view.data
+                )
+            collected[component_id].append(
+                (mass_variation_percent, view, result["events"])
+            )
+
+        remaining[component_id] -= 1
+        if remaining[component_id]:
+            continue
+        cells = sorted(collected.pop(component_id, []), key=lambda cell: cell[0])
+        if not cells:
+            continue
+        try:
+            component_rows = build_component_rows(
+                component_id,
+                component_name,
+                component_type,
+                [pct for pct, _, _ in cells],
+                [run if reduce_in_jvm else run.data for _, run, _ in cells],
+                timer,
+                reduced=reduce_in_jvm,
+                events=[events for _, _, events in cells],
+                summary=summary,
+            )
+        finally:
+            if not reduce_in_jvm:
+                for _, view, _ in cells:
+                    view.close()
+        store.append_rows(component_rows)
+        if summary is not None:
+            save_summary(summary, summary_path)
+
+
+def mass_budget_sensitivity_analysis(
+    resume=True,
+    save_timeseries=False,
+    workers=1,
+    sim_timeout=None,
+    max_retries=2,
+    stop_event=None,
+    reduce_in_jvm=False,
+    wind_profile=None,
+):
+    """
+    Vary the mass of every component and record how the flight metrics respond.
+    Args:
+        resume (bool): Continue from an existing results file, skipping the
+            (component, mass variation) cells it already holds.
+        save_timeseries (bool): Also save each run's timeseries as a compressed .npz file.
+        workers (int): Run the cells in this many OpenRocket worker processes
+            (1 runs them in this process unless sim_timeout is set).
+        sim_timeout (float, optional): Seconds one simulation may run. Setting it
+            runs the cells in supervised worker processes even with one worker,
+            so a hung or crashed JVM is restarted instead of ending the sweep.
+        max_retries (int): Extra attempts for a cell whose worker crashes, hangs
+            or raises, in the worker processes.
+        stop_event (FlightEvent or str, optional): End each simulation at this
+            event (e.g. "apogee") instead of ground hit. Apogee and the maxima
+            all occur during ascent; the minimum stability margin is then taken
+            over the ascent only.
+        reduce_in_jvm (bool): Reduce each run to its scalar metrics inside the
+            JVM so no timeseries cross the bridge. Timeseries are then not saved.
+        wind_profile (str, optional): Wind profile file (sounding text or CSV)
+            to fly every cell in instead of the .ork wind settings. Resumed
+            cells are not re-run, so start a fresh sweep when changing it.
+    """
     setup_logging()
     logging.info("Starting mass budget sensitivity analysis.")
+    if stop_event is not None:
+        stop_event = parse_flight_event(stop_event)
+        logging.info(f"Simulations end at {stop_event.name}.")
+    if wind_profile is not None:
+        # Parse once here; workers load the cached table
+        table = load_wind_table(wind_profile)
+        logging.info(
+            f"Wind from '{wind_profile}' ({len(table.altitudes_m)} levels up to {table.altitudes_m[-1]:.0f} m)."
+        )
+    if reduce_in_jvm and save_timeseries:
+        logging.warning("Timeseries are not saved when reducing in the JVM.")
+        save_timeseries = False
 
     # Define the mass variation percentages
     mass_variations = np.arange(-5, 6, 1)  # -5%, -4%, ..., 0%, ..., +5%
@@ -36,7 +331,13 @@ def mass_budget_sensitivity_analysis():
     # Convert percentages to multipliers
     mass_multipliers = 1 + (mass_variations / 100.0)
 
-    with orlab.OpenRocketInstance() as instance:
+    # Time each stage of every run (HYPERION_PROFILE=1 also dumps a cProfile)
+    timer = PipelineTimer("massBudgetSensitivity")
+    timing_dir = os.path.join("ork", "outputs")
+    with timer.session(
+        os.path.join(timing_dir, "mass_budget_timing.csv"),
+        os.path.join(timing_dir, "mass_budget.prof"),
+    ), timed_enter(timer, "jvm_startup", orlab.OpenRocketInstance()) as instance:
         orl = orlab.Helper(instance)
 
         # Load the document and get the simulation
@@ -46,8 +347,9 @@ def mass_budget_sensitivity_analysis():
             return
 
         try:
-            doc = orl.load_doc(ork_file)
-            sim = doc.getSimulation(0)
+            with timer.stage("load_doc"):
+                doc = orl.load_doc(ork_file)
+                sim = doc.getSimulation(0)
             rocket = sim.getRocket()
             logging.info(f"Loaded rocket model from '{ork_file}'.")
         except Exception as e:
@@ -78,11 +380,74 @@ def mass_budget_sensitivity_analysis():
             logging.warning("No components with mass found in the rocket model.")
             return
 
-        # Prepare a list to store results
-        results_list = []
+        # Create 'plots' directory if it doesn't exist
+        plots_dir = os.path.join("ork", "outputs")
+        if not os.path.exists(plots_dir):
+            os.makedirs(plots_dir)
+            logging.info(f"Created directory '{plots_dir}' for storing plots.")
+
+        # Stream results to disk as each component finishes so a crash mid-sweep
+        # only loses the component in progress
+        results_path = os.path.join(plots_dir, "mass_budget_sensitivity_results.csv")
+        store = SweepResultsStore(
+            results_path,
+            RESULT_COLUMNS,
+            timeseries_dir=(
+                os.path.join(plots_dir, "mass_budget_timeseries")
+                if save_timeseries
+                else None
+            ),
+            resume=resume,
+        )
+        completed = store.completed_cells(("Component ID", "Mass Variation (%)"))
+        # Failed cells are kept out of the results, so resuming runs them again
+        failures_path = os.path.join(plots_dir, "mass_budget_failures.csv")
+        failures = SweepResultsStore(failures_path, FAILURE_COLUMNS, resume=resume)
+
+        # Distribution of the metrics over all runs, kept as mergeable
+        # accumulators instead of a table of every run; saved with each
+        # component's rows so a resumed sweep continues it
+        summary_path = os.path.join(plots_dir, "mass_budget_summary.json")
+        if completed and os.path.exists(summary_path):
+            summary = load_summary(summary_path)
+        else:
+            if completed:
+                logging.warning(
+                    "No saved distribution summary; it will only cover the cells run now."
+                )
+            summary = StreamingSummary(DISTRIBUTION_BIN_WIDTHS)
+        if completed:
+            logging.info(
+                f"Resuming from '{results_path}': {len(completed)} completed runs will be skipped."
+            )
+
+        if workers > 1 or sim_timeout is not None:
+            # Cells run in worker processes; the loop below is the serial path
+            run_sweep_parallel(
+                ork_file,
+                all_components,
+                original_masses,
+                mass_multipliers,
+                completed,
+                store,
+                failures,
+                workers,
+                timer,
+                sim_timeout=sim_timeout,
+                max_retries=max_retries,
+                stop_event=stop_event,
+                reduce_in_jvm=reduce_in_jvm,
+                wind_profile=wind_profile,
+                summary=summary,
+                summary_path=summary_path,
+            )
+            serial_components = []
+        else:
+            serial_components = all_components
+        listeners = simulation_listeners(stop_event, wind_profile)
 
         # Loop over components
-        for component in tqdm(all_components, desc="Analyzing Components"):
+        for component in tqdm(serial_components, desc="Analyzing Components"):
             component_id = component.getID()
             # Convert Java string to Python string
             component_name = str(component.getName())
@@ -94,9 +459,18 @@ def mass_budget_sensitivity_analysis():
 
             original_mass = original_masses[component_id]
 
+            # Timeseries (or JVM-reduced scalars) of each successful run for
+            # this component, reduced to metrics together once all multipliers
+            # have been run
+            component_variations = []
+            component_runs = []
+            component_events = []
+
             # Loop over mass multipliers
             for multiplier in mass_multipliers:
                 mass_variation_percent = (multiplier - 1) * 100
+                if cell_key(component_id, mass_variation_percent) in completed:
+                    continue
                 new_mass = original_mass * multiplier
 
                 # Apply mass override
@@ -107,8 +481,10 @@ def mass_budget_sensitivity_analysis():
                 )
 
                 # Run the simulation
+                run_label = f"{component_name} {mass_variation_percent:+.0f}%"
                 try:
-                    orl.run_simulation(sim)
+                    with timer.stage("run_simulation", run_label):
+                        orl.run_simulation(sim, listeners)
                     logging.info(
                         f"Simulation run successful for component '{component_name}' with mass variation {mass_variation_percent:+.0f}%."
                     )
@@ -116,83 +492,96 @@ def mass_budget_sensitivity_analysis():
                     logging.error(
                         f"Simulation failed for component '{component_name}' with mass variation {mass_variation_percent:+.0f}%: {e}"
                     )
-                    # Record NaN for all metrics if simulation fails
-                    results_list.append(
-                        {
-                            "Component ID": component_id,
-                            "Component Name": component_name,
-                            "Component Type": component_type,
-                            "Mass Variation (%)": mass_variation_percent,
-                            "Apogee (m)": np.nan,
-                            "Max Velocity (m/s)": np.nan,
-                            "Max Acceleration (m/s^2)": np.nan,
-                            "Max Mach Number": np.nan,
-                            "Stability Margin (calibers)": np.nan,
-                        }
+                    failures.append_rows(
+                        [
+                            {
+                                "Component ID": str(component_id),
+                                "Component Name": component_name,
+                                "Mass Variation (%)": mass_variation_percent,
+                                "Error": f"{type(e).__name__}: {e}",
+                            }
+                        ]
                     )
                     # Reset mass override and continue
                     component.setMassOverridden(False)
                     continue
 
-                # Collect performance metrics
+                # Collect performance data
                 try:
-                    data = orl.get_timeseries(
-                        sim,
-                        [
-                            FlightDataType.TYPE_TIME,
-                            FlightDataType.TYPE_ALTITUDE,
-                            FlightDataType.TYPE_VELOCITY_TOTAL,
-                            FlightDataType.TYPE_ACCELERATION_TOTAL,
-                            FlightDataType.TYPE_MACH_NUMBER,
-                            FlightDataType.TYPE_STABILITY,
-                        ],
-                    )
-
-                    # Extract metrics
-                    apogee = np.max(data[FlightDataType.TYPE_ALTITUDE])
-                    max_velocity = np.max(data[FlightDataType.TYPE_VELOCITY_TOTAL])
-                    max_acceleration = np.max(
-                        data[FlightDataType.TYPE_ACCELERATION_TOTAL]
-                    )
-                    max_mach = np.max(data[FlightDataType.TYPE_MACH_NUMBER])
-                    min_stability = np.min(
-                        data[FlightDataType.TYPE_STABILITY]
-                    )  # Assuming lower is better
-
-                    logging.info(
-                        f"Metrics for '{component_name}' at {mass_variation_percent:+.0f}% mass variation: Apogee={apogee:.2f} m, Max Velocity={max_velocity:.2f} m/s, Max Acceleration={max_acceleration:.2f} m/s², Max Mach={max_mach:.2f}, Stability Margin={min_stability:.2f} calibers."
-                    )
-
+                    if reduce_in_jvm:
+                        with timer.stage("reduce_in_jvm", run_label):
+                            data = reduce_flight_data(orl, sim, SWEEP_REDUCTIONS)
+                    else:
+                        with timer.stage("get_timeseries", run_label):
+                            data = get_timeseries_fast(orl, sim, METRIC_DATA_TYPES)
+                            events = orl.get_events(sim)
                 except Exception as e:
                     logging.error(
                         f"Error extracting data for component '{component_name}' with mass variation {mass_variation_percent:+.0f}%: {e}"
                     )
-                    apogee = np.nan
-                    max_velocity = np.nan
-                    max_acceleration = np.nan
-                    max_mach = np.nan
-                    min_stability = np.nan
-
-                # Append results to the list
-                results_list.append(
-                    {
-                        "Component ID": component_id,
-                        "Component Name": component_name,
-                        "Component Type": component_type,
-                        "Mass Variation (%)": mass_variation_percent,
-                        "Apogee (m)": apogee,
-                        "Max Velocity (m/s)": max_velocity,
-                        "Max Acceleration (m/s^2)": max_acceleration,
-                        "Max Mach Number": max_mach,
-                        "Stability Margin (calibers)": min_stability,
-                    }
-                )
+                    failures.append_rows(
+                        [
+                            {
+                                "Component ID": str(component_id),
+                                "Component Name": component_name,
+                                "Mass Variation (%)": mass_variation_percent,
+                                "Error": f"{type(e).__name__}: {e}",
+                            }
+                        ]
+                    )
+                    component.setMassOverridden(False)
+                    continue
+                component_variations.append(mass_variation_percent)
+                component_runs.append(data)
+                component_events.append(None if reduce_in_jvm else events)
+                if not reduce_in_jvm:
+                    with timer.stage("store_timeseries", run_label):
+                        store.save_timeseries(
+                            f"{component_id}_{mass_variation_percent:+.0f}pct", data
+                        )
 
                 # Reset mass override for the component
                 component.setMassOverridden(False)
 
-        # Create DataFrame from results list
-        results = pd.DataFrame(results_list)
+            if not component_runs:
+                continue  # All runs of this component were completed or failed
+
+            component_rows = build_component_rows(
+                component_id,
+                component_name,
+                component_type,
+                component_variations,
+                component_runs,
+                timer,
+                reduced=reduce_in_jvm,
+                events=component_events,
+                summary=summary,
+            )
+
+            # Flush this component's rows before moving on
+            store.append_rows(component_rows)
+            save_summary(summary, summary_path)
+
+        store.close()
+        failures.close()
+        logging.info(f"Simulation results saved to '{results_path}'.")
+
+        distribution = summary.to_frame()
+        distribution_path = os.path.join(plots_dir, "mass_budget_distribution.csv")
+        histograms_path = os.path.join(plots_dir, "mass_budget_histograms.csv")
+        distribution.to_csv(distribution_path, index=False)
+        summary.histograms_frame().to_csv(histograms_path, index=False)
+        for row in distribution.itertuples():
+            if row.count:
+                logging.info(
+                    f"{row.metric}: p1={row.p1:.2f}, p50={row.p50:.2f}, p99={row.p99:.2f} over {row.count} runs."
+                )
+        logging.info(
+            f"Metric distributions saved to '{distribution_path}' and '{histograms_path}'."
+        )
+
+        # Load all results, including any from a resumed sweep
+        results = pd.read_csv(results_path)
 
         # Verify if 'Component Name' exists
         if "Component Name" not in results.columns:
@@ -206,17 +595,6 @@ def mass_budget_sensitivity_analysis():
             if component.getID() in original_masses:
                 component.setMassOverridden(False)
 
-        # Save results to CSV (optional, since you requested to remove other outputs)
-        # Uncomment the next two lines if you still want to save the CSV
-        # results.to_csv("mass_budget_sensitivity_results.csv", index=False)
-        # logging.info("Simulation results saved to 'mass_budget_sensitivity_results.csv'.")
-
-        # Create 'plots' directory if it doesn't exist
-        plots_dir = os.path.join("ork", "outputs")
-        if not os.path.exists(plots_dir):
-            os.makedirs(plots_dir)
-            logging.info(f"Created directory '{plots_dir}' for storing plots.")
-
         # Data Analysis and Visualization
         # Group results by component
         grouped = results.groupby("Component Name")
@@ -256,29 +634,30 @@ def mass_budget_sensitivity_analysis():
         # sensitivity_df.to_csv("mass_sensitivity_summary.csv", index=False)
         # logging.info("Sensitivity summary saved to 'mass_sensitivity_summary.csv'.")
 
-        # Plot the sensitivity as a bar chart for Apogee Only
-        plt.figure(figsize=(12, 8))
-        # Sort components by sensitivity for this metric
-        sensitivity_metric_df = (
-            sensitivity_df[["Component Name", "Sensitivity (m per % mass change)"]]
-            .dropna()
-            .sort_values(by="Sensitivity (m per % mass change)", ascending=False)
-        )
-        plt.barh(
-            sensitivity_metric_df["Component Name"],
-            sensitivity_metric_df["Sensitivity (m per % mass change)"],
-            color="skyblue",
-        )
-        plt.xlabel("Sensitivity (m per % mass change)")
-        plt.title("Apogee Sensitivity to Mass Variation by Component")
-        plt.gca().invert_yaxis()  # Highest sensitivity on top
-        plt.grid(axis="x")
-        plt.tight_layout()
-        # Save plot
-        filename = "apogee_sensitivity_bar_chart.png"
-        plt.savefig(os.path.join(plots_dir, filename))
-        plt.close()
-        logging.info(f"Saved plot: {filename}")
+        with timer.stage("plotting"):
+            # Plot the sensitivity as a bar chart for Apogee Only
+            plt.figure(figsize=(12, 8))
+            # Sort components by sensitivity for this metric
+            sensitivity_metric_df = (
+                sensitivity_df[["Component Name", "Sensitivity (m per % mass change)"]]
+                .dropna()
+                .sort_values(by="Sensitivity (m per % mass change)", ascending=False)
+            )
+            plt.barh(
+                sensitivity_metric_df["Component Name"],
+                sensitivity_metric_df["Sensitivity (m per % mass change)"],
+                color="skyblue",
+            )
+            plt.xlabel("Sensitivity (m per % mass change)")
+            plt.title("Apogee Sensitivity to Mass Variation by Component")
+            plt.gca().invert_yaxis()  # Highest sensitivity on top
+            plt.grid(axis="x")
+            plt.tight_layout()
+            # Save plot
+            filename = "apogee_sensitivity_bar_chart.png"
+            plt.savefig(os.path.join(plots_dir, filename))
+            plt.close()
+            logging.info(f"Saved plot: {filename}")
 
         logging.info(f"All plots saved in the '{plots_dir}' directory.")
         logging.info("Mass budget sensitivity analysis completed successfully.")
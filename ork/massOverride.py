@@ -8,6 +8,11 @@ import logging
 import orlab
 from orlab import FlightDataType
 
+from batchMetrics import batch_flight_metrics, stack_runs
+from fastTimeseries import get_timeseries_fast
+from pipelineTiming import PipelineTimer, timed_enter
+from simulationListeners import simulation_listeners
+
 
 def setup_logging():
     """Configure logging to output to both console and a specified log file."""
@@ -20,14 +25,28 @@ def setup_logging():
     )
 
 
-def mass_override_analysis():
+def mass_override_analysis(stop_event=None, wind_profile=None):
+    """
+    Sweep the payload mass and plot its effect on apogee and max velocity.
+    Args:
+        stop_event (FlightEvent or str, optional): End each simulation at this
+            event (e.g. "apogee"); both metrics are reached by apogee, so the
+            descent does not need to be simulated.
+        wind_profile (str, optional): Wind profile file (sounding text or CSV)
+            to fly every run in instead of the .ork wind settings.
+    """
     # Define the plots directory
     plots_dir = os.path.join("ork", "outputs")
     os.makedirs(plots_dir, exist_ok=True)
 
     setup_logging()
 
-    with orlab.OpenRocketInstance() as instance:
+    # Time each stage of every run (HYPERION_PROFILE=1 also dumps a cProfile)
+    timer = PipelineTimer("massOverride")
+    with timer.session(
+        os.path.join(plots_dir, "mass_override_timing.csv"),
+        os.path.join(plots_dir, "mass_override.prof"),
+    ), timed_enter(timer, "jvm_startup", orlab.OpenRocketInstance()) as instance:
         orl = orlab.Helper(instance)
 
         # Load the document and get the simulation
@@ -37,8 +56,9 @@ def mass_override_analysis():
             return
 
         try:
-            doc = orl.load_doc(ork_file)
-            sim = doc.getSimulation(0)
+            with timer.stage("load_doc"):
+                doc = orl.load_doc(ork_file)
+                sim = doc.getSimulation(0)
             rocket = sim.getRocket()
             logging.info(f"Loaded rocket model from '{ork_file}'.\n")
         except Exception as e:
@@ -62,9 +82,9 @@ def mass_override_analysis():
         # Define a range of mass multipliers
         mass_multipliers = np.linspace(0.5, 1.5, 11)  # From 50% to 150% of base mass
 
-        apogees = []
-        max_velocities = []
         payload_masses = mass_multipliers * base_mass
+        runs = []
+        listeners = simulation_listeners(stop_event, wind_profile)
 
         for multiplier, mass in zip(mass_multipliers, payload_masses):
             mass_variation_percent = (multiplier - 1) * 100
@@ -75,55 +95,68 @@ def mass_override_analysis():
             payload.setOverrideMass(mass)
 
             # Run the simulation
+            run_label = f"{mass_variation_percent:+.0f}%"
             try:
-                orl.run_simulation(sim)
+                with timer.stage("run_simulation", run_label):
+                    orl.run_simulation(sim, listeners)
                 logging.info("Simulation run successful.")
-                data = orl.get_timeseries(
-                    sim,
-                    [
-                        FlightDataType.TYPE_ALTITUDE,
-                        FlightDataType.TYPE_VELOCITY_TOTAL,
-                    ],
-                )
-                apogee = np.max(data[FlightDataType.TYPE_ALTITUDE])
-                max_velocity = np.max(data[FlightDataType.TYPE_VELOCITY_TOTAL])
-                logging.info(
-                    f"Apogee: {apogee:.2f} m, Max Velocity: {max_velocity:.2f} m/s.\n"
-                )
+                with timer.stage("get_timeseries", run_label):
+                    runs.append(
+                        get_timeseries_fast(
+                            orl,
+                            sim,
+                            [
+                                FlightDataType.TYPE_ALTITUDE,
+                                FlightDataType.TYPE_VELOCITY_TOTAL,
+                            ],
+                        )
+                    )
             except Exception as e:
                 logging.error(f"Simulation failed: {e}")
-                apogee = np.nan
-                max_velocity = np.nan
-
-            apogees.append(apogee)
-            max_velocities.append(max_velocity)
+                runs.append(None)
+
+        # Extract apogee and max velocity for all runs at once
+        with timer.stage("metrics"):
+            metrics = batch_flight_metrics(
+                stack_runs(
+                    runs,
+                    [FlightDataType.TYPE_ALTITUDE, FlightDataType.TYPE_VELOCITY_TOTAL],
+                )
+            )
+        apogees = metrics["apogee"]
+        max_velocities = metrics["max_velocity"]
+        for mass, apogee, max_velocity in zip(payload_masses, apogees, max_velocities):
+            logging.info(
+                f"Payload {mass:.2f} kg - Apogee: {apogee:.2f} m, Max Velocity: {max_velocity:.2f} m/s.\n"
+            )
 
         # Reset the mass override
         payload.setMassOverridden(False)
         logging.info("Reset Payload mass override.\n")
 
-        # Plot the results
-        fig, axs = plt.subplots(2, 1, figsize=(10, 10))
-
-        # Apogee vs Payload Mass
-        axs[0].plot(payload_masses, apogees, "o-b")
-        axs[0].set_xlabel("Payload Mass (kg)")
-        axs[0].set_ylabel("Apogee Altitude (m)")
-        axs[0].set_title("Effect of Payload Mass on Apogee Altitude")
-        axs[0].grid(True)
-
-        # Max Velocity vs Payload Mass
-        axs[1].plot(payload_masses, max_velocities, "o-r")
-        axs[1].set_xlabel("Payload Mass (kg)")
-        axs[1].set_ylabel("Maximum Velocity (m/s)")
-        axs[1].set_title("Effect of Payload Mass on Maximum Velocity")
-        axs[1].grid(True)
-
-        plt.tight_layout()
-        plot_path = os.path.join(plots_dir, "payload_mass_effects.png")
-        plt.savefig(plot_path)
-        plt.close()
-        logging.info(f"Saved plot: {plot_path}")
+        with timer.stage("plotting"):
+            # Plot the results
+            fig, axs = plt.subplots(2, 1, figsize=(10, 10))
+
+            # Apogee vs Payload Mass
+            axs[0].plot(payload_masses, apogees, "o-b")
+            axs[0].set_xlabel("Payload Mass (kg)")
+            axs[0].set_ylabel("Apogee Altitude (m)")
+            axs[0].set_title("Effect of Payload Mass on Apogee Altitude")
+            axs[0].grid(True)
+
+            # Max Velocity vs Payload Mass
+            axs[1].plot(payload_masses, max_velocities, "o-r")
+            axs[1].set_xlabel("Payload Mass (kg)")
+            axs[1].set_ylabel("Maximum Velocity (m/s)")
+            axs[1].set_title("Effect of Payload Mass on Maximum Velocity")
+            axs[1].grid(True)
+
+            plt.tight_layout()
+            plot_path = os.path.join(plots_dir, "payload_mass_effects.png")
+            plt.savefig(plot_path)
+            plt.close()
+            logging.info(f"Saved plot: {plot_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,356 @@
+# multiFidelitySweep.py
+
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+import orlab
+
+from jvmReductions import SWEEP_REDUCTIONS, reduce_flight_data, stack_reductions
+from pipelineTiming import PipelineTimer, timed_enter
+from simulationListeners import simulation_listeners
+
+# Metrics screened at coarse fidelity, computed in the JVM for every run
+FIDELITY_METRICS = [
+    "apogee",
+    "max_velocity",
+    "max_acceleration",
+    "max_mach",
+    "min_stability",
+]
+FIDELITY_REDUCTIONS = [r for r in SWEEP_REDUCTIONS if r.name in FIDELITY_METRICS]
+
+
+def setup_logging():
+    """Configure logging to output to the console."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.StreamHandler(),
+        ],
+    )
+
+
+def run_cells(helper, sim, cells, components, time_step, listeners, timer, stage):
+    """
+    Run sweep cells at one integration time step.
+    Args:
+        helper (Helper): orlab.Helper instance.
+        sim (Simulation): OpenRocket simulation object.
+        cells (list): (component ID, mass variation in percent) cells to run.
+        components (dict): Component ID -> (component, original mass).
+        time_step (float): Integration time step in seconds.
+        listeners (list or None): Simulation listeners for every run.
+        timer (PipelineTimer): Records each run under the given stage name.
+        stage (str): Stage name, e.g. "coarse" or "fine".
+    Returns:
+        dict: Metric name -> np.array with one value per cell (NaN for failed runs).
+    """
+    sim.getOptions().setTimeStep(time_step)
+    results = []
+    baseline = None
+    for component_id, variation in tqdm(cells, desc=f"{stage} runs"):
+        # Every component's 0% cell is the same unmodified rocket
+        if variation == 0 and baseline is not None:
+            results.append(baseline)
+            continue
+        component, original_mass = components[component_id]
+        label = f"{component.getName()} {variation:+.0f}%"
+        metrics = None
+        try:
+            component.setMassOverridden(True)
+            component.setOverrideMass(original_mass * (1 + variation / 100.0))
+            with timer.stage(stage, label):
+                # Same seed for every run, so the fidelities differ only by step
+                helper.run_simulation(sim, listeners, randomize_seed=False)
+                metrics = reduce_flight_data(helper, sim, FIDELITY_REDUCTIONS)
+        except Exception as e:
+            logging.error(f"Simulation failed for {label} at dt={time_step:g} s: {e}")
+        finally:
+            component.setMassOverridden(False)
+        if variation == 0:
+            baseline = metrics
+        results.append(metrics)
+    return stack_reductions(results, FIDELITY_REDUCTIONS)
+
+
+def select_reference_cells(coarse_apogee, n_reference):
+    """
+    Pick cells spread evenly over the range of coarse apogees, so the error
+    estimate covers the whole grid rather than one corner of it.
+    Args:
+        coarse_apogee (np.array): Coarse apogee of every cell.
+        n_reference (int): Number of reference cells.
+    Returns:
+        np.array: Indices of the reference cells.
+    """
+    valid = np.flatnonzero(np.isfinite(coarse_apogee))
+    if len(valid) == 0:
+        return valid
+    order = valid[np.argsort(coarse_apogee[valid])]
+    picks = np.linspace(0, len(order) - 1, min(n_reference, len(order)))
+    return np.unique(order[np.round(picks).astype(int)])
+
+
+def error_bounds(coarse, fine, reference):
+    """
+    Estimate the coarse step error of each metric from the reference runs.
+    Args:
+        coarse (dict): Metric -> coarse value per cell.
+        fine (dict): Metric -> fine value per reference cell.
+        reference (np.array): Cell index of each reference run.
+    Returns:
+        dict: Metric -> (largest absolute error, mean error) over the references.
+    """
+    bounds = {}
+    for metric in FIDELITY_METRICS:
+        errors = coarse[metric][reference] - fine[metric]
+        errors = errors[np.isfinite(errors)]
+        bounds[metric] = (
+            (float(np.max(np.abs(errors))), float(np.mean(errors)))
+            if len(errors)
+            else (np.nan, np.nan)
+        )
+    return bounds
+
+
+def slope_with_bound(variations, values, point_bound):
+    """
+    Least-squares slope of a metric against mass variation, with the worst case
+    slope error if every point may be off by up to point_bound.
+    Args:
+        variations (np.array): Mass variation in percent of each cell.
+        values (np.array): Metric value of each cell.
+        point_bound (float): Error bound of each value.
+    Returns:
+        tuple: (slope per percent of mass, slope error bound).
+    """
+    valid = np.isfinite(values)
+    x = variations[valid]
+    if len(x) < 2 or np.ptp(x) == 0:
+        return np.nan, np.nan
+    centred = x - x.mean()
+    weights = centred / np.sum(centred**2)
+    return float(weights @ values[valid]), float(point_bound * np.sum(np.abs(weights)))
+
+
+def multi_fidelity_mass_sweep(
+    component_names=None,
+    mass_variations=None,
+    coarse_factor=4.0,
+    n_reference=5,
+    top_fraction=0.2,
+    apogee_target=None,
+    stop_event=None,
+    wind_profile=None,
+):
+    """
+    Mass sensitivity sweep that screens every cell with a coarse integration
+    step, measures the coarse error against a few fine-step reference runs,
+    and re-runs at full fidelity only the cells that matter: the components
+    with the largest apogee sensitivity (or a ranking the error bound cannot
+    settle), and cells whose apogee is within the error bound of a target.
+    Args:
+        component_names (list, optional): Components to vary (all with mass if
+            None); e.g. ["Payload"] for a massOverride-style study.
+        mass_variations (np.array, optional): Variations in percent (-5..+5 if None).
+        coarse_factor (float): Coarse time step as a multiple of the .ork step.
+        n_reference (int): Number of fine-step reference runs for the error estimate.
+        top_fraction (float): Fraction of components, by apogee sensitivity,
+            re-run at full fidelity.
+        apogee_target (float, optional): Apogee constraint in m; cells that may
+            fall either side of it are re-run at full fidelity.
+        stop_event (FlightEvent or str, optional): End each simulation at this event.
+        wind_profile (str, optional): Wind profile file to fly every cell in.
+    Returns:
+        tuple: (cells DataFrame, sensitivities DataFrame, error bounds dict).
+    """
+    setup_logging()
+    if mass_variations is None:
+        mass_variations = np.arange(-5, 6, 1)
+    mass_variations = np.asarray(mass_variations, dtype=float)
+
+    plots_dir = os.path.join("ork", "outputs")
+    os.makedirs(plots_dir, exist_ok=True)
+    ork_file = os.path.join("ork", "hyperion_II_v2.ork")
+    if not os.path.exists(ork_file):
+        logging.error(f"The .ork file was not found at path: {ork_file}")
+        return None
+
+    timer = PipelineTimer("multiFidelitySweep")
+    with timer.session(
+        os.path.join(plots_dir, "multi_fidelity_timing.csv"),
+        os.path.join(plots_dir, "multi_fidelity.prof"),
+    ), timed_enter(timer, "jvm_startup", orlab.OpenRocketInstance()) as instance:
+        orl = orlab.Helper(instance)
+        with timer.stage("load_doc"):
+            doc = orl.load_doc(ork_file)
+            sim = doc.getSimulation(0)
+
+        components = {}
+        for component in orl.get_all_components(sim.getRocket()):
+            if component_names is not None and str(component.getName()) not in (
+                component_names
+            ):
+                continue
+            try:
+                components[str(component.getID())] = (component, component.getMass())
+            except AttributeError:
+                continue
+        if not components:
+            logging.error("No components with mass to vary.")
+            return None
+        names = {cid: str(c.getName()) for cid, (c, _) in components.items()}
+
+        cells = [(cid, float(v)) for cid in components for v in mass_variations]
+        listeners = simulation_listeners(stop_event, wind_profile)
+        fine_step = float(sim.getOptions().getTimeStep())
+        coarse_step = fine_step * coarse_factor
+        logging.info(
+            f"{len(cells)} cells; fine step {fine_step:g} s, coarse step {coarse_step:g} s."
+        )
+
+        try:
+            # 1. Screen the whole grid at the coarse step
+            coarse = run_cells(
+                orl, sim, cells, components, coarse_step, listeners, timer, "coarse"
+            )
+
+            # 2. Fine-step references to estimate the coarse error
+            reference = select_reference_cells(coarse["apogee"], n_reference)
+            fine_reference = run_cells(
+                orl,
+                sim,
+                [cells[i] for i in reference],
+                components,
+                fine_step,
+                listeners,
+                timer,
+                "fine",
+            )
+            bounds = error_bounds(coarse, fine_reference, reference)
+            for metric, (bound, bias) in bounds.items():
+                logging.info(
+                    f"Coarse error in {metric}: at most {bound:.4g} (mean {bias:+.4g})"
+                    f" over {len(reference)} reference runs."
+                )
+
+            # 3. Rank components by coarse apogee sensitivity
+            variations = np.array([v for _, v in cells])
+            cell_components = np.array([cid for cid, _ in cells])
+            apogee_bound = bounds["apogee"][0]
+            slopes = {
+                cid: slope_with_bound(
+                    variations[cell_components == cid],
+                    coarse["apogee"][cell_components == cid],
+                    apogee_bound,
+                )
+                for cid in components
+            }
+            ranked = sorted(
+                slopes,
+                key=lambda cid: -np.nan_to_num(abs(slopes[cid][0]), nan=-1),
+            )
+            n_top = max(1, int(np.ceil(top_fraction * len(ranked))))
+            threshold = abs(slopes[ranked[n_top - 1]][0])
+            refine_components = {
+                cid
+                for cid, (slope, slope_bound) in slopes.items()
+                if cid in ranked[:n_top]
+                or not np.isfinite(slope)
+                or abs(slope) + slope_bound >= threshold
+            }
+
+            # 4. Cells that matter: top components and constraint boundaries
+            refine = np.isin(cell_components, list(refine_components))
+            if apogee_target is not None:
+                refine |= np.abs(coarse["apogee"] - apogee_target) <= apogee_bound
+            fine_done = np.zeros(len(cells), dtype=bool)
+            fine_done[reference] = True
+            refine &= ~fine_done
+            logging.info(
+                f"Re-running {int(refine.sum())} of {len(cells)} cells at the fine step "
+                f"({len(refine_components)} components)."
+            )
+            refined = run_cells(
+                orl,
+                sim,
+                [cells[i] for i in np.flatnonzero(refine)],
+                components,
+                fine_step,
+                listeners,
+                timer,
+                "fine",
+            )
+        finally:
+            sim.getOptions().setTimeStep(fine_step)
+
+    # Best available value of each cell: fine where it was run and succeeded,
+    # else coarse (with its error bound)
+    fine = {metric: np.full(len(cells), np.nan) for metric in FIDELITY_METRICS}
+    for metric in FIDELITY_METRICS:
+        fine[metric][reference] = fine_reference[metric]
+        fine[metric][refine] = refined[metric]
+    final = {
+        metric: np.where(np.isfinite(fine[metric]), fine[metric], coarse[metric])
+        for metric in FIDELITY_METRICS
+    }
+    fidelity = np.where(np.isfinite(fine["apogee"]), "fine", "coarse")
+
+    cells_frame = pd.DataFrame(
+        {
+            "Component ID": cell_components,
+            "Component Name": [names[cid] for cid in cell_components],
+            "Mass Variation (%)": variations,
+            "Fidelity": fidelity,
+            **{f"Coarse {metric}": coarse[metric] for metric in FIDELITY_METRICS},
+            **{metric: final[metric] for metric in FIDELITY_METRICS},
+            "Apogee Error Bound (m)": np.where(fidelity == "fine", 0.0, apogee_bound),
+        }
+    )
+    sensitivity_rows = []
+    for cid in components:
+        mask = cell_components == cid
+        is_fine = bool(np.all(fidelity[mask] == "fine"))
+        slope, slope_bound = slope_with_bound(
+            variations[mask], final["apogee"][mask], 0.0 if is_fine else apogee_bound
+        )
+        sensitivity_rows.append(
+            {
+                "Component ID": cid,
+                "Component Name": names[cid],
+                "Apogee Sensitivity (m per % mass)": slope,
+                "Sensitivity Error Bound": slope_bound,
+                "Fidelity": "fine" if is_fine else "coarse",
+            }
+        )
+    sensitivities = pd.DataFrame(sensitivity_rows).sort_values(
+        "Apogee Sensitivity (m per % mass)", key=np.abs, ascending=False
+    )
+
+    cells_path = os.path.join(plots_dir, "multi_fidelity_cells.csv")
+    sensitivities_path = os.path.join(plots_dir, "multi_fidelity_sensitivities.csv")
+    cells_frame.to_csv(cells_path, index=False)
+    sensitivities.to_csv(sensitivities_path, index=False)
+    logging.info(f"Cell results saved to '{cells_path}'.")
+    logging.info(f"Sensitivities saved to '{sensitivities_path}'.")
+
+    # Cost relative to running every cell at the fine step
+    totals = timer.totals()
+    n_fine = len(reference) + int(refine.sum())
+    if n_fine:
+        full_fine = totals.get("fine", 0.0) / n_fine * len(cells)
+        spent = totals.get("coarse", 0.0) + totals.get("fine", 0.0)
+        logging.info(
+            f"Simulation time {spent:.1f} s against about {full_fine:.1f} s "
+            f"for a full fine-step sweep."
+        )
+    return cells_frame, sensitivities, bounds
+
+
+if __name__ == "__main__":
+    multi_fidelity_mass_sweep()
@@ -7,6 +7,10 @@ import matplotlib.pyplot as plt
 import orlab
 from orlab import FlightDataType, FlightEvent
 
+from fastTimeseries import get_timeseries_fast
+from pipelineTiming import PipelineTimer, timed_enter
+from plotDownsampling import plot_downsampled
+
 
 def log_extrema(file_handle, data_x, data_y, title):
     """Write the extrema (max and min) for a given dataset to a file."""
@@ -19,12 +23,26 @@ def log_extrema(file_handle, data_x, data_y, title):
     file_handle.write(f"  Min Value: {min_value:.2f} at Time: {min_time:.2f} s\n\n")
 
 
-def multi_plot_analysis():
+def multi_plot_analysis(version=None):
+    """
+    Simulate one rocket version and save a plot of every main flight quantity.
+    Args:
+        version (str, optional): Rocket version number (e.g. "2" for v2).
+            Prompted for if not given.
+    Returns:
+        list or None: Paths of the saved plots, or None if the run did not
+            complete.
+    """
 
     # 0. Set the path to the.ork file
-    version = input("Enter the version number (e.g., 2 for v2): ")
+    if version is None:
+        version = input("Enter the version number (e.g., 2 for v2): ")
     ork_file = os.path.join("ork", f"hyperion_II_v{version}.ork")
     print(f".ork file path set to: {ork_file}")
+    # Fail before paying for JVM startup
+    if not os.path.exists(ork_file):
+        print(f"The.ork file was not found at path: {ork_file}")
+        return
 
     # 1. Set up directories
     plots_dir = os.path.join("ork", f"outputs-v{version}")
@@ -38,16 +56,18 @@ def multi_plot_analysis():
     individual_plots_dir = os.path.join(plots_dir, "multi_plots")
     os.makedirs(individual_plots_dir, exist_ok=True)
 
-    with orlab.OpenRocketInstance() as instance:
+    # Time each stage of the pipeline (HYPERION_PROFILE=1 also dumps a cProfile)
+    timer = PipelineTimer("multiPlot")
+    with timer.session(
+        os.path.join(plots_dir, "multi_plot_timing.json"),
+        os.path.join(plots_dir, "multi_plot.prof"),
+    ), timed_enter(timer, "jvm_startup", orlab.OpenRocketInstance()) as instance:
         orl = orlab.Helper(instance)
 
-        if not os.path.exists(ork_file):
-            print(f"The.ork file was not found at path: {ork_file}")
-            return
-
         try:
-            doc = orl.load_doc(ork_file)
-            sim = doc.getSimulation(0)
+            with timer.stage("load_doc"):
+                doc = orl.load_doc(ork_file)
+                sim = doc.getSimulation(0)
             print(f"Loaded rocket model from '{ork_file}'.\n")
         except Exception as e:
             print(f"Failed to load the.ork file: {e}")
@@ -55,7 +75,8 @@ def multi_plot_analysis():
 
         # Run the simulation
         try:
-            orl.run_simulation(sim)
+            with timer.stage("run_simulation"):
+                orl.run_simulation(sim)
             print("Simulation run successful.\n")
         except Exception as e:
             print(f"Simulation failed: {e}")
@@ -63,23 +84,26 @@ def multi_plot_analysis():
 
         # Retrieve multiple flight data types
         try:
-            data = orl.get_timeseries(
-                sim,
-                [
-                    FlightDataType.TYPE_TIME,
-                    FlightDataType.TYPE_ALTITUDE,
-                    FlightDataType.TYPE_VELOCITY_TOTAL,
-                    FlightDataType.TYPE_ACCELERATION_TOTAL,
-                    FlightDataType.TYPE_THRUST_FORCE,
-                    FlightDataType.TYPE_DRAG_FORCE,
-                    FlightDataType.TYPE_MASS,
-                    FlightDataType.TYPE_MACH_NUMBER,
-                    FlightDataType.TYPE_AOA,  # Angle of Attack
-                    FlightDataType.TYPE_CG_LOCATION,
-                    FlightDataType.TYPE_CP_LOCATION,
-                ],
-            )
-            events = orl.get_events(sim)
+            with timer.stage("get_timeseries"):
+                data = get_timeseries_fast(
+                    orl,
+                    sim,
+                    [
+                        FlightDataType.TYPE_TIME,
+                        FlightDataType.TYPE_ALTITUDE,
+                        FlightDataType.TYPE_VELOCITY_TOTAL,
+                        FlightDataType.TYPE_ACCELERATION_TOTAL,
+                        FlightDataType.TYPE_THRUST_FORCE,
+                        FlightDataType.TYPE_DRAG_FORCE,
+                        FlightDataType.TYPE_MASS,
+                        FlightDataType.TYPE_MACH_NUMBER,
+                        FlightDataType.TYPE_AOA,  # Angle of Attack
+                        FlightDataType.TYPE_CG_LOCATION,
+                        FlightDataType.TYPE_CP_LOCATION,
+                    ],
+                )
+            with timer.stage("get_events"):
+                events = orl.get_events(sim)
             print("Flight data and events retrieved successfully.\n")
         except Exception as e:
             print(f"Failed to retrieve flight data and events: {e}")
@@ -166,70 +190,79 @@ def multi_plot_analysis():
                 },
             ]
 
-            # Plot and save each configuration separately
-            for config in plot_configs:
-                try:
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(
-                        config["data_x"],
-                        config["data_y"],
-                        config["color"],
-                        label=config.get("label", ""),
-                    )
-                    plt.xlabel(config["xlabel"])
-                    plt.ylabel(config["ylabel"])
-                    plt.title(config["title"])
-                    plt.grid(True)
-                    if "label" in config and config["label"]:
-                        plt.legend()
-
-                    # Annotate events
-                    index_at = lambda t: (
-                        np.abs(data[FlightDataType.TYPE_TIME] - t)
-                    ).argmin()
-                    for event, times in events.items():
-                        event_name = event.name.replace("_", " ").title()
-                        for time in times:
-                            if event_name == "Apogee" or event_name == "Launchrod":
-                                plt.annotate(
-                                    event_name,
-                                    xy=(
-                                        time,
-                                        data[FlightDataType.TYPE_ALTITUDE][
-                                            index_at(time)
-                                        ],
-                                    ),
-                                    xycoords="data",
-                                    xytext=(20, 10),
-                                    textcoords="offset points",
-                                    arrowprops=dict(
-                                        arrowstyle="->", connectionstyle="arc3"
-                                    ),
-                                )
-                            else:
-                                plt.annotate(
-                                    event_name,
-                                    xy=(time, config["data_y"][index_at(time)]),
-                                    xycoords="data",
-                                    xytext=(20, 10),
-                                    textcoords="offset points",
-                                    arrowprops=dict(
-                                        arrowstyle="->", connectionstyle="arc3"
-                                    ),
-                                )
-
-                    plt.tight_layout()
-                    plot_path = os.path.join(individual_plots_dir, config["filename"])
-                    plt.savefig(plot_path)
-                    plt.close()
-                    print(f"Saved plot: {plot_path}")
-                    f.write(f"Saved plot: {plot_path}\n")
-                    # Log extrema
-                    log_extrema(f, config["data_x"], config["data_y"], config["title"])
-                except Exception as e:
-                    print(f"Failed to plot {config['title']}: {e}")
-                    f.write(f"Failed to plot {config['title']}: {e}\n")
+            saved_plots = []
+            with timer.stage("plotting"):
+                # Plot and save each configuration separately
+                for config in plot_configs:
+                    try:
+                        plt.figure(figsize=(10, 6))
+                        plot_downsampled(
+                            plt.gca(),
+                            config["data_x"],
+                            config["data_y"],
+                            config["color"],
+                            label=config.get("label", ""),
+                        )
+                        plt.xlabel(config["xlabel"])
+                        plt.ylabel(config["ylabel"])
+                        plt.title(config["title"])
+                        plt.grid(True)
+                        if "label" in config and config["label"]:
+                            plt.legend()
+
+                        # Annotate events
+                        index_at = lambda t: (
+                            np.abs(data[FlightDataType.TYPE_TIME] - t)
+                        ).argmin()
+                        for event, times in events.items():
+                            event_name = event.name.replace("_", " ").title()
+                            for time in times:
+                                if event_name == "Apogee" or event_name == "Launchrod":
+                                    plt.annotate(
+                                        event_name,
+                                        xy=(
+                                            time,
+                                            data[FlightDataType.TYPE_ALTITUDE][
+                                                index_at(time)
+                                            ],
+                                        ),
+                                        xycoords="data",
+                                        xytext=(20, 10),
+                                        textcoords="offset points",
+                                        arrowprops=dict(
+                                            arrowstyle="->", connectionstyle="arc3"
+                                        ),
+                                    )
+                                else:
+                                    plt.annotate(
+                                        event_name,
+                                        xy=(time, config["data_y"][index_at(time)]),
+                                        xycoords="data",
+                                        xytext=(20, 10),
+                                        textcoords="offset points",
+                                        arrowprops=dict(
+                                            arrowstyle="->", connectionstyle="arc3"
+                                        ),
+                                    )
+
+                        plt.tight_layout()
+                        plot_path = os.path.join(individual_plots_dir, config["filename"])
+                        plt.savefig(plot_path)
+                        plt.close()
+                        saved_plots.append(plot_path)
+                        print(f"Saved plot: {plot_path}")
+                        f.write(f"Saved plot: {plot_path}\n")
+                        # Log extrema
+                        log_extrema(f, config["data_x"], config["data_y"], config["title"])
+                    except Exception as e:
+                        print(f"Failed to plot {config['title']}: {e}")
+                        f.write(f"Failed to plot {config['title']}: {e}\n")
+    return saved_plots
 
 
 if __name__ == "__main__":
-    multi_plot_analysis()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Plot every main flight quantity.")
+    parser.add_argument("--version", help="Rocket version number, e.g. 2 for v2")
+    multi_plot_analysis(parser.parse_args().version)
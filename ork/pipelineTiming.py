@@ -0,0 +1,182 @@
+# pipelineTiming.py
+
+import cProfile
+import csv
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Set HYPERION_PROFILE=1 to also dump a cProfile of the whole script
+PROFILE_ENV_VAR = "HYPERION_PROFILE"
+
+
+class PipelineTimer:
+    """
+    Collect wall-clock timings of the stages of a simulation/analysis script.
+
+    Each timed block is recorded as one row (script, run, stage, seconds), so
+    scripts running many simulations get a per-run breakdown. The trace is
+    written to .json or .csv depending on the file extension.
+    """
+
+    def __init__(self, script):
+        """
+        Args:
+            script (str): Name of the script being timed, stored with every record.
+        """
+        self.script = script
+        self.records = []
+
+    @contextmanager
+    def stage(self, stage, run=None):
+        """
+        Time the enclosed block as one stage.
+        Args:
+            stage (str): Stage name (e.g. "load_doc", "run_simulation").
+            run (str, optional): Label of the run this stage belongs to.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append(
+                {
+                    "script": self.script,
+                    "run": "" if run is None else str(run),
+                    "stage": stage,
+                    "seconds": time.perf_counter() - start,
+                }
+            )
+
+    @contextmanager
+    def session(self, trace_path, profile_path=None):
+        """
+        Wrap a whole script run: optionally profile it, and on exit (including
+        early returns and errors) write the trace and print the stage summary.
+        Args:
+            trace_path (str): Path of the .json or .csv trace file.
+            profile_path (str, optional): Path of the .prof file written when
+                profiling is enabled through HYPERION_PROFILE.
+        """
+        try:
+            if profile_path is None:
+                yield self
+            else:
+                with maybe_profile(profile_path):
+                    yield self
+        finally:
+            self.write_trace(trace_path)
+            print("\n".join(self.summary_lines()))
+            print(f"[INFO] Timing trace saved to: {trace_path}")
+
+    def totals(self):
+        """
+        Returns:
+            dict: Stage name -> total seconds, in first-seen order.
+        """
+        totals = defaultdict(float)
+        for record in self.records:
+            totals[record["stage"]] += record["seconds"]
+        return dict(totals)
+
+    def summary_lines(self):
+        """
+        Returns:
+            list: Human readable lines with total time and share per stage.
+        """
+        totals = self.totals()
+        overall = sum(totals.values())
+        lines = [f"Timing breakdown for {self.script} ({overall:.3f} s timed):"]
+        for stage, seconds in totals.items():
+            share = 100 * seconds / overall if overall > 0 else 0.0
+            lines.append(f"  {stage:<20} {seconds:9.3f} s  ({share:5.1f}%)")
+        return lines
+
+    def write_trace(self, path):
+        """
+        Write all timing records to a .json or .csv trace file.
+        Args:
+            path (str): Output path; the extension selects the format.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(
+                    f, fieldnames=["script", "run", "stage", "seconds"]
+                )
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "script": self.script,
+                        "totals": self.totals(),
+                        "records": self.records,
+                    },
+                    f,
+                    indent=2,
+                )
+
+
+def timed(timer, stage, run=None):
+    """
+    Time a block with the given timer, or do nothing if timer is None.
+    Args:
+        timer (PipelineTimer or None): Timer to record into.
+        stage (str): Stage name.
+        run (str, optional): Label of the run this stage belongs to.
+    """
+    if timer is None:
+        return nullcontext()
+    return timer.stage(stage, run)
+
+
+@contextmanager
+def timed_enter(timer, stage, context):
+    """
+    Enter a context manager, timing only its setup (e.g. JVM startup for
+    orlab.OpenRocketInstance), and exit it normally afterwards.
+    Args:
+        timer (PipelineTimer or None): Timer to record into.
+        stage (str): Stage name for the setup.
+        context: Context manager to enter.
+    """
+    with timed(timer, stage):
+        value = context.__enter__()
+    try:
+        yield value
+    except BaseException:
+        if not context.__exit__(*sys.exc_info()):
+            raise
+    else:
+        context.__exit__(None, None, None)
+
+
+@contextmanager
+def maybe_profile(output_path, enabled=None):
+    """
+    Run the enclosed block under cProfile and dump the stats, if enabled.
+    Args:
+        output_path (str): Path of the .prof file (readable with pstats or snakeviz).
+        enabled (bool, optional): Force profiling on or off. Defaults to the
+            HYPERION_PROFILE environment variable.
+    """
+    if enabled is None:
+        enabled = os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        profiler.dump_stats(output_path)
+        print(f"[INFO] cProfile stats saved to: {output_path}")
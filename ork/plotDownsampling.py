@@ -0,0 +1,144 @@
+# plotDownsampling.py
+
+import numpy as np
+
+# Traces shorter than this many points per pixel column are drawn as they are
+POINTS_PER_PIXEL = 2
+
+
+def axes_pixel_width(ax):
+    """
+    Args:
+        ax (matplotlib.axes.Axes): Axis the trace will be drawn on.
+    Returns:
+        int: Width of the axis' drawing area in output pixels.
+    """
+    fig = ax.get_figure()
+    return max(1, int(round(fig.get_figwidth() * fig.dpi * ax.get_position().width)))
+
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Split the x range into n_buckets equal-width columns and keep the samples
+    with the lowest and highest y in each. Extremes such as apogee or peak
+    acceleration are therefore always kept, whatever the time step.
+    Args:
+        x (np.array): Sorted x values (e.g. time).
+        y (np.array): Y values, same length as x.
+        n_buckets (int): Number of columns, normally the plot width in pixels.
+    Returns:
+        np.array: Sorted indices of the samples to draw.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_points = len(y)
+    if n_points <= POINTS_PER_PIXEL * n_buckets:
+        return np.arange(n_points)
+
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) == 0:
+        return np.arange(n_points)
+    x_min, x_max = x[finite[0]], x[finite[-1]]
+    span = x_max - x_min
+    if span <= 0:
+        buckets = np.zeros(len(finite), dtype=int)
+    else:
+        buckets = ((x[finite] - x_min) / span * n_buckets).astype(int)
+        np.minimum(buckets, n_buckets - 1, out=buckets)
+
+    # x is sorted, so every bucket is one contiguous segment of the finite samples
+    changes = np.diff(buckets, prepend=-1) != 0
+    starts = np.flatnonzero(changes)
+    segment = np.cumsum(changes) - 1
+    values = y[finite]
+    keep = [finite[[0, -1]]]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(values, starts)
+        hits = np.flatnonzero(values == extreme[segment])
+        # First hit of each segment
+        first = hits[np.flatnonzero(np.diff(segment[hits], prepend=-1))]
+        keep.append(finite[first])
+    keep = np.concatenate(keep)
+    # NaN gaps are kept so the drawn line still breaks where the data does
+    gaps = np.flatnonzero(~np.isfinite(y))
+    return np.unique(np.concatenate((keep, gaps)))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets selection of n_out samples, which follows
+    the visual shape of the trace more smoothly than min/max. The global
+    minimum and maximum are added so peaks survive.
+    Args:
+        x (np.array): Sorted x values.
+        y (np.array): Y values, same length as x (finite).
+        n_out (int): Number of samples to keep.
+    Returns:
+        np.array: Sorted indices of the samples to draw.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_points = len(y)
+    if n_out >= n_points or n_out < 3:
+        return np.arange(n_points)
+
+    edges = np.linspace(1, n_points - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n_points - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n_points
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the triangle area against the previous point and the next bucket's mean
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    extremes = [int(np.nanargmin(y)), int(np.nanargmax(y))]
+    return np.unique(np.concatenate((selected, extremes)))
+
+
+def downsample_indices(x, y, n_out, method="minmax"):
+    """
+    Args:
+        x (np.array): Sorted x values.
+        y (np.array): Y values, same length as x.
+        n_out (int): Target resolution: pixel columns for "minmax", samples for "lttb".
+        method (str): "minmax" or "lttb".
+    Returns:
+        np.array: Sorted indices of the samples to draw.
+    """
+    if method == "lttb":
+        if not np.all(np.isfinite(y)):
+            return minmax_indices(x, y, n_out)
+        return lttb_indices(x, y, n_out)
+    if method == "minmax":
+        return minmax_indices(x, y, n_out)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def plot_downsampled(ax, x, y, *args, method="minmax", n_out=None, **kwargs):
+    """
+    Drop-in for ax.plot(x, y, ...) that first reduces the trace to about the
+    axis' pixel width.
+    Args:
+        ax (matplotlib.axes.Axes): Axis to draw on.
+        x (np.array): Sorted x values.
+        y (np.array): Y values.
+        *args: Format string etc., passed to ax.plot.
+        method (str): "minmax" or "lttb" (see downsample_indices).
+        n_out (int, optional): Resolution override. Defaults to the axis width in pixels.
+        **kwargs: Passed to ax.plot.
+    Returns:
+        list: The Line2D objects from ax.plot.
+    """
+    if n_out is None:
+        n_out = axes_pixel_width(ax)
+    idx = downsample_indices(x, y, n_out, method)
+    return ax.plot(np.asarray(x)[idx], np.asarray(y)[idx], *args, **kwargs)
@@ -0,0 +1,181 @@
+# sharedTimeseries.py
+
+import mmap
+import os
+import uuid
+import weakref
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Shared memory segments created by this module start with this prefix
+SEGMENT_PREFIX = "hyperion_ts_"
+
+
+@dataclass(frozen=True)
+class SharedTimeseriesHandle:
+    """
+    Picklable description of one run's timeseries published to shared memory
+    (or to a memory-mapped file). Only this handle crosses the process
+    boundary; the arrays stay where the worker wrote them.
+    """
+
+    name: str
+    keys: tuple
+    lengths: tuple
+    width: int
+    path: str = None  # Set for memory-mapped files instead of shared memory
+
+    @property
+    def nbytes(self):
+        return len(self.keys) * self.width * np.dtype(float).itemsize
+
+
+def publish_timeseries(data, directory=None):
+    """
+    Copy a run's timeseries into one shared block and return a handle to it.
+    Call this in the worker process; the parent opens the handle with open_timeseries.
+    Args:
+        data (dict): Key (e.g. FlightDataType) -> 1D array, as returned by
+            get_timeseries. None series are kept as zero-length rows.
+        directory (str, optional): Write a memory-mapped .npy file in this
+            directory instead of using multiprocessing.shared_memory (e.g. when
+            /dev/shm is small).
+    Returns:
+        handle (SharedTimeseriesHandle): Descriptor of the published data.
+    """
+    keys = tuple(data.keys())
+    series = [
+        np.asarray(v if v is not None else (), dtype=float) for v in data.values()
+    ]
+    lengths = tuple(len(s) for s in series)
+    width = max(lengths, default=0)
+    name = f"{SEGMENT_PREFIX}{os.getpid()}_{uuid.uuid4().hex[:12]}"
+
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.npy")
+        block = np.lib.format.open_memmap(
+            path, mode="w+", dtype=float, shape=(len(keys), width)
+        )
+        _fill(block, series)
+        block.flush()
+        del block
+        return SharedTimeseriesHandle(name, keys, lengths, width, path)
+
+    # A zero-size segment is not allowed, so always reserve at least one value
+    segment = shared_memory.SharedMemory(
+        name=name, create=True, size=max(len(keys) * width * 8, 8)
+    )
+    block = np.ndarray((len(keys), width), dtype=float, buffer=segment.buf)
+    _fill(block, series)
+    del block
+    # The segment now belongs to the parent, which unlinks it after use
+    segment.close()
+    return SharedTimeseriesHandle(name, keys, lengths, width)
+
+
+def _fill(block, series):
+    for row, values in enumerate(series):
+        block[row, : len(values)] = values
+        block[row, len(values) :] = np.nan
+
+
+def _release_file(mapping, path):
+    """Unmap a memory-mapped file, then delete it."""
+    mapping.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class SharedTimeseries:
+    """
+    Parent-side view of a published run. data maps each key to a read-only
+    array backed directly by the shared block (no copy). Close it once the
+    run has been processed; the block is released when the last array
+    referencing it is dropped.
+    """
+
+    def __init__(self, handle):
+        """
+        Args:
+            handle (SharedTimeseriesHandle): Handle returned by publish_timeseries.
+        """
+        self.handle = handle
+        self._segment = None
+        if handle.path is not None:
+            with open(handle.path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # The array data ends the .npy file, after its header
+            block = np.ndarray(
+                (len(handle.keys), handle.width),
+                dtype=float,
+                buffer=mapping,
+                offset=len(mapping) - handle.nbytes,
+            )
+            # Delete the file only once the block and every view of it are
+            # gone: a mapped file cannot be removed on Windows
+            weakref.finalize(block, _release_file, mapping, handle.path)
+        else:
+            self._segment = shared_memory.SharedMemory(name=handle.name)
+            block = np.ndarray(
+                (len(handle.keys), handle.width), dtype=float, buffer=self._segment.buf
+            )
+            block.flags.writeable = False
+            # Unmap only once the block and every view of it are gone, so arrays
+            # kept past close() stay valid
+            weakref.finalize(block, self._segment.close)
+        self._block = block
+        self.data = {
+            key: (block[row, :length] if length else None)
+            for row, (key, length) in enumerate(zip(handle.keys, handle.lengths))
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def copy(self):
+        """
+        Returns:
+            dict: Key -> private copy of the array, valid after close().
+        """
+        return {
+            key: (np.array(values) if values is not None else None)
+            for key, values in self.data.items()
+        }
+
+    def close(self):
+        """
+        Drop the views and free the shared block. A mapped file is deleted
+        once the last view of it is dropped.
+        """
+        self.data = {}
+        self._block = None
+        if self._segment is not None:
+            # Removes the name now; the memory goes when the last view does
+            self._segment.unlink()
+            self._segment = None
+
+
+def open_timeseries(handle):
+    """
+    Args:
+        handle (SharedTimeseriesHandle or None): Handle from a worker.
+    Returns:
+        SharedTimeseries or None: Zero-copy view of the run's data.
+    """
+    return None if handle is None else SharedTimeseries(handle)
+
+
+def discard_timeseries(handle):
+    """
+    Free a published block without reading it (e.g. a result no longer needed).
+    Args:
+        handle (SharedTimeseriesHandle or None): Handle from a worker.
+    """
+    if handle is not None:
+        open_timeseries(handle).close()
@@ -0,0 +1,71 @@
+# simulationListeners.py
+
+from orlab import AbstractSimulationListener, FlightEvent
+from orlab.core.openrocket_instance import active_core_root
+
+from windProfiles import wind_listeners
+
+
+def parse_flight_event(event):
+    """
+    Args:
+        event (FlightEvent or str): A FlightEvent member or its name, in any case
+            (e.g. "apogee", "BURNOUT").
+    Returns:
+        FlightEvent: The matching event.
+    """
+    if isinstance(event, FlightEvent):
+        return event
+    try:
+        return FlightEvent[str(event).upper()]
+    except KeyError:
+        raise ValueError(f"Unknown flight event: {event}") from None
+
+
+class StopAtEvent(AbstractSimulationListener):
+    """
+    Ends the simulation at the first occurrence of a flight event, e.g. APOGEE,
+    so sweeps that only need ascent metrics skip the whole descent. Flight data
+    up to and including the event step is kept.
+    """
+
+    def __init__(self, event=FlightEvent.APOGEE):
+        """
+        Args:
+            event (FlightEvent or str): Event to stop at.
+        """
+        self.event_name = parse_flight_event(event).name
+
+    def handleFlightEvent(self, status, flight_event):
+        if str(flight_event.getType().name()) == self.event_name:
+            java_event = active_core_root().simulation.FlightEvent
+            status.getEventQueue().add(
+                java_event(
+                    java_event.Type.SIMULATION_END, float(status.getSimulationTime())
+                )
+            )
+        return True
+
+
+def stop_listeners(stop_event=None):
+    """
+    Args:
+        stop_event (FlightEvent or str, optional): Event to end each simulation at.
+    Returns:
+        list or None: Listeners for Helper.run_simulation (None to run the full flight).
+    """
+    return None if stop_event is None else [StopAtEvent(stop_event)]
+
+
+def simulation_listeners(stop_event=None, wind_profile=None):
+    """
+    Args:
+        stop_event (FlightEvent or str, optional): Event to end each simulation at.
+        wind_profile (str, optional): Wind profile file to fly each simulation in
+            (see windProfiles.load_wind_table).
+    Returns:
+        list or None: Listeners for Helper.run_simulation (None if neither is set).
+    """
+    listeners = stop_listeners(stop_event) or []
+    listeners += wind_listeners(wind_profile)
+    return listeners or None
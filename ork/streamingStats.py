@@ -0,0 +1,459 @@
+# streamingStats.py
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILES = (0.01, 0.5, 0.99)
+DEFAULT_RELATIVE_ACCURACY = 0.005
+# Magnitudes below this are counted as zero by the quantile sketch
+SKETCH_MIN_VALUE = 1e-9
+
+
+def _finite(values):
+    """Values as a flat float array without NaN or infinite entries."""
+    values = np.asarray(values, dtype=float).ravel()
+    return values[np.isfinite(values)]
+
+
+def _add_counts(store, keys, counts):
+    """Add counts to the integer-keyed buckets of a dict."""
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        store[key] = store.get(key, 0) + count
+
+
+class RunningMoments:
+    """
+    Count, mean, variance and range of a stream of values, updated in batches
+    and mergeable (Chan et al.'s parallel algorithm), so partial results from
+    workers combine into exactly the statistics of all their values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        if count == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    def update(self, values):
+        """
+        Args:
+            values (float or np.array): New values; NaNs are ignored.
+        """
+        values = _finite(values)
+        if len(values):
+            mean = float(values.mean())
+            self._combine(
+                len(values),
+                mean,
+                float(np.sum((values - mean) ** 2)),
+                float(values.min()),
+                float(values.max()),
+            )
+
+    def merge(self, other):
+        """
+        Args:
+            other (RunningMoments): Moments of another set of values.
+        """
+        self._combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+
+    @property
+    def variance(self):
+        """Sample variance (NaN with fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "minimum": self.minimum if self.count else None,
+            "maximum": self.maximum if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        if state["count"]:
+            moments._combine(
+                state["count"],
+                state["mean"],
+                state["m2"],
+                state["minimum"],
+                state["maximum"],
+            )
+        return moments
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative error guarantee (the DDSketch
+    scheme). Values fall into logarithmic buckets whose bounds differ by a
+    factor gamma = (1 + a) / (1 - a); a quantile is answered with the middle
+    of its bucket, within a fraction a of the exact value. Only non-empty
+    buckets are kept, so memory grows with the logarithm of the value range,
+    not with the number of values, and merging two sketches adds their counts,
+    which gives the same sketch in any order.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy (float): Relative error a of quantiles, 0 < a < 1.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}  # Keyed by the bucket of the magnitude
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values):
+        """
+        Args:
+            values (float or np.array): New values; NaNs are ignored.
+        """
+        values = _finite(values)
+        if not len(values):
+            return
+        self.count += len(values)
+        magnitude = np.abs(values)
+        small = magnitude < SKETCH_MIN_VALUE
+        self.zero_count += int(np.count_nonzero(small))
+        for store, selected in (
+            (self.positive, (values > 0) & ~small),
+            (self.negative, (values < 0) & ~small),
+        ):
+            if np.any(selected):
+                keys = np.ceil(np.log(magnitude[selected]) / self._log_gamma)
+                _add_counts(
+                    store, *np.unique(keys.astype(np.int64), return_counts=True)
+                )
+
+    def merge(self, other):
+        """
+        Args:
+            other (QuantileSketch): Sketch with the same relative accuracy.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches with different accuracies cannot be merged")
+        for store, other_store in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def _buckets(self):
+        """Bucket values (middle of each bucket) and counts, in increasing order."""
+        negative_keys = sorted(self.negative, reverse=True)
+        positive_keys = sorted(self.positive)
+        keys = np.array(negative_keys + positive_keys, dtype=float)
+        middle = 2 * self.gamma**keys / (self.gamma + 1)
+        values = np.concatenate(
+            [-middle[: len(negative_keys)], [0.0], middle[len(negative_keys) :]]
+        )
+        counts = np.array(
+            [self.negative[k] for k in negative_keys]
+            + [self.zero_count]
+            + [self.positive[k] for k in positive_keys]
+        )
+        return values, counts
+
+    def quantiles(self, probabilities):
+        """
+        Args:
+            probabilities (list): Quantiles to estimate, each in [0, 1].
+        Returns:
+            np.array: Estimated quantiles (NaN for an empty sketch).
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        if self.count == 0:
+            return np.full(probabilities.shape, np.nan)
+        values, counts = self._buckets()
+        ranks = probabilities * (self.count - 1)
+        index = np.searchsorted(np.cumsum(counts), ranks, side="right")
+        return values[np.minimum(index, len(values) - 1)]
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state["relative_accuracy"])
+        sketch.positive = {int(k): v for k, v in state["positive"].items()}
+        sketch.negative = {int(k): v for k, v in state["negative"].items()}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        return sketch
+
+
+class FixedHistogram:
+    """
+    Histogram with fixed-width bins aligned to multiples of the width. Only
+    non-empty bins are stored, so no value range is needed up front and
+    histograms with the same width merge by adding counts.
+    """
+
+    def __init__(self, bin_width):
+        """
+        Args:
+            bin_width (float): Width of every bin.
+        """
+        if bin_width <= 0:
+            raise ValueError("bin_width must be positive")
+        self.bin_width = bin_width
+        self.counts = {}  # Bin index -> count; bin i covers [i, i + 1) * width
+
+    def update(self, values):
+        """
+        Args:
+            values (float or np.array): New values; NaNs are ignored.
+        """
+        values = _finite(values)
+        if len(values):
+            bins = np.floor(values / self.bin_width).astype(np.int64)
+            _add_counts(self.counts, *np.unique(bins, return_counts=True))
+
+    def merge(self, other):
+        """
+        Args:
+            other (FixedHistogram): Histogram with the same bin width.
+        """
+        if other.bin_width != self.bin_width:
+            raise ValueError("Histograms with different bin widths cannot be merged")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    def quantiles(self, probabilities):
+        """
+        Quantiles interpolated linearly within their bin, so the error is
+        below one bin width.
+        Args:
+            probabilities (list): Quantiles to estimate, each in [0, 1].
+        Returns:
+            np.array: Estimated quantiles (NaN for an empty histogram).
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        if not self.counts:
+            return np.full(probabilities.shape, np.nan)
+        bins = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[b] for b in bins.tolist()])
+        ranks = probabilities * cumulative[-1]
+        index = np.minimum(
+            np.searchsorted(cumulative, ranks, side="left"), len(bins) - 1
+        )
+        below = np.where(index > 0, cumulative[index - 1], 0)
+        fraction = (ranks - below) / (cumulative[index] - below)
+        return (bins[index] + np.clip(fraction, 0.0, 1.0)) * self.bin_width
+
+    def to_frame(self):
+        """
+        Returns:
+            pd.DataFrame: bin_start, bin_end and count of every bin from the
+                lowest to the highest non-empty one.
+        """
+        if not self.counts:
+            return pd.DataFrame(columns=["bin_start", "bin_end", "count"])
+        bins = np.arange(min(self.counts), max(self.counts) + 1)
+        return pd.DataFrame(
+            {
+                "bin_start": bins * self.bin_width,
+                "bin_end": (bins + 1) * self.bin_width,
+                "count": [self.counts.get(b, 0) for b in bins.tolist()],
+            }
+        )
+
+    def to_dict(self):
+        return {
+            "bin_width": self.bin_width,
+            "counts": {str(k): v for k, v in self.counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        histogram = cls(state["bin_width"])
+        histogram.counts = {int(k): v for k, v in state["counts"].items()}
+        return histogram
+
+
+class StreamingSummary:
+    """
+    Moments, a quantile sketch and optionally a histogram for each of a set of
+    metrics. Its size does not depend on the number of runs: workers or sweep
+    stages each update their own summary, and merge combines them.
+    """
+
+    def __init__(self, bin_widths, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            bin_widths (dict): Metric name -> histogram bin width (None for no
+                histogram). Only these metrics are tracked.
+            relative_accuracy (float): See QuantileSketch.
+        """
+        self.metrics = {
+            name: (
+                RunningMoments(),
+                QuantileSketch(relative_accuracy),
+                None if width is None else FixedHistogram(width),
+            )
+            for name, width in bin_widths.items()
+        }
+        self.missing = {name: 0 for name in bin_widths}
+
+    def update(self, values):
+        """
+        Args:
+            values (dict): Metric name -> value or array of values, e.g. a
+                batch_flight_metrics result. Untracked names are ignored and
+                NaN values are counted as missing.
+        """
+        for name, value in values.items():
+            if name not in self.metrics:
+                continue
+            value = np.asarray(value, dtype=float).ravel()
+            self.missing[name] += int(np.count_nonzero(~np.isfinite(value)))
+            for accumulator in self.metrics[name]:
+                if accumulator is not None:
+                    accumulator.update(value)
+
+    def merge(self, other):
+        """
+        Args:
+            other (StreamingSummary): Summary of the same metrics.
+        """
+        for name, accumulators in self.metrics.items():
+            for mine, theirs in zip(accumulators, other.metrics[name]):
+                if mine is not None:
+                    mine.merge(theirs)
+            self.missing[name] += other.missing[name]
+
+    def to_frame(self, quantiles=DEFAULT_QUANTILES):
+        """
+        Args:
+            quantiles (tuple): Quantiles to report, e.g. (0.01, 0.5, 0.99).
+        Returns:
+            pd.DataFrame: One row per metric with count, missing, mean, std,
+                min, the quantiles (columns p1, p50, ...) and max.
+        """
+        rows = []
+        for name, (moments, sketch, histogram) in self.metrics.items():
+            row = {
+                "metric": name,
+                "count": moments.count,
+                "missing": self.missing[name],
+                "mean": moments.mean if moments.count else np.nan,
+                "std": moments.std,
+                "min": moments.minimum if moments.count else np.nan,
+            }
+            # The histogram resolves quantiles more finely than the sketch
+            # where there is one; clamp to the exact range either way
+            estimate = sketch if histogram is None else histogram
+            for q, value in zip(quantiles, estimate.quantiles(quantiles)):
+                row[f"p{100 * q:g}"] = (
+                    min(max(value, moments.minimum), moments.maximum)
+                    if moments.count
+                    else np.nan
+                )
+            row["max"] = moments.maximum if moments.count else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def histograms_frame(self):
+        """
+        Returns:
+            pd.DataFrame: metric, bin_start, bin_end and count of every histogram.
+        """
+        frames = [
+            histogram.to_frame().assign(metric=name)
+            for name, (_, _, histogram) in self.metrics.items()
+            if histogram is not None and histogram.counts
+        ]
+        if not frames:
+            return pd.DataFrame(columns=["metric", "bin_start", "bin_end", "count"])
+        return pd.concat(frames, ignore_index=True)[
+            ["metric", "bin_start", "bin_end", "count"]
+        ]
+
+    def to_dict(self):
+        return {
+            name: {
+                "moments": moments.to_dict(),
+                "sketch": sketch.to_dict(),
+                "histogram": None if histogram is None else histogram.to_dict(),
+                "missing": self.missing[name],
+            }
+            for name, (moments, sketch, histogram) in self.metrics.items()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls({})
+        for name, metric in state.items():
+            summary.metrics[name] = (
+                RunningMoments.from_dict(metric["moments"]),
+                QuantileSketch.from_dict(metric["sketch"]),
+                (
+                    None
+                    if metric["histogram"] is None
+                    else FixedHistogram.from_dict(metric["histogram"])
+                ),
+            )
+            summary.missing[name] = metric["missing"]
+        return summary
+
+
+def save_summary(summary, path):
+    """
+    Args:
+        summary (StreamingSummary): Summary to save.
+        path (str): Output .json path.
+    """
+    # Written to a temporary file first, so a crash mid-write cannot leave a
+    # truncated summary behind for the next resume
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(summary.to_dict(), f)
+    os.replace(temp_path, path)
+
+
+def load_summary(path):
+    """
+    Args:
+        path (str): .json written by save_summary.
+    Returns:
+        StreamingSummary: The summary.
+    """
+    with open(path) as f:
+        return StreamingSummary.from_dict(json.load(f))
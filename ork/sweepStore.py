@@ -0,0 +1,127 @@
+# sweepStore.py
+
+import csv
+import os
+
+import numpy as np
+
+
+def cell_key(component_id, mass_variation_percent):
+    """
+    Build the key that identifies one sweep cell.
+    Args:
+        component_id: Component ID (Java or Python string).
+        mass_variation_percent (float): Mass variation of the cell in percent.
+    Returns:
+        tuple: (component ID string, variation rounded to 6 decimals).
+    """
+    return str(component_id), round(float(mass_variation_percent), 6)
+
+
+class SweepResultsStore:
+    """
+    Append-only results file for parameter sweeps.
+
+    Each finished row is written and flushed to disk immediately, so a crash
+    mid-sweep keeps every completed cell. Reopening an existing file resumes
+    it: completed cells are read back and can be skipped. Optionally, each
+    run's timeseries is saved next to the results as a compressed .npz file.
+    """
+
+    def __init__(self, results_path, fieldnames, timeseries_dir=None, resume=True):
+        """
+        Args:
+            results_path (str): Path to the results .csv file.
+            fieldnames (list): Column names, in order.
+            timeseries_dir (str, optional): Directory for per-run .npz timeseries.
+                Timeseries are not saved if None.
+            resume (bool): Keep and resume an existing results file if True,
+                otherwise start over.
+        """
+        self.results_path = results_path
+        self.fieldnames = list(fieldnames)
+        self.timeseries_dir = timeseries_dir
+
+        os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+        if timeseries_dir is not None:
+            os.makedirs(timeseries_dir, exist_ok=True)
+
+        if not resume and os.path.exists(results_path):
+            os.remove(results_path)
+
+        self._drop_partial_last_line()
+        is_new = not os.path.exists(results_path) or os.path.getsize(results_path) == 0
+        self._file = open(results_path, "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        if is_new:
+            self._writer.writeheader()
+            self._flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _drop_partial_last_line(self):
+        """Remove a row left half-written by a crash so appends stay aligned."""
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, "rb+") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def completed_cells(self, key_columns):
+        """
+        Read back the cells already present in the results file.
+        Args:
+            key_columns (tuple): Names of the (component ID, mass variation) columns.
+        Returns:
+            set: Keys (see cell_key) of all completed cells.
+        """
+        id_column, variation_column = key_columns
+        completed = set()
+        with open(self.results_path, "r", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    completed.add(cell_key(row[id_column], row[variation_column]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return completed
+
+    def append_rows(self, rows):
+        """
+        Write finished rows and flush them to disk.
+        Args:
+            rows (list): Dictionaries keyed by the store's fieldnames.
+        """
+        for row in rows:
+            self._writer.writerow(row)
+        self._flush()
+
+    def save_timeseries(self, name, data):
+        """
+        Save one run's timeseries as a compressed .npz file (no-op if disabled).
+        Args:
+            name (str): File name stem for the run.
+            data (dict): FlightDataType -> np.array, as returned by get_timeseries.
+        Returns:
+            str or None: Path of the saved file.
+        """
+        if self.timeseries_dir is None or data is None:
+            return None
+        path = os.path.join(self.timeseries_dir, f"{name}.npz")
+        np.savez_compressed(
+            path,
+            **{ftype.name: np.asarray(values) for ftype, values in data.items()},
+        )
+        return path
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,258 @@
+# sweepSupervisor.py
+
+import logging
+import multiprocessing
+import time
+import traceback
+from multiprocessing.connection import wait
+
+# How often the supervisor checks on its workers while waiting for results
+POLL_INTERVAL = 0.5
+# Grace period for a worker to exit before it is killed
+TERMINATE_GRACE = 5.0
+# Seconds a worker may take to start (JVM startup and loading the rocket)
+STARTUP_TIMEOUT = 300.0
+
+
+def _worker_main(connection, initializer, initargs, function):
+    """Worker process loop: initialize once, then run tasks until told to stop."""
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+    except Exception:
+        connection.send(("init_failed", None, traceback.format_exc(limit=3)))
+        return
+    connection.send(("ready", None, None))
+
+    while True:
+        try:
+            item = connection.recv()
+        except EOFError:
+            return  # Supervisor went away
+        if item is None:
+            return
+        task_id, task = item
+        connection.send(("started", task_id, None))
+        try:
+            connection.send(("done", task_id, function(task)))
+        except Exception as e:
+            connection.send(("failed", task_id, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """One worker process and the private pipe the supervisor talks to it over."""
+
+    def __init__(self, context, worker_id, initializer, initargs, function):
+        # A pipe per worker rather than a shared queue: a worker killed in the
+        # middle of writing cannot leave a lock held that blocks the others
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, initializer, initargs, function),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.worker_id = worker_id
+        self.created_at = time.monotonic()
+        self.ready = False
+        self.task_id = None
+        self.started_at = None
+
+    def assign(self, task_id, task):
+        self.task_id = task_id
+        self.started_at = None
+        self.connection.send((task_id, task))
+
+    def stop(self, force=False):
+        if not force:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(TERMINATE_GRACE)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(TERMINATE_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class SupervisedExecutor:
+    """
+    Process pool for long simulation sweeps that survives misbehaving workers.
+
+    Each worker runs one task at a time, so the supervisor always knows which
+    task a worker is on. A task that runs past the timeout has its worker
+    killed, and a worker that dies (e.g. a JVM crash) is detected. In both
+    cases a fresh worker is started and the task is retried, up to max_retries
+    times, before it is reported as failed. Tasks that raise an exception are
+    retried the same way. The other workers keep going meanwhile.
+    """
+
+    def __init__(
+        self,
+        function,
+        workers,
+        initializer=None,
+        initargs=(),
+        timeout=None,
+        max_retries=2,
+    ):
+        """
+        Args:
+            function (callable): Picklable top-level function run on each task.
+            workers (int): Number of worker processes.
+            initializer (callable, optional): Run once in every (re)started worker.
+            initargs (tuple): Arguments for the initializer.
+            timeout (float, optional): Seconds a single task may run. No limit if None.
+            max_retries (int): Extra attempts per task after a timeout, crash or error.
+        """
+        self.function = function
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.restarts = 0
+
+    def map(self, tasks):
+        """
+        Run every task and yield its outcome as soon as it is final.
+        Args:
+            tasks (list): Picklable task arguments.
+        Yields:
+            tuple: (task, result, error). result is the function's return value,
+                or None if the task failed every attempt, in which case error
+                describes the last failure and the number of attempts.
+        Raises:
+            RuntimeError: If new workers keep failing to start.
+        """
+        tasks = list(tasks)
+        context = multiprocessing.get_context("spawn")
+        pending = list(range(len(tasks)))[::-1]  # Popped from the end, in order
+        attempts = [0] * len(tasks)
+        remaining = len(tasks)
+        pool = {}
+        next_worker_id = 0
+        startup_failures = 0
+
+        def start_worker():
+            nonlocal next_worker_id
+            worker = _Worker(
+                context,
+                next_worker_id,
+                self.initializer,
+                self.initargs,
+                self.function,
+            )
+            pool[worker.worker_id] = worker
+            next_worker_id += 1
+
+        def retry_or_fail(task_id, error):
+            """Requeue a task, or return its final failure if out of retries."""
+            attempts[task_id] += 1
+            if attempts[task_id] <= self.max_retries:
+                logging.warning(
+                    f"Task {tasks[task_id]!r} failed ({error}); retry "
+                    f"{attempts[task_id]} of {self.max_retries}."
+                )
+                pending.append(task_id)
+                return None
+            return (
+                tasks[task_id],
+                None,
+                f"{error} (after {attempts[task_id]} attempts)",
+            )
+
+        def replace(worker, reason):
+            """Kill a worker, start a new one, and handle the task it was on."""
+            nonlocal startup_failures
+            worker.stop(force=True)
+            del pool[worker.worker_id]
+            if not worker.ready:
+                # Every new worker would likely fail the same way (e.g. no Java)
+                startup_failures += 1
+                if startup_failures > self.max_retries:
+                    raise RuntimeError(f"Sweep workers keep failing to start: {reason}")
+            outcome = None
+            if worker.task_id is not None:
+                outcome = retry_or_fail(worker.task_id, reason)
+            if pending:
+                self.restarts += 1
+                logging.warning(f"Restarting sweep worker {worker.worker_id}: {reason}")
+                start_worker()
+            else:
+                logging.warning(f"Stopped sweep worker {worker.worker_id}: {reason}")
+            return outcome
+
+        def handle(worker, kind, task_id, payload):
+            """Process one message from a worker; returns a final outcome or None."""
+            nonlocal startup_failures
+            if kind == "ready":
+                worker.ready = True
+                startup_failures = 0
+            elif kind == "init_failed":
+                logging.error(
+                    f"Sweep worker {worker.worker_id} failed to start:\n{payload}"
+                )
+                return replace(worker, payload.strip().splitlines()[-1])
+            elif kind == "started":
+                worker.started_at = time.monotonic()
+            elif kind == "done":
+                worker.task_id = None
+                return (tasks[task_id], payload, None)
+            elif kind == "failed":
+                worker.task_id = None
+                return retry_or_fail(task_id, payload)
+            return None
+
+        for _ in range(min(self.workers, len(tasks))):
+            start_worker()
+
+        try:
+            while remaining:
+                for worker in pool.values():
+                    if worker.ready and worker.task_id is None and pending:
+                        task_id = pending.pop()
+                        worker.assign(task_id, tasks[task_id])
+
+                finished = []
+                connections = {worker.connection: worker for worker in pool.values()}
+                for connection in wait(list(connections), timeout=POLL_INTERVAL):
+                    worker = connections[connection]
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        # Worker died; picked up by the liveness check below
+                        continue
+                    if worker.worker_id in pool:
+                        finished.append(handle(worker, *message))
+
+                # Check on every worker
+                now = time.monotonic()
+                for worker in list(pool.values()):
+                    if not worker.process.is_alive():
+                        reason = f"worker exited with code {worker.process.exitcode}"
+                        finished.append(replace(worker, reason))
+                    elif not worker.ready and now - worker.created_at > STARTUP_TIMEOUT:
+                        reason = f"not ready after {STARTUP_TIMEOUT:.0f} s"
+                        finished.append(replace(worker, reason))
+                    elif (
+                        self.timeout is not None
+                        and worker.task_id is not None
+                        and worker.started_at is not None
+                        and now - worker.started_at > self.timeout
+                    ):
+                        reason = f"timed out after {self.timeout:.0f} s"
+                        finished.append(replace(worker, reason))
+
+                for outcome in finished:
+                    if outcome is not None:
+                        remaining -= 1
+                        yield outcome
+        finally:
+            for worker in pool.values():
+                worker.stop(force=worker.task_id is not None)
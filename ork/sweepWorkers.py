@@ -0,0 +1,165 @@
+# sweepWorkers.py
+
+from sharedTimeseries import publish_timeseries
+from sweepSupervisor import SupervisedExecutor
+
+# Per-process simulation state, set up once by init_sweep_worker
+_worker = {}
+
+
+def start_worker(state, ork_file):
+    """
+    Start a JVM in this worker process and load the rocket. Shared by the pool
+    initializers of every supervised sweep, which add their own state after.
+    Args:
+        state (dict): Per-process state of the calling module; instance,
+            helper and sim are set in it.
+        ork_file (str): Path to the .ork file.
+    Returns:
+        dict: state.
+    """
+    import orlab
+
+    # The instance is kept open for the lifetime of the worker process
+    instance = orlab.OpenRocketInstance().__enter__()
+    helper = orlab.Helper(instance)
+    state.update(
+        instance=instance,
+        helper=helper,
+        sim=helper.load_doc(ork_file).getSimulation(0),
+    )
+    return state
+
+
+def init_sweep_worker(
+    ork_file,
+    flight_data_types,
+    shm_directory=None,
+    stop_event=None,
+    reductions=None,
+    wind_profile=None,
+):
+    """
+    Pool initializer: start a JVM in this worker process and load the rocket
+    once, so every task only has to override a mass and run the simulation.
+    Args:
+        ork_file (str): Path to the .ork file.
+        flight_data_types (list): FlightDataType members to return for each run.
+        shm_directory (str, optional): Publish timeseries as memory-mapped files
+            in this directory instead of shared memory.
+        stop_event (str, optional): FlightEvent name to end each simulation at.
+        reductions (list, optional): jvmReductions.Reduction specs. If given,
+            each run is reduced to these scalars in the JVM and no timeseries
+            are published.
+        wind_profile (str, optional): Wind profile file to fly every run in;
+            its parsed table is loaded from the cache the parent wrote.
+    """
+    from simulationListeners import simulation_listeners
+
+    start_worker(_worker, ork_file)
+    components = {}
+    for component in _worker["helper"].get_all_components(_worker["sim"].getRocket()):
+        try:
+            components[str(component.getID())] = (component, component.getMass())
+        except AttributeError:
+            continue
+
+    _worker.update(
+        components=components,
+        flight_data_types=list(flight_data_types),
+        shm_directory=shm_directory,
+        listeners=simulation_listeners(stop_event, wind_profile),
+        reductions=reductions,
+    )
+
+
+def run_mass_variation(task):
+    """
+    Run one sweep cell in the worker and publish its timeseries. Exceptions
+    (e.g. a Java simulation error) propagate so the supervisor can retry the cell.
+    Args:
+        task (tuple): (component ID, mass multiplier).
+    Returns:
+        dict: task, handle (SharedTimeseriesHandle) and events, or task and
+            metrics (reduce_flight_data scalars) if the worker reduces in the JVM.
+    """
+    from fastTimeseries import get_timeseries_fast
+    from jvmReductions import reduce_flight_data
+
+    component_id, multiplier = task
+    component, original_mass = _worker["components"][component_id]
+    try:
+        component.setMassOverridden(True)
+        component.setOverrideMass(original_mass * multiplier)
+        _worker["helper"].run_simulation(_worker["sim"], _worker["listeners"])
+        if _worker["reductions"] is not None:
+            metrics = reduce_flight_data(
+                _worker["helper"], _worker["sim"], _worker["reductions"]
+            )
+            return {"task": task, "handle": None, "events": None, "metrics": metrics}
+        data = get_timeseries_fast(
+            _worker["helper"], _worker["sim"], _worker["flight_data_types"]
+        )
+        events = _worker["helper"].get_events(_worker["sim"])
+        handle = publish_timeseries(data, _worker["shm_directory"])
+    finally:
+        component.setMassOverridden(False)
+    return {"task": task, "handle": handle, "events": events, "metrics": None}
+
+
+def run_mass_sweep_parallel(
+    ork_file,
+    tasks,
+    flight_data_types,
+    workers,
+    shm_directory=None,
+    timeout=None,
+    max_retries=2,
+    stop_event=None,
+    reductions=None,
+    wind_profile=None,
+):
+    """
+    Run sweep cells in supervised OpenRocket worker processes. A worker whose
+    JVM crashes or hangs past the timeout is replaced and its cell retried, so
+    one bad cell does not stop the sweep. Results come back as shared memory
+    handles rather than pickled arrays; the caller opens them with
+    sharedTimeseries.open_timeseries and closes them when done.
+    Args:
+        ork_file (str): Path to the .ork file.
+        tasks (list): (component ID, mass multiplier) cells to run.
+        flight_data_types (list): FlightDataType members to return.
+        workers (int): Number of worker processes (one JVM each).
+        shm_directory (str, optional): See init_sweep_worker.
+        timeout (float, optional): Seconds one simulation may run.
+        max_retries (int): Extra attempts for a cell that fails.
+        stop_event (str, optional): FlightEvent name to end each simulation at.
+        reductions (list, optional): Reduce each run to these scalars in the
+            worker's JVM instead of publishing its timeseries.
+        wind_profile (str, optional): Wind profile file to fly every run in.
+    Yields:
+        dict: task, handle, events, metrics and error (None on success), in
+            completion order.
+    """
+    executor = SupervisedExecutor(
+        run_mass_variation,
+        workers,
+        initializer=init_sweep_worker,
+        initargs=(
+            ork_file,
+            flight_data_types,
+            shm_directory,
+            stop_event,
+            reductions,
+            wind_profile,
+        ),
+        timeout=timeout,
+        max_retries=max_retries,
+    )
+    # Segments published by workers that were killed, or not yet collected if
+    # the caller gives up early, are freed by the resource tracker at exit
+    for task, result, error in executor.map(tasks):
+        if result is None:
+            result = {"task": task, "handle": None, "events": None, "metrics": None}
+        result["error"] = error
+        yield result
@@ -0,0 +1,289 @@
+# windProfiles.py
+
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from orlab.listeners import WindProfile
+
+KNOT = 0.514444  # m/s
+DEFAULT_STEP_M = 10.0
+WIND_CACHE_DIR = os.path.join("ork", "outputs", "wind_cache")
+
+# Accepted CSV column names (lower case) for each quantity
+ALTITUDE_COLUMNS = ("altitude_m", "altitude", "height_m", "height", "hght", "z")
+SPEED_COLUMNS = ("speed_ms", "wind_speed_ms", "wind_speed", "speed", "sped")
+KNOT_COLUMNS = ("speed_kt", "wind_speed_kt", "sknt")
+DIRECTION_COLUMNS = ("direction_deg", "wind_direction", "direction", "drct")
+
+# Parsed tables by cache key, so a sweep loads each profile once per process
+_tables = {}
+
+
+@dataclass
+class WindTable:
+    """
+    Wind by altitude above the launch site, resampled onto evenly spaced
+    levels so a lookup is one index computation. east and north are the flow
+    components (towards east and north) in m/s; above the top level the top
+    value holds.
+    """
+
+    altitudes_m: np.ndarray
+    east: np.ndarray
+    north: np.ndarray
+    source: str = ""
+
+
+def _first_column(columns, names):
+    """First of names present in columns, or None."""
+    return next((name for name in names if name in columns), None)
+
+
+def _read_sounding_text(path):
+    """
+    Read a sounding in the fixed-width text layout of radiosonde archives
+    (e.g. University of Wyoming TEXT:LIST): a header row of column names such
+    as PRES HGHT TEMP ... DRCT SKNT, a units row, dashed rules, then data rows
+    in which missing values are left blank.
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+    header_index = next(
+        (
+            i
+            for i, line in enumerate(lines)
+            if "HGHT" in line.split() and "DRCT" in line.split()
+        ),
+        None,
+    )
+    if header_index is None:
+        raise ValueError(f"No HGHT/DRCT header found in sounding file: {path}")
+    header = lines[header_index]
+
+    # Column names are right-aligned over their values
+    names, colspecs, start = [], [], 0
+    for token in header.split():
+        end = header.index(token, start) + len(token)
+        names.append(token.lower())
+        colspecs.append((start, end))
+        start = end
+
+    rows = []
+    for line in lines[header_index + 1 :]:
+        stripped = line.strip()
+        if not stripped or set(stripped) <= set("-="):
+            continue
+        first = stripped.split()[0]
+        try:
+            float(first)
+        except ValueError:
+            if rows:
+                break  # End of the table (e.g. station information)
+            continue  # Units row
+        rows.append(line)
+    return pd.read_fwf(io.StringIO("\n".join(rows)), colspecs=colspecs, names=names)
+
+
+def read_wind_file(path, site_elevation_m=None):
+    """
+    Read a wind-by-altitude profile. CSV files need an altitude column and
+    either speed and direction (the direction the wind blows from, in degrees)
+    or u/v flow components in m/s. Other files are read as sounding text, with
+    heights above sea level, DRCT in degrees and SKNT in knots (or SPED in m/s).
+    Args:
+        path (str): Profile file.
+        site_elevation_m (float, optional): Launch site elevation to subtract
+            from heights above sea level. For soundings the lowest level (the
+            surface) is used if None; CSV altitudes are taken as above the
+            site if None.
+    Returns:
+        pd.DataFrame: altitude_m (above the site, increasing), east and north
+            flow components in m/s.
+    Raises:
+        ValueError: If the file has no usable altitude and wind columns.
+    """
+    if path.lower().endswith(".csv"):
+        raw = pd.read_csv(path)
+        raw.columns = [str(c).strip().lower() for c in raw.columns]
+        sounding = False
+    else:
+        raw = _read_sounding_text(path)
+        sounding = True
+    columns = set(raw.columns)
+
+    altitude_column = _first_column(columns, ALTITUDE_COLUMNS)
+    if altitude_column is None:
+        raise ValueError(f"No altitude column in wind file: {path}")
+    altitude = pd.to_numeric(raw[altitude_column], errors="coerce").to_numpy(float)
+
+    if {"u", "v"} <= columns:
+        east = pd.to_numeric(raw["u"], errors="coerce").to_numpy(float)
+        north = pd.to_numeric(raw["v"], errors="coerce").to_numpy(float)
+    else:
+        direction_column = _first_column(columns, DIRECTION_COLUMNS)
+        speed_column = _first_column(columns, SPEED_COLUMNS)
+        knot_column = _first_column(columns, KNOT_COLUMNS)
+        if direction_column is None or (speed_column is None and knot_column is None):
+            raise ValueError(f"No wind speed and direction columns in: {path}")
+        if speed_column is not None:
+            speed = pd.to_numeric(raw[speed_column], errors="coerce").to_numpy(float)
+        else:
+            speed = KNOT * pd.to_numeric(raw[knot_column], errors="coerce").to_numpy(
+                float
+            )
+        direction = np.radians(
+            pd.to_numeric(raw[direction_column], errors="coerce").to_numpy(float)
+        )
+        # Direction is where the wind comes from; the flow points the other way
+        east = -speed * np.sin(direction)
+        north = -speed * np.cos(direction)
+
+    valid = np.isfinite(altitude) & np.isfinite(east) & np.isfinite(north)
+    if not np.any(valid):
+        raise ValueError(f"No complete wind rows in: {path}")
+    profile = (
+        pd.DataFrame(
+            {"altitude_m": altitude[valid], "east": east[valid], "north": north[valid]}
+        )
+        .sort_values("altitude_m")
+        .drop_duplicates("altitude_m")
+    )
+    if site_elevation_m is None and sounding:
+        site_elevation_m = float(profile["altitude_m"].iloc[0])
+    if site_elevation_m is not None:
+        profile["altitude_m"] -= site_elevation_m
+    return profile.reset_index(drop=True)
+
+
+def build_wind_table(profile, step_m=DEFAULT_STEP_M, source=""):
+    """
+    Resample a profile onto evenly spaced levels from the ground to its top.
+    Components are interpolated separately, like orlab's WindProfile.
+    Args:
+        profile (pd.DataFrame): As returned by read_wind_file.
+        step_m (float): Level spacing.
+        source (str): Where the profile came from.
+    Returns:
+        WindTable: The table (at least two levels).
+    """
+    top = max(float(profile["altitude_m"].max()), step_m)
+    altitudes = np.arange(int(np.ceil(top / step_m)) + 1) * step_m
+    return WindTable(
+        altitudes_m=altitudes,
+        east=np.interp(altitudes, profile["altitude_m"], profile["east"]),
+        north=np.interp(altitudes, profile["altitude_m"], profile["north"]),
+        source=source,
+    )
+
+
+def _cache_key(path, step_m, site_elevation_m):
+    """Identifies a parsed table: the file's path, size and modification time."""
+    stat = os.stat(path)
+    text = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{step_m}|{site_elevation_m}"
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def load_wind_table(path, step_m=DEFAULT_STEP_M, site_elevation_m=None):
+    """
+    Wind table of a profile file, parsed only the first time. Tables are kept
+    in memory for the life of the process and cached as .npz in WIND_CACHE_DIR,
+    so worker processes and later runs load the resampled arrays directly.
+    Editing the file invalidates its cache entry.
+    Args:
+        path (str): Profile file (see read_wind_file).
+        step_m (float): Level spacing of the table.
+        site_elevation_m (float, optional): See read_wind_file.
+    Returns:
+        WindTable: The table.
+    """
+    key = _cache_key(path, step_m, site_elevation_m)
+    if key in _tables:
+        return _tables[key]
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(WIND_CACHE_DIR, f"{name}-{key}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            table = WindTable(
+                cached["altitudes_m"], cached["east"], cached["north"], str(path)
+            )
+    else:
+        table = build_wind_table(
+            read_wind_file(path, site_elevation_m), step_m, str(path)
+        )
+        os.makedirs(WIND_CACHE_DIR, exist_ok=True)
+        np.savez(
+            cache_path,
+            altitudes_m=table.altitudes_m,
+            east=table.east,
+            north=table.north,
+        )
+    _tables[key] = table
+    return table
+
+
+def wind_at(table, altitude_m):
+    """
+    Args:
+        table (WindTable): Wind table.
+        altitude_m (float or np.array): Altitude above the launch site.
+    Returns:
+        tuple: (east, north) flow components at each altitude.
+    """
+    step = table.altitudes_m[1] - table.altitudes_m[0]
+    position = np.clip(np.asarray(altitude_m, dtype=float) / step, 0.0, None)
+    lower = np.minimum(position.astype(int), len(table.altitudes_m) - 2)
+    fraction = np.minimum(position - lower, 1.0)
+    east = table.east[lower] * (1 - fraction) + table.east[lower + 1] * fraction
+    north = table.north[lower] * (1 - fraction) + table.north[lower + 1] * fraction
+    return east, north
+
+
+class TableWind(WindProfile):
+    """
+    orlab WindProfile driven by a WindTable. OpenRocket asks for the wind at
+    every integrator stage, so the lookup uses the table's even spacing (one
+    index computation on plain floats) instead of a search. Like WindProfile,
+    it replaces OpenRocket's wind model, including its turbulence.
+    """
+
+    def __init__(self, table):
+        """
+        Args:
+            table (WindTable): Wind table.
+        """
+        speeds = np.hypot(table.east, table.north)
+        from_directions = np.arctan2(-table.east, -table.north)
+        super().__init__(table.altitudes_m, speeds, from_directions)
+        self.step = float(table.altitudes_m[1] - table.altitudes_m[0])
+        self.top = len(table.altitudes_m) - 1
+        # Plain lists: indexing them is faster than indexing numpy arrays
+        self.u_levels = self.u.tolist()
+        self.v_levels = self.v.tolist()
+
+    def _wind_at(self, altitude_m):
+        position = min(max(altitude_m / self.step, 0.0), float(self.top))
+        lower = min(int(position), self.top - 1)
+        fraction = position - lower
+        u, v = self.u_levels, self.v_levels
+        return (
+            u[lower] + (u[lower + 1] - u[lower]) * fraction,
+            v[lower] + (v[lower + 1] - v[lower]) * fraction,
+        )
+
+
+def wind_listeners(wind_profile=None):
+    """
+    Args:
+        wind_profile (str, optional): Profile file to fly every simulation in.
+    Returns:
+        list: Listeners for Helper.run_simulation (empty to keep the .ork wind).
+    """
+    if wind_profile is None:
+        return []
+    return [TableWind(load_wind_table(wind_profile))]
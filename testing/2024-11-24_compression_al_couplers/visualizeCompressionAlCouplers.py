@@ -1,123 +1,67 @@
+import argparse
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
+import sys
 
+# The export parser is shared by all mechanical tests and lives in testing/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mechanicalTestFile import parse_test_file
+from mechanicalTestMetrics import run_metrics
+from mechanicalTestPlot import plot_load_displacement
 
-def parse_test_file(file_path):
+
+def plot_run_seaborn(displacement, load, title, plot_file):
     """
-    Parses the compressive test data file and returns a list of runs.
-    Each run is a dictionary containing metadata and a DataFrame of data points.
+    Original seaborn rendering of a run, kept for comparison with the fast path.
     """
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-
-    print(f"File read successfully: {file_path}")
-
-    runs = []
-    data_started = False
-    data_lines = []
-    header = []
-
-    header_keywords = ["Point", "Time", "Axial Pos.", "DC1", "DC2", "DC3", "DC4"]
-
-    for line_number, line in enumerate(lines, start=1):
-        original_line = line
-        line = line.strip()
-        line_no_quotes = line.replace('"', "").replace("�", " ")
-
-        if all(
-            keyword.lower() in line_no_quotes.lower() for keyword in header_keywords
-        ):
-            print(f"Header detected at line {line_number}: {line}")
-            if data_started and data_lines:
-                df = pd.DataFrame(data_lines, columns=header)
-                runs.append({"data": df})
-                print(f"Run added. Data points: {len(data_lines)}")
-                data_lines = []
-                header = []
-
-            data_started = True
-            continue
-
-        if data_started and not header:
-            header = [
-                "Point No.",
-                "Time (s)",
-                "Axial Pos. (mm)",
-                "DC1 (N)",
-                "DC2 (LB)",
-                "DC3",
-                "DC4",
-            ]
-            print(f"Header columns set: {header}")
-            continue
-
-        if data_started:
-            if line == "":
-                continue
-
-            parts = re.split(r"\s+", line_no_quotes)
-            if len(parts) >= 7:
-                try:
-                    point_no = int(parts[0])
-                    time_s = float(parts[1])
-                    axial_pos_mm = float(parts[2])
-                    dc1_n = float(parts[3])
-                    dc2_lb = float(parts[4])
-                    dc3 = parts[5]
-                    dc4 = parts[6]
-                    data_lines.append(
-                        [point_no, time_s, axial_pos_mm, dc1_n, dc2_lb, dc3, dc4]
-                    )
-                except ValueError:
-                    print(f"Skipping line {line_number}: {original_line}")
-            else:
-                print(f"Incomplete data line at line {line_number}: {original_line}")
-
-    if data_started and data_lines:
-        df = pd.DataFrame(data_lines, columns=header)
-        runs.append({"data": df})
-        print(f"Final run added. Data points: {len(data_lines)}")
-
-    print(f"Total runs detected in {file_path}: {len(runs)}")
-    return runs
-
-
-def visualize_and_save_metrics(runs, file_id, output_dir, metrics_output_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.lineplot(x=displacement, y=load, label="DC1 (N)")
+    plt.title(title)
+    plt.xlabel("Axial Displacement (mm)")
+    plt.ylabel("Load (N)")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(plot_file)
+    plt.close()
+
+
+def visualize_and_save_metrics(
+    runs, file_id, output_dir, metrics_output_path, plot_mode="fast", decimate=True
+):
     """
     Visualizes data for each run and appends metrics to a combined output file.
+    plot_mode "fast" draws directly on an Agg canvas (optionally min/max
+    decimated to the plot width), "seaborn" uses the original seaborn plot.
     """
     with open(metrics_output_path, "a") as metrics_file:
         for idx, run in enumerate(runs, start=1):
-            df = run["data"]
-            df["DC1 (N)"] = pd.to_numeric(df["DC1 (N)"], errors="coerce").abs()
-            df["Axial Displacement (mm)"] = df["Axial Pos. (mm)"].abs()
-
-            plt.figure(figsize=(10, 6))
-            sns.lineplot(
-                x="Axial Displacement (mm)", y="DC1 (N)", data=df, label="DC1 (N)"
-            )
-            plt.title(f"{file_id} - Run {idx} - Load vs. Axial Displacement")
-            plt.xlabel("Axial Displacement (mm)")
-            plt.ylabel("Load (N)")
-            plt.legend()
-            plt.grid(True)
+            displacement = run.displacement_mm
+            load = run.load_magnitude_n
 
+            title = f"{file_id} - Run {idx} - Load vs. Axial Displacement"
             plot_file = os.path.join(output_dir, f"{file_id}_run_{idx}_plot.png")
-            plt.savefig(plot_file)
-            plt.close()
-
-            if not df.empty:
-                max_load_dc1 = df["DC1 (N)"].max()
-                deformation_at_max_dc1 = df.loc[
-                    df["DC1 (N)"].idxmax(), "Axial Displacement (mm)"
-                ]
+            if plot_mode == "seaborn":
+                plot_run_seaborn(displacement, load, title, plot_file)
+            else:
+                plot_load_displacement(
+                    displacement, load, title, plot_file, decimate=decimate
+                )
+
+            if len(run):
+                m = run_metrics(run)
                 metrics = (
                     f"{file_id} - Run {idx} Metrics:\n"
-                    f"  Max Load (DC1) = {max_load_dc1:.3f} N\n"
-                    f"  Axial Displacement at Max Load = {deformation_at_max_dc1:.3f} mm\n\n"
+                    f"  Max Load (DC1) = {m['max_load_n']:.3f} N\n"
+                    f"  Axial Displacement at Max Load = {m['displacement_at_max_load_mm']:.3f} mm\n"
+                    f"  Stiffness (linear region) = {m['stiffness_n_per_mm']:.3f} N/mm\n"
+                    f"  Yield Onset = {m['yield_load_n']:.3f} N at {m['yield_displacement_mm']:.3f} mm\n"
+                    f"  Energy Absorbed to Max Load = {m['energy_to_max_load_j']:.3f} J\n"
+                    f"  Unload Events = {m['unload_count']}\n\n"
                 )
             else:
                 metrics = f"{file_id} - Run {idx} Metrics:\nNo data available.\n\n"
@@ -127,6 +71,22 @@ def visualize_and_save_metrics(runs, file_id, output_dir, metrics_output_path):
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Plot and summarize the aluminum coupler compression tests."
+    )
+    parser.add_argument(
+        "--plot-mode",
+        choices=["fast", "seaborn"],
+        default="fast",
+        help="Plot directly with matplotlib's Agg canvas, or with seaborn",
+    )
+    parser.add_argument(
+        "--no-decimate",
+        action="store_true",
+        help="Draw every sample in fast mode",
+    )
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     input_files = ["NOV2224_first.txt", "NOV2224_second.txt"]
     output_dir = os.path.join(script_dir, "outputs")
@@ -148,7 +108,14 @@ def main():
         runs = parse_test_file(input_path)
         if runs:
             file_id = os.path.splitext(input_file)[0]
-            visualize_and_save_metrics(runs, file_id, output_dir, metrics_output_path)
+            visualize_and_save_metrics(
+                runs,
+                file_id,
+                output_dir,
+                metrics_output_path,
+                plot_mode=args.plot_mode,
+                decimate=not args.no_decimate,
+            )
         else:
             print(f"No runs detected in {input_file}. Skipping.")
 
@@ -0,0 +1,329 @@
+# mechanicalTestFile.py
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DATA_COLUMNS = [
+    "Point No.",
+    "Time (s)",
+    "Axial Pos. (mm)",
+    "DC1 (N)",
+    "DC2 (LB)",
+    "DC3",
+    "DC4",
+]
+AUXILIARY_CHANNELS = ["DC2", "DC3", "DC4"]
+
+# A run starts at the column header line containing all of these keywords.
+# Candidate lines are found by their leading "Point" so the scan only has to
+# look at the first characters of each data line.
+HEADER_KEYWORDS = ["Point", "Time", "Axial Pos.", "DC1", "DC2", "DC3", "DC4"]
+HEADER_CANDIDATE_PATTERN = re.compile(r'^[ \t"]*Point\b.*$', re.IGNORECASE | re.MULTILINE)
+
+# Preamble lines look like: 3,"CIRC",1.1,0.5,0.1,0.25,0.04908738515625
+PREAMBLE_LINE_PATTERN = re.compile(r"^(\d+),(.*)$")
+UNIT_PATTERN = re.compile(r"\(([^)]*)\)")
+
+SQUARE_INCH_TO_SQUARE_METRE = 0.00064516
+CM_PER_INCH = 2.54
+
+
+@dataclass
+class TestFileMetadata:
+    """
+    Decoded preamble of an Adelaide Testing Machines export.
+
+    The controller stores geometry, ranges and rates in inch/lbf units and
+    converts them to the display unit system (line 11) when printing, so both
+    the raw values and the converted ones are kept. Every preamble line is also
+    kept in raw, keyed by its line number, for the fields not decoded here.
+    """
+
+    machine: str = ""
+    test_date: str = ""
+    test_time: str = ""
+    mode: str = ""
+    declared_points: Optional[int] = None
+    specimen_shape: str = ""
+    specimen_dimensions: tuple = ()
+    specimen_area_in2: float = float("nan")
+    load_channel: str = ""
+    load_unit: str = ""
+    position_channel: str = ""
+    position_unit: str = ""
+    load_cell_capacity_n: float = float("nan")
+    unit_system: str = ""
+    display_units: dict = field(default_factory=dict)
+    crosshead_rate_in_per_min: float = float("nan")
+    crosshead_rate_unit: str = ""
+    raw: dict = field(default_factory=dict)
+
+    @property
+    def specimen_area_m2(self):
+        return self.specimen_area_in2 * SQUARE_INCH_TO_SQUARE_METRE
+
+    @property
+    def crosshead_rate(self):
+        """Crosshead rate in crosshead_rate_unit (cm/min or in/min)."""
+        if self.crosshead_rate_unit.startswith("cm"):
+            return self.crosshead_rate_in_per_min * CM_PER_INCH
+        return self.crosshead_rate_in_per_min
+
+
+@dataclass
+class TestRun:
+    """
+    One run of a test file, with each channel held as a NumPy array.
+
+    Auxiliary channels (DC2-DC4) that only ever read zero are not stored.
+    """
+
+    index: int
+    metadata: TestFileMetadata
+    point: np.ndarray
+    time_s: np.ndarray
+    position_mm: np.ndarray
+    load_n: np.ndarray
+    auxiliary: dict = field(default_factory=dict)
+    channel_units: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.point)
+
+    @property
+    def displacement_mm(self):
+        """Crosshead travel magnitude (the machine reports compression as negative)."""
+        return np.abs(self.position_mm)
+
+    @property
+    def load_magnitude_n(self):
+        return np.abs(self.load_n)
+
+    @property
+    def sample_rate_hz(self):
+        if len(self.time_s) < 2:
+            return float("nan")
+        return 1.0 / float(np.median(np.diff(self.time_s)))
+
+    def stress_kpa(self):
+        """
+        Returns:
+            np.array: Load magnitude over the specimen area from the preamble, in kPa.
+        """
+        return self.load_magnitude_n / self.metadata.specimen_area_m2 / 1000.0
+
+    def strain(self, gauge_length_mm):
+        """
+        Args:
+            gauge_length_mm (float): Specimen length the displacement is taken over.
+        Returns:
+            np.array: Engineering strain from the crosshead displacement.
+        """
+        return self.displacement_mm / gauge_length_mm
+
+    def to_dataframe(self):
+        """
+        Returns:
+            pd.DataFrame: The run with the original DATA_COLUMNS layout.
+        """
+        columns = {
+            "Point No.": self.point,
+            "Time (s)": self.time_s,
+            "Axial Pos. (mm)": self.position_mm,
+            "DC1 (N)": self.load_n,
+        }
+        for name, column in zip(AUXILIARY_CHANNELS, DATA_COLUMNS[4:]):
+            columns[column] = self.auxiliary.get(name, np.zeros(len(self), np.float32))
+        return pd.DataFrame(columns)
+
+
+def _preamble_value(text):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _field(raw, line, position, default=None):
+    values = raw.get(line, [])
+    return values[position] if position < len(values) else default
+
+
+def _number(raw, line, position):
+    value = _field(raw, line, position)
+    return float(value) if isinstance(value, float) else float("nan")
+
+
+def parse_preamble(text):
+    """
+    Decode the numbered preamble lines that precede the first run.
+    Args:
+        text (str): File contents up to the first column header.
+    Returns:
+        metadata (TestFileMetadata): Decoded fields, with every line kept in raw.
+    """
+    raw = {}
+    for line in text.splitlines():
+        match = PREAMBLE_LINE_PATTERN.match(line.strip())
+        if match:
+            fields = next(csv.reader([match.group(2)]))
+            raw[int(match.group(1))] = [_preamble_value(value) for value in fields]
+
+    declared_points = _field(raw, 2, 2)
+    dimensions = tuple(v for v in raw.get(3, [])[1:-1] if isinstance(v, float))
+    display_units = dict(
+        zip(["area", "force", "stiffness", "stress", "time"], raw.get(11, [])[1:])
+    )
+    return TestFileMetadata(
+        machine=str(_field(raw, 1, 0, "")),
+        test_date=str(_field(raw, 1, 1, "")),
+        test_time=str(_field(raw, 1, 2, "")),
+        mode=str(_field(raw, 1, 3, "")),
+        declared_points=(
+            int(declared_points) if isinstance(declared_points, float) else None
+        ),
+        specimen_shape=str(_field(raw, 3, 0, "")),
+        specimen_dimensions=dimensions,
+        specimen_area_in2=_number(raw, 3, len(raw.get(3, [])) - 1),
+        load_channel=str(_field(raw, 4, 1, "")),
+        load_unit=str(_field(raw, 4, 3, "")),
+        position_channel=str(_field(raw, 5, 1, "")),
+        position_unit=str(_field(raw, 5, 3, "")),
+        load_cell_capacity_n=_number(raw, 6, 1),
+        unit_system=str(_field(raw, 11, 0, "")),
+        display_units=display_units,
+        crosshead_rate_in_per_min=_number(raw, 15, 2),
+        crosshead_rate_unit=str(_field(raw, 15, 0, "")),
+        raw=raw,
+    )
+
+
+def parse_channel_units(units_line):
+    """
+    Args:
+        units_line (str): The line under the column header, e.g. '" No. (s) (mm) (N) ..."'.
+    Returns:
+        dict: Channel name -> unit for the bracketed units on the line.
+    """
+    names = ["Time", "Axial Pos.", "DC1"] + AUXILIARY_CHANNELS
+    return dict(zip(names, UNIT_PATTERN.findall(units_line)))
+
+
+def parse_run_block(block):
+    """
+    Parse the numeric section of one run in a single bulk read.
+    Args:
+        block (str): Text of the data rows (whitespace separated, one point per line).
+    Returns:
+        values (np.array): Data points, shape (n_points, len(DATA_COLUMNS)).
+        skipped (int): Number of lines that were not complete data rows.
+    """
+    block = block.strip()
+    if not block:
+        return np.empty((0, len(DATA_COLUMNS))), 0
+    n_lines = block.count("\n") + 1 - block.count("\n\n")
+
+    read_options = dict(
+        sep=r"\s+",
+        header=None,
+        names=DATA_COLUMNS,
+        usecols=range(len(DATA_COLUMNS)),
+        on_bad_lines="skip",
+        skip_blank_lines=True,
+    )
+    try:
+        df = pd.read_csv(io.StringIO(block), dtype=float, **read_options)
+    except ValueError:
+        # A stray non-numeric line: parse as text and drop what does not convert
+        df = pd.read_csv(io.StringIO(block), dtype=str, **read_options)
+        df = df.apply(pd.to_numeric, errors="coerce")
+
+    values = df.dropna().to_numpy(dtype=float)
+    return values, n_lines - len(values)
+
+
+def build_run(index, values, metadata, channel_units):
+    """
+    Split parsed data rows into the typed channels of a TestRun.
+    Args:
+        index (int): Run number within the file (1-based).
+        values (np.array): Data points as returned by parse_run_block.
+        metadata (TestFileMetadata): Metadata of the file the run came from.
+        channel_units (dict): Units per channel, from parse_channel_units.
+    Returns:
+        run (TestRun): The run.
+    """
+    auxiliary = {}
+    for name, column in zip(AUXILIARY_CHANNELS, values[:, 4:].T):
+        if np.any(column != 0):
+            auxiliary[name] = column.astype(np.float32)
+    return TestRun(
+        index=index,
+        metadata=metadata,
+        point=values[:, 0].astype(np.int32),
+        time_s=np.ascontiguousarray(values[:, 1]),
+        position_mm=np.ascontiguousarray(values[:, 2]),
+        load_n=np.ascontiguousarray(values[:, 3]),
+        auxiliary=auxiliary,
+        channel_units=channel_units,
+    )
+
+
+def parse_test_file(file_path, verbose=True):
+    """
+    Parses a mechanical tester export into typed runs.
+    The header blocks are located in one scan of the file, the preamble before
+    the first header is decoded into metadata and each run's data section is
+    parsed with a single bulk read.
+    Args:
+        file_path (str): Path to the exported .txt file.
+        verbose (bool): Print progress while parsing.
+    Returns:
+        runs (list): TestRun objects sharing the file's TestFileMetadata.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    # The exports are not consistently UTF-8 (unit symbols are written in the
+    # machine's code page), so undecodable bytes are replaced
+    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+        text = file.read()
+
+    log(f"File read successfully: {file_path}")
+
+    headers = [
+        match
+        for match in HEADER_CANDIDATE_PATTERN.finditer(text)
+        if all(
+            keyword.lower() in match.group().lower() for keyword in HEADER_KEYWORDS
+        )
+    ]
+    metadata = parse_preamble(text[: headers[0].start()] if headers else text)
+
+    runs = []
+    for idx, header in enumerate(headers):
+        line_number = text.count("\n", 0, header.start()) + 1
+        log(f"Header detected at line {line_number}: {header.group().strip()}")
+
+        # The line after the column names holds the units, data starts after it
+        units_end = text.find("\n", header.end() + 1)
+        units_line = text[header.end() + 1 : units_end if units_end != -1 else None]
+        start = len(text) if units_end == -1 else units_end + 1
+        end = headers[idx + 1].start() if idx + 1 < len(headers) else len(text)
+
+        values, skipped = parse_run_block(text[start:end])
+        if skipped:
+            log(f"Skipped {skipped} incomplete or invalid data lines in run {idx + 1}.")
+        if len(values):
+            runs.append(
+                build_run(len(runs) + 1, values, metadata, parse_channel_units(units_line))
+            )
+            log(f"Run added. Data points: {len(values)}")
+
+    log(f"Total runs detected in {file_path}: {len(runs)}")
+    return runs
@@ -0,0 +1,183 @@
+# mechanicalTestMetrics.py
+
+import numpy as np
+
+# Defaults for the onset detection, as fractions of the measured quantities
+YIELD_SLOPE_FRACTION = 0.5  # yield once the local slope drops below half the stiffness
+FAILURE_DROP_FRACTION = 0.2  # failure once the load falls 20% below the peak
+UNLOAD_TOLERANCE_MM = 0.01  # crosshead reversal smaller than this is noise
+
+
+def rolling_slope(x, y, window):
+    """
+    Least squares slope of y against x over every window of consecutive points.
+    All windows are solved at once from cumulative sums instead of one fit each.
+    Args:
+        x (np.array): Independent variable.
+        y (np.array): Dependent variable, same length as x.
+        window (int): Points per window.
+    Returns:
+        np.array: Slope of the window starting at each index (length len(x) - window + 1),
+            NaN where x does not vary within the window.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if window < 2 or len(x) < window:
+        return np.empty(0)
+
+    # Centre the data so the sums of squares do not lose precision
+    x = x - x.mean()
+    y = y - y.mean()
+
+    def window_sums(values):
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        return cumulative[window:] - cumulative[:-window]
+
+    sum_x = window_sums(x)
+    sum_y = window_sums(y)
+    sum_xx = window_sums(x * x)
+    sum_xy = window_sums(x * y)
+
+    denominator = window * sum_xx - sum_x**2
+    numerator = window * sum_xy - sum_x * sum_y
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = numerator / denominator
+    # Windows where x barely moves (e.g. a hold) have no meaningful slope
+    slope[np.abs(denominator) <= 1e-12 * np.maximum(1.0, window * sum_xx)] = np.nan
+    return slope
+
+
+def trapezoid_energy(x, y):
+    """
+    Args:
+        x (np.array): Displacement in mm.
+        y (np.array): Load in N.
+    Returns:
+        float: Area under the curve in J (N*mm / 1000), by the trapezoidal rule.
+    """
+    if len(x) < 2:
+        return 0.0
+    return float(np.sum(0.5 * (y[1:] + y[:-1]) * np.diff(x))) / 1000.0
+
+
+def detect_unloads(displacement, tolerance=UNLOAD_TOLERANCE_MM):
+    """
+    Find where the crosshead starts moving back, i.e. the specimen is unloaded.
+    Args:
+        displacement (np.array): Displacement in mm (positive in the loading direction).
+        tolerance (float): Reversal, in mm below the running maximum, that counts
+            as an unload rather than noise.
+    Returns:
+        np.array: Indices where each unload segment starts.
+    """
+    if len(displacement) == 0:
+        return np.empty(0, dtype=int)
+    unloading = displacement < np.maximum.accumulate(displacement) - tolerance
+    starts = np.flatnonzero(np.diff(unloading.astype(np.int8)) == 1) + 1
+    if unloading[0]:
+        starts = np.concatenate(([0], starts))
+    return starts
+
+
+def load_displacement_metrics(
+    displacement,
+    load,
+    window=None,
+    yield_slope_fraction=YIELD_SLOPE_FRACTION,
+    failure_drop_fraction=FAILURE_DROP_FRACTION,
+    unload_tolerance=UNLOAD_TOLERANCE_MM,
+):
+    """
+    Compute the metrics of one load/displacement curve with whole-array NumPy operations.
+    Args:
+        displacement (np.array): Displacement in mm (positive in the loading direction).
+        load (np.array): Load magnitude in N.
+        window (int, optional): Points per stiffness fit. Defaults to 2% of the
+            run, at least 5 points.
+        yield_slope_fraction (float): Yield onset is the first point after the
+            linear region where the local slope falls below this fraction of the stiffness.
+        failure_drop_fraction (float): Failure onset is the first point after the
+            peak where the load is this fraction below the peak.
+        unload_tolerance (float): See detect_unloads.
+    Returns:
+        dict: Metric name -> value (NaN where a metric does not apply).
+    """
+    displacement = np.asarray(displacement, dtype=float)
+    load = np.asarray(load, dtype=float)
+    n_points = len(load)
+    nan = float("nan")
+    metrics = {
+        "max_load_n": nan,
+        "displacement_at_max_load_mm": nan,
+        "stiffness_n_per_mm": nan,
+        "linear_region_start_mm": nan,
+        "linear_region_end_mm": nan,
+        "yield_load_n": nan,
+        "yield_displacement_mm": nan,
+        "failure_load_n": nan,
+        "failure_displacement_mm": nan,
+        "energy_to_max_load_j": nan,
+        "energy_total_j": nan,
+        "unload_count": 0,
+        "first_unload_displacement_mm": nan,
+    }
+    if n_points == 0:
+        return metrics
+
+    peak = int(np.argmax(load))
+    metrics["max_load_n"] = float(load[peak])
+    metrics["displacement_at_max_load_mm"] = float(displacement[peak])
+    metrics["energy_to_max_load_j"] = trapezoid_energy(
+        displacement[: peak + 1], load[: peak + 1]
+    )
+    metrics["energy_total_j"] = trapezoid_energy(displacement, load)
+
+    unloads = detect_unloads(displacement, unload_tolerance)
+    metrics["unload_count"] = int(len(unloads))
+    if len(unloads):
+        metrics["first_unload_displacement_mm"] = float(displacement[unloads[0]])
+
+    failed = np.flatnonzero(load[peak:] <= (1.0 - failure_drop_fraction) * load[peak])
+    if len(failed):
+        failure = peak + int(failed[0])
+        metrics["failure_load_n"] = float(load[failure])
+        metrics["failure_displacement_mm"] = float(displacement[failure])
+
+    # Stiffness is the steepest fitted slope on the way up to the peak
+    if window is None:
+        window = max(5, n_points // 50)
+    slopes = rolling_slope(displacement[: peak + 1], load[: peak + 1], window)
+    if len(slopes) == 0 or np.all(np.isnan(slopes)):
+        return metrics
+    start = int(np.nanargmax(slopes))
+    stiffness = float(slopes[start])
+    end = start + window - 1
+    metrics["stiffness_n_per_mm"] = stiffness
+    metrics["linear_region_start_mm"] = float(displacement[start])
+    metrics["linear_region_end_mm"] = float(displacement[end])
+
+    softened = np.flatnonzero(slopes[start:] < yield_slope_fraction * stiffness)
+    if len(softened):
+        # The first softened window ends at the point where the slope was lost
+        yielded = min(start + int(softened[0]) + window - 1, peak)
+        metrics["yield_load_n"] = float(load[yielded])
+        metrics["yield_displacement_mm"] = float(displacement[yielded])
+
+    return metrics
+
+
+def run_metrics(run, **kwargs):
+    """
+    Args:
+        run (TestRun): Parsed run from mechanicalTestFile.parse_test_file.
+        **kwargs: Detection settings passed to load_displacement_metrics.
+    Returns:
+        dict: Metric name -> value, including the peak stress over the specimen area.
+    """
+    metrics = load_displacement_metrics(
+        run.displacement_mm, run.load_magnitude_n, **kwargs
+    )
+    metrics["max_stress_kpa"] = (
+        metrics["max_load_n"] / run.metadata.specimen_area_m2 / 1000.0
+    )
+    return metrics
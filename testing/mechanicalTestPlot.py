@@ -0,0 +1,57 @@
+# mechanicalTestPlot.py
+
+import os
+import sys
+
+import numpy as np
+
+# Min/max decimation is shared with the flight plots in ork/
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ork")
+)
+from plotDownsampling import minmax_indices
+
+DEFAULT_FIGSIZE = (10, 6)
+DEFAULT_DPI = 100
+
+
+def plot_load_displacement(
+    displacement,
+    load,
+    title,
+    plot_file,
+    decimate=True,
+    figsize=DEFAULT_FIGSIZE,
+    dpi=DEFAULT_DPI,
+):
+    """
+    Draw load against displacement straight to a PNG with the Agg canvas,
+    without going through pyplot's figure manager or seaborn.
+    Args:
+        displacement (np.array): Displacement in mm.
+        load (np.array): Load in N.
+        title (str): Plot title.
+        plot_file (str): Output .png path.
+        decimate (bool): Min/max-decimate the line to the figure's pixel width.
+        figsize (tuple): Figure size in inches.
+        dpi (int): Output resolution.
+    """
+    # Imported here so that parsing and metrics never pay for matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if decimate:
+        # Buckets are runs of consecutive samples, since displacement can go back
+        keep = minmax_indices(np.arange(len(load)), load, int(figsize[0] * dpi))
+        displacement, load = np.asarray(displacement)[keep], np.asarray(load)[keep]
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(displacement, load, label="DC1 (N)")
+    ax.set_title(title)
+    ax.set_xlabel("Axial Displacement (mm)")
+    ax.set_ylabel("Load (N)")
+    ax.legend()
+    ax.grid(True)
+    fig.savefig(plot_file)
@@ -0,0 +1,223 @@
+# processTestCampaign.py
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from mechanicalTestFile import parse_test_file
+from mechanicalTestMetrics import run_metrics
+
+TESTING_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(TESTING_DIR, "outputs")
+CACHE_PATH = os.path.join(OUTPUT_DIR, "campaign_cache.json")
+METRICS_PATH = os.path.join(OUTPUT_DIR, "campaign_metrics.csv")
+
+# Bump when the metrics change so cached results are recomputed
+CACHE_VERSION = 2
+
+# Exports start with the numbered preamble, e.g. 1,"Adelaide Testing Machines Inc.",...
+EXPORT_SIGNATURE = b'1,"Adelaide Testing Machines'
+
+METRIC_COLUMNS = [
+    "test",
+    "file",
+    "run",
+    "points",
+    "duration_s",
+    "sample_rate_hz",
+    "specimen_area_in2",
+    "max_load_n",
+    "displacement_at_max_load_mm",
+    "max_stress_kpa",
+    "stiffness_n_per_mm",
+    "linear_region_start_mm",
+    "linear_region_end_mm",
+    "yield_load_n",
+    "yield_displacement_mm",
+    "failure_load_n",
+    "failure_displacement_mm",
+    "energy_to_max_load_j",
+    "energy_total_j",
+    "unload_count",
+    "first_unload_displacement_mm",
+]
+
+
+def discover_exports(root):
+    """
+    Find every mechanical tester export below a directory.
+    Args:
+        root (str): Directory to search (normally testing/).
+    Returns:
+        paths (list): Sorted paths of the .txt files that start with the export preamble.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in ("outputs", "__pycache__")]
+        for filename in filenames:
+            if not filename.lower().endswith(".txt"):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                if f.read(len(EXPORT_SIGNATURE)) == EXPORT_SIGNATURE:
+                    paths.append(path)
+    return sorted(paths)
+
+
+def file_hash(path):
+    """
+    Args:
+        path (str): File to hash.
+    Returns:
+        str: SHA-256 hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def process_export(path, root):
+    """
+    Parse one export and compute the metrics of each run. Runs in a worker process.
+    Args:
+        path (str): Path to the export.
+        root (str): Campaign root, used to label the test and file.
+    Returns:
+        rows (list): One metrics dictionary per run.
+    """
+    relative = os.path.relpath(path, root)
+    test = os.path.dirname(relative) or "."
+    rows = []
+    for run in parse_test_file(path, verbose=False):
+        row = {
+            "test": test,
+            "file": os.path.basename(path),
+            "run": run.index,
+            "points": len(run),
+            "duration_s": float(run.time_s[-1] - run.time_s[0]),
+            "sample_rate_hz": run.sample_rate_hz,
+            "specimen_area_in2": run.metadata.specimen_area_in2,
+        }
+        row.update(run_metrics(run))
+        rows.append(row)
+    return rows
+
+
+def load_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(cache_path, files):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f, indent=2)
+    os.replace(temp_path, cache_path)
+
+
+def process_campaign(
+    root=TESTING_DIR,
+    output_path=METRICS_PATH,
+    cache_path=CACHE_PATH,
+    workers=None,
+    use_cache=True,
+):
+    """
+    Process every export below root and write one consolidated metrics table.
+    Files whose contents are unchanged since the last run are taken from the cache.
+    Args:
+        root (str): Directory to search for exports.
+        output_path (str): Path of the consolidated metrics .csv.
+        cache_path (str): Path of the JSON cache keyed by file path and hash.
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+        use_cache (bool): Reuse cached results for unchanged files if True.
+    Returns:
+        rows (list): Metrics dictionaries for every run of every export.
+    """
+    paths = discover_exports(root)
+    print(f"[INFO] Found {len(paths)} test exports under {root}")
+
+    cache = load_cache(cache_path) if use_cache else {}
+    hashes = {path: file_hash(path) for path in paths}
+    results = {}
+    pending = []
+    for path in paths:
+        key = os.path.relpath(path, root)
+        entry = cache.get(key)
+        if entry is not None and entry["sha256"] == hashes[path]:
+            results[path] = entry["rows"]
+        else:
+            pending.append(path)
+    print(f"[INFO] {len(paths) - len(pending)} cached, {len(pending)} to process")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                path: pool.submit(process_export, path, root) for path in pending
+            }
+            for path, future in futures.items():
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Failed to process {path}: {e}")
+
+    files = {
+        os.path.relpath(path, root): {"sha256": hashes[path], "rows": results[path]}
+        for path in paths
+        if path in results
+    }
+    save_cache(cache_path, files)
+
+    rows = [row for path in paths for row in results.get(path, [])]
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=METRIC_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"[INFO] Metrics for {len(rows)} runs saved to: {output_path}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute metrics for every mechanical test export under testing/."
+    )
+    parser.add_argument(
+        "--root", default=TESTING_DIR, help="Directory to search for exports"
+    )
+    parser.add_argument(
+        "--output", default=METRICS_PATH, help="Consolidated metrics .csv"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Reprocess every file")
+    args = parser.parse_args()
+
+    process_campaign(
+        root=args.root,
+        output_path=args.output,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+    )
+
+
+if __name__ == "__main__":
+    main()